@@ -60,14 +60,72 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        # TokenAuthentication con caché token -> usuario (ver finances/authentication.py)
+        'finances.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # JSON con orjson si está instalado, misma salida que el JSONRenderer de DRF
+    # (ver finances/renderers.py y finances/parsers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'finances.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'finances.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Paginación por cursor de los listados de transacciones (finances.pagination.FechaCursorPagination)
+# API_PAGINATION_MODE=opt-in pagina solo si el cliente envía ?cursor= o ?page_size= (compatibilidad);
+# API_PAGINATION_MODE=always pagina todas las respuestas de listado.
+API_PAGINATION_MODE = os.getenv('API_PAGINATION_MODE', 'opt-in')
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', '100'))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '1000'))
+
+# Caché (LocMemCache por defecto). Para varios workers de gunicorn conviene un backend
+# compartido, p. ej. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# y CACHE_LOCATION=redis://host:6379/1
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'gestor-finanzas'),
+    }
 }
 
+# Caché de membresías de grupo (finances.membership)
+MEMBERSHIP_CACHE_ALIAS = 'default'
+MEMBERSHIP_CACHE_TTL = int(os.getenv('MEMBERSHIP_CACHE_TTL', '300'))
+
+# Caché en memoria de tokens de autenticación (finances.authentication.CachedTokenAuthentication)
+TOKEN_AUTH_CACHE_TTL = int(os.getenv('TOKEN_AUTH_CACHE_TTL', '60'))
+TOKEN_AUTH_CACHE_SIZE = int(os.getenv('TOKEN_AUTH_CACHE_SIZE', '10000'))
+
+# Importación masiva de movimientos (POST /api/movimientos/import/)
+IMPORT_MAX_ROWS = int(os.getenv('IMPORT_MAX_ROWS', '100000'))
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '2000'))
+
+# Perfilado por petición (finances.profiling.ProfilingMiddleware): cabeceras Server-Timing y
+# X-Query-Count, y log de peticiones más lentas que PROFILING_SLOW_MS. Desactivado no tiene costo.
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() in ('1', 'true', 'yes')
+PROFILING_SLOW_MS = int(os.getenv('PROFILING_SLOW_MS', '500'))
+
+# Métricas Prometheus en /metrics (finances.metrics). Con varios workers de gunicorn define
+# PROMETHEUS_MULTIPROC_DIR para sumar los valores de todos. METRICS_TOKEN protege el endpoint:
+# sin él las métricas solo se activan con DEBUG, para no dejar /metrics público en producción.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_ENABLED = (
+    os.getenv('METRICS_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+    and (DEBUG or bool(METRICS_TOKEN))
+)
+
 MIDDLEWARE = [
+    # Primero para medir la petición completa; se retira solo si PROFILING_ENABLED es False
+    'finances.profiling.ProfilingMiddleware',
+    'finances.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     # Whitenoise para servir archivos estáticos en producción (Railway)
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -104,16 +162,21 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
 # Base de datos: si hay DATABASE_URL (Postgres en Railway) usarla; si no, fallback a sqlite local.
+# CONN_MAX_AGE=0 cierra la conexión al terminar cada petición (gunicorn.conf.py lo fuerza al servir backend.asgi).
 DATABASE_URL = os.getenv('DATABASE_URL')
 if DATABASE_URL:
     DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL, conn_max_age=600, ssl_require=False)
+        'default': dj_database_url.parse(DATABASE_URL, conn_max_age=int(os.getenv('CONN_MAX_AGE', '600')), ssl_require=False)
     }
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Base de tests en archivo: en la base en memoria (caché compartida) un
+            # hilo no puede esperar el bloqueo de otro, y finances/tests/test_concurrencia.py
+            # escribe desde varios hilos a la vez.
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 
@@ -186,8 +249,12 @@ CORS_ALLOW_HEADERS = [
     'origin',
     'user-agent',
     'x-csrftoken',
+    'if-none-match',
 ]
 
+# GET condicional de los listados (ver finances/versiones.py): el cliente puede leer el ETag
+CORS_EXPOSE_HEADERS = ['etag']
+
 # In development you may instead set:
 # CORS_ALLOW_ALL_ORIGINS = True
 
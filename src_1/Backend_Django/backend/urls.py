@@ -17,6 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework import routers
+from finances import async_views as finances_async_views
 from finances import views as finances_views
 from rest_framework.authtoken import views as drf_authtoken_views
 
@@ -31,11 +32,18 @@ router.register(r'egresos', finances_views.EgresoViewSet)
 router.register(r'movimientos', finances_views.MovimientoViewSet)
 router.register(r'usuario-grupo', finances_views.UsuarioGrupoViewSet)
 router.register(r'aportaciones', finances_views.AportacionViewSet)
+router.register(r'dashboard', finances_views.DashboardViewSet, basename='dashboard')
+router.register(r'stats', finances_views.StatsViewSet, basename='stats')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
+    # Variantes async de solo lectura (ver finances/async_views.py)
+    path('api/async/dashboard/summary/', finances_async_views.dashboard_summary, name='async-dashboard-summary'),
+    path('api/async/stats/series/', finances_async_views.stats_series, name='async-stats-series'),
     path('api-token-auth/', drf_authtoken_views.obtain_auth_token, name='api_token_auth'),
         path('api/register/', finances_views.RegisterAPIView.as_view(), name='api_register'),
     path('health/', finances_views.HealthCheckAPIView.as_view(), name='health'),
+    path('metrics', finances_views.MetricsAPIView.as_view(), name='metrics'),
+    path('api/admin/reconcile/', finances_views.ReconciliacionAPIView.as_view(), name='admin-reconcile'),
 ]
@@ -0,0 +1,337 @@
+"""
+Latencia (p50/p95/p99) y throughput de todas las rutas del API de finances.
+
+Para cada tamaño de --sizes (transacciones por usuario) crea la base de pruebas,
+la llena con `manage.py seed_finances` y mide cada escenario de ESCENARIOS con
+el cliente de pruebas de Django, autenticado por token como un cliente real. El
+usuario medido es el creador (admin) de un grupo sembrado.
+
+Cada ruta del DefaultRouter de backend/urls.py (listado, detalle y acciones)
+debe tener al menos un escenario: una ruta nueva sin escenario hace fallar el
+script, así todo cambio de rendimiento tiene un número.
+
+Con --compare se comparan los p50 con un JSON anterior del mismo script; una
+ruta más lenta que --max-regression (fracción) y que --min-delta-ms sale con
+código 1, igual que una respuesta con un estado inesperado.
+
+Uso:
+    python benchmarks/api_suite.py --sizes 50,500 --json antes.json
+    python benchmarks/api_suite.py --sizes 50,500 --json despues.json --compare antes.json
+    DATABASE_URL=postgresql://... python benchmarks/api_suite.py --sizes 100,1000,10000 --users 200
+"""
+import argparse
+import datetime
+import itertools
+import json
+import subprocess
+import sys
+import time
+
+import common
+
+HOY = datetime.date.today().isoformat()
+
+
+class Contexto:
+    """Ids de los datos sembrados que usan los escenarios, y un contador para nombres únicos."""
+
+    def __init__(self, usuario, client):
+        self.usuario = usuario
+        self.client = client
+        self.contador = itertools.count(1)
+        # Lo que preparó el escenario en curso (ver _escenario), consumido con siguiente()
+        self.preparado = []
+
+    def n(self):
+        return next(self.contador)
+
+    def siguiente(self):
+        return self.preparado.pop()
+
+
+def _crear(ctx, ruta, cuerpo, campo):
+    respuesta = ctx.client.post(ruta, cuerpo, format='json')
+    assert respuesta.status_code == 201, (ruta, respuesta.status_code, respuesta.content[:300])
+    return respuesta.data[campo]
+
+
+def _ingreso(ctx):
+    return {'monto': '1000.00', 'fecha': HOY, 'descripcion': 'bench ingreso',
+            'bolsillo': ctx.principal, 'categoria': ctx.categoria_ing}
+
+
+def _egreso(ctx):
+    return {'monto': '1000.00', 'fecha': HOY, 'descripcion': 'bench egreso',
+            'bolsillo': ctx.principal, 'categoria': ctx.categoria_eg}
+
+
+def _importacion(ctx):
+    return {'movimientos': [
+        {'tipo': 'ing' if i % 2 else 'eg', 'monto': '100.00', 'fecha': HOY, 'descripcion': f'importado {i}',
+         'bolsillo': ctx.principal}
+        for i in range(50)
+    ]}
+
+
+def _escenario(nombre, ruta, metodo='get', cuerpo=None, preparar=None, estado=200):
+    """
+    ruta y cuerpo reciben el Contexto; preparar(ctx, n) crea antes de medir lo
+    que consumen n llamadas (p. ej. las filas que borra un DELETE).
+    """
+    return {'nombre': nombre, 'ruta': ruta, 'metodo': metodo, 'cuerpo': cuerpo, 'preparar': preparar, 'estado': estado}
+
+
+ESCENARIOS = [
+    _escenario('api-root', lambda c: '/api/'),
+    # usuarios
+    _escenario('usuarios.list', lambda c: '/api/usuarios/'),
+    _escenario('usuarios.retrieve', lambda c: f'/api/usuarios/{c.usuario.pk}/'),
+    _escenario('usuarios.me', lambda c: '/api/usuarios/me/'),
+    _escenario('usuarios.check-email', lambda c: f'/api/usuarios/check-email/?email={c.usuario.email}'),
+    # grupos
+    _escenario('grupos.list', lambda c: '/api/grupos/'),
+    _escenario('grupos.retrieve', lambda c: f'/api/grupos/{c.grupo}/'),
+    _escenario('grupos.partial_update', lambda c: f'/api/grupos/{c.grupo}/', 'patch',
+               lambda c: {'descripcion': f'bench {c.n()}'}),
+    # bolsillos
+    _escenario('bolsillos.list', lambda c: '/api/bolsillos/'),
+    _escenario('bolsillos.list_grupo', lambda c: f'/api/bolsillos/?grupo_id={c.grupo}'),
+    _escenario('bolsillos.retrieve', lambda c: f'/api/bolsillos/{c.principal}/'),
+    _escenario('bolsillos.create', lambda c: '/api/bolsillos/', 'post',
+               lambda c: {'nombre': f'bench {c.n()}', 'saldo': '0'}, estado=201),
+    _escenario('bolsillos.partial_update', lambda c: f'/api/bolsillos/{c.ahorros}/', 'patch',
+               lambda c: {'color': '#22c55e' if c.n() % 2 else '#3b82f6'}),
+    _escenario('bolsillos.history', lambda c: f'/api/bolsillos/{c.principal}/history/'),
+    # categorías
+    _escenario('categorias.list', lambda c: '/api/categorias/'),
+    _escenario('categorias.retrieve', lambda c: f'/api/categorias/{c.categoria_eg}/'),
+    _escenario('categorias.create', lambda c: '/api/categorias/', 'post',
+               lambda c: {'nombre': f'bench {c.n()}', 'tipo': 'eg'}, estado=201),
+    # transferencias
+    _escenario('transferencias.list', lambda c: '/api/transferencias/?page_size=50'),
+    _escenario('transferencias.retrieve', lambda c: f'/api/transferencias/{c.transferencia}/'),
+    _escenario('transferencias.history', lambda c: '/api/transferencias/history/?page_size=50'),
+    # ingresos y egresos
+    _escenario('ingresos.list', lambda c: '/api/ingresos/'),
+    _escenario('ingresos.list_pagina', lambda c: '/api/ingresos/?page_size=50'),
+    _escenario('ingresos.list_grupo', lambda c: f'/api/ingresos/?grupo_id={c.grupo}'),
+    _escenario('ingresos.retrieve', lambda c: f'/api/ingresos/{c.ingreso}/'),
+    _escenario('ingresos.create', lambda c: '/api/ingresos/', 'post', _ingreso, estado=201),
+    _escenario('ingresos.partial_update', lambda c: f'/api/ingresos/{c.ingreso}/', 'patch',
+               lambda c: {'monto': f'{1000 + c.n() % 2}.00'}),
+    _escenario('ingresos.destroy', lambda c: f'/api/ingresos/{c.siguiente()}/', 'delete', estado=204,
+               preparar=lambda c, n: [_crear(c, '/api/ingresos/', _ingreso(c), 'ingreso_id') for _ in range(n)]),
+    _escenario('egresos.list', lambda c: '/api/egresos/'),
+    _escenario('egresos.list_pagina', lambda c: '/api/egresos/?page_size=50'),
+    _escenario('egresos.list_grupo', lambda c: f'/api/egresos/?grupo_id={c.grupo}'),
+    _escenario('egresos.retrieve', lambda c: f'/api/egresos/{c.egreso}/'),
+    _escenario('egresos.create', lambda c: '/api/egresos/', 'post', _egreso, estado=201),
+    _escenario('egresos.partial_update', lambda c: f'/api/egresos/{c.egreso}/', 'patch',
+               lambda c: {'monto': f'{1000 + c.n() % 2}.00'}),
+    _escenario('egresos.destroy', lambda c: f'/api/egresos/{c.siguiente()}/', 'delete', estado=204,
+               preparar=lambda c, n: [_crear(c, '/api/egresos/', _egreso(c), 'egreso_id') for _ in range(n)]),
+    # movimientos
+    _escenario('movimientos.list', lambda c: '/api/movimientos/?page_size=50'),
+    _escenario('movimientos.retrieve', lambda c: f'/api/movimientos/{c.movimiento}/'),
+    _escenario('movimientos.export', lambda c: '/api/movimientos/export/?format=ndjson'),
+    _escenario('movimientos.search', lambda c: '/api/movimientos/search/?q=mercado'),
+    _escenario('movimientos.import', lambda c: '/api/movimientos/import/', 'post', _importacion, estado=201),
+    _escenario('movimientos.transferir', lambda c: '/api/movimientos/transferir/', 'post',
+               lambda c: {'bolsillo_origen_id': c.principal, 'bolsillo_destino_id': c.ahorros, 'monto': '1000'}),
+    # usuario-grupo
+    _escenario('usuario-grupo.list', lambda c: '/api/usuario-grupo/'),
+    _escenario('usuario-grupo.retrieve', lambda c: f'/api/usuario-grupo/{c.usuario_grupo}/'),
+    _escenario('usuario-grupo.members', lambda c: f'/api/usuario-grupo/members/{c.grupo}/'),
+    _escenario('usuario-grupo.add-by-email', lambda c: '/api/usuario-grupo/add-by-email/', 'post',
+               lambda c: {'email': c.siguiente(), 'grupo_id': c.grupo}, estado=201,
+               preparar=lambda c, n: c.candidatos(n)),
+    _escenario('usuario-grupo.change-role', lambda c: '/api/usuario-grupo/change-role/', 'post',
+               lambda c: {'usuario_id': c.miembro, 'grupo_id': c.grupo,
+                          'nuevo_rol': 'admin' if c.n() % 2 else 'miembro'}),
+    # aportaciones
+    _escenario('aportaciones.list', lambda c: '/api/aportaciones/'),
+    _escenario('aportaciones.retrieve', lambda c: f'/api/aportaciones/{c.aportacion}/'),
+    _escenario('aportaciones.aportar', lambda c: '/api/aportaciones/aportar/', 'post',
+               lambda c: {'grupo_id': c.grupo, 'bolsillo_usuario_id': c.principal, 'bolsillo_grupo_id': c.general,
+                          'monto': '1000', 'fecha': HOY}, estado=201),
+    # resúmenes
+    _escenario('dashboard.summary', lambda c: '/api/dashboard/summary/'),
+    _escenario('dashboard.summary_grupo', lambda c: f'/api/dashboard/summary/?grupo_id={c.grupo}'),
+    _escenario('stats.series', lambda c: '/api/stats/series/?periods=12'),
+]
+
+
+def preparar_contexto(client_class):
+    """Elegir el usuario medido y los ids que usan los escenarios (crea lo que falte vía API)."""
+    from rest_framework.authtoken.models import Token
+    from finances import models
+
+    grupo = models.Grupo.objects.filter(creador__isnull=False).order_by('pk').first()
+    usuario = grupo.creador
+    client = client_class()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get_or_create(user=usuario)[0].key}')
+    ctx = Contexto(usuario, client)
+    ctx.grupo = grupo.pk
+    bolsillos = dict(models.Bolsillo.objects.filter(usuario=usuario).values_list('nombre', 'pk'))
+    ctx.principal, ctx.ahorros = bolsillos['Cuenta principal'], bolsillos['Ahorros']
+    ctx.general = models.Bolsillo.objects.get(grupo=grupo, nombre='General').pk
+    categorias = models.Categoria.objects.filter(usuario=usuario)
+    ctx.categoria_ing = categorias.filter(tipo='ing').order_by('pk').first().pk
+    ctx.categoria_eg = categorias.filter(tipo='eg').order_by('pk').first().pk
+
+    # Una transferencia y una aportación propias aunque el seed no haya generado ninguna
+    client.post('/api/movimientos/transferir/', {
+        'bolsillo_origen_id': ctx.principal, 'bolsillo_destino_id': ctx.ahorros, 'monto': '1000'}, format='json')
+    ctx.aportacion = _crear(ctx, '/api/aportaciones/aportar/', {
+        'grupo_id': ctx.grupo, 'bolsillo_usuario_id': ctx.principal, 'bolsillo_grupo_id': ctx.general,
+        'monto': '1000', 'fecha': HOY}, 'aportacion_id')
+    ctx.transferencia = models.Transferencia.objects.filter(creado_por=usuario).latest('pk').pk
+    ctx.movimiento = models.Movimiento.objects.filter(transferencia_id=ctx.transferencia).first().pk
+    ctx.ingreso = _crear(ctx, '/api/ingresos/', _ingreso(ctx), 'ingreso_id')
+    ctx.egreso = _crear(ctx, '/api/egresos/', _egreso(ctx), 'egreso_id')
+
+    # Un miembro que no es el creador, para cambiarle el rol
+    miembros = models.UsuarioGrupo.objects.filter(grupo=grupo)
+    ctx.usuario_grupo = miembros.get(usuario=usuario).pk
+    ctx.miembro = miembros.exclude(usuario=usuario).values_list('usuario_id', flat=True).first()
+
+    def candidatos(n):
+        emails = list(
+            models.Usuario.objects.exclude(usuariogrupo__grupo=grupo).order_by('pk').values_list('email', flat=True)[:n]
+        )
+        if len(emails) < n:
+            raise SystemExit(f'add-by-email necesita {n} usuarios fuera del grupo: usa más --users o menos --repeat')
+        return emails
+
+    ctx.candidatos = candidatos
+    return ctx
+
+
+def rutas_sin_escenario(ctx, escenarios):
+    """Nombres de ruta del router que ningún escenario ejercita."""
+    from django.urls import resolve
+    from backend.urls import router
+
+    cubiertas = set()
+    for escenario in escenarios:
+        # Solo se resuelve la ruta: un id cualquiera en lugar de lo que crearía preparar()
+        ctx.preparado = [0]
+        cubiertas.add(resolve(escenario['ruta'](ctx).split('?')[0]).url_name)
+    return sorted({u.name for u in router.urls} - cubiertas)
+
+
+def medir(ctx, escenario, repeat):
+    """Latencias de `repeat` llamadas (más una de calentamiento) y consultas SQL de la primera."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    if escenario['preparar']:
+        ctx.preparado = escenario['preparar'](ctx, repeat + 1)
+    metodo = getattr(ctx.client, escenario['metodo'])
+    estados = set()
+
+    def llamar():
+        cuerpo = escenario['cuerpo'](ctx) if escenario['cuerpo'] else None
+        respuesta = metodo(escenario['ruta'](ctx), cuerpo, format='json') if cuerpo is not None \
+            else metodo(escenario['ruta'](ctx))
+        # Las respuestas en streaming (export) se consumen para medir la generación completa
+        if respuesta.streaming:
+            b''.join(respuesta.streaming_content)
+        estados.add(respuesta.status_code)
+
+    with CaptureQueriesContext(connection) as consultas:
+        llamar()
+    # captured_queries lee connection.queries, que cada petición siguiente reinicia
+    n_consultas = len(consultas)
+    inicio = time.perf_counter()
+    muestras = common.time_call(llamar, repeat=repeat, warmup=0)
+    total = time.perf_counter() - inicio
+    return {
+        **common.summarize(muestras),
+        'rps': round(repeat / total, 1),
+        'queries': n_consultas,
+        'estados': sorted(estados),
+    }
+
+
+def comparar(resultados, anterior, max_regresion, min_delta_ms):
+    """[(tamaño, escenario, p50 anterior, p50 actual)] más lentos que el umbral."""
+    regresiones = []
+    for tamano, escenarios in resultados.items():
+        for nombre, r in escenarios.items():
+            antes = anterior.get('resultados', {}).get(tamano, {}).get(nombre)
+            if not antes:
+                continue
+            delta = r['p50_ms'] - antes['p50_ms']
+            if delta > min_delta_ms and r['p50_ms'] > antes['p50_ms'] * (1 + max_regresion):
+                regresiones.append((tamano, nombre, antes['p50_ms'], r['p50_ms']))
+    return regresiones
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=common.BACKEND_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='50,500', help='transacciones por usuario, separadas por coma')
+    parser.add_argument('--users', type=int, default=60, help='usuarios sembrados por tamaño')
+    parser.add_argument('--groups', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20, help='llamadas medidas por escenario')
+    parser.add_argument('--only', help='medir solo los escenarios que empiezan por este prefijo (p. ej. ingresos)')
+    parser.add_argument('--json', help='guardar los resultados en este archivo')
+    parser.add_argument('--compare', help='JSON de una corrida anterior contra el que comparar los p50')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='aumento máximo del p50 respecto a --compare (fracción, default 0.25)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='ignorar aumentos menores a estos ms (ruido en rutas rápidas)')
+    args = parser.parse_args()
+
+    common.setup_django()
+    from django.core.management import call_command
+    from rest_framework.test import APIClient
+
+    escenarios = [e for e in ESCENARIOS if not args.only or e['nombre'].startswith(args.only)]
+    resultados = {}
+    fallos = []
+    vendor = None
+    for tamano in [int(s) for s in args.sizes.split(',')]:
+        with common.bench_database() as connection:
+            vendor = connection.vendor
+            print(f'\n== {tamano} transacciones por usuario ({args.users} usuarios, {vendor}) ==')
+            call_command('seed_finances', users=args.users, groups=args.groups, tx_per_user=tamano, verbosity=0)
+            ctx = preparar_contexto(APIClient)
+            if not args.only:
+                faltan = rutas_sin_escenario(ctx, escenarios)
+                if faltan:
+                    fallos.append(f'rutas sin escenario: {", ".join(faltan)}')
+
+            resultados[str(tamano)] = por_escenario = {}
+            print(f'{"escenario":30} {"p50":>9} {"p95":>9} {"p99":>9} {"req/s":>8} {"queries":>8}')
+            for escenario in escenarios:
+                r = por_escenario[escenario['nombre']] = medir(ctx, escenario, args.repeat)
+                inesperados = [e for e in r['estados'] if e != escenario['estado']]
+                if inesperados:
+                    fallos.append(f'{tamano} {escenario["nombre"]}: estado {inesperados}, se esperaba {escenario["estado"]}')
+                print(f'{escenario["nombre"]:30} {r["p50_ms"]:7.2f}ms {r["p95_ms"]:7.2f}ms {r["p99_ms"]:7.2f}ms '
+                      f'{r["rps"]:8.1f} {r["queries"]:8}' + (f'  ESTADO {inesperados}' if inesperados else ''))
+
+    if args.compare:
+        with open(args.compare) as f:
+            for tamano, nombre, antes, ahora in comparar(resultados, json.load(f), args.max_regression, args.min_delta_ms):
+                fallos.append(f'regresión {tamano} {nombre}: p50 {antes:.2f}ms -> {ahora:.2f}ms')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'vendor': vendor, 'commit': _commit(), 'resultados': resultados}, f, indent=2)
+    for fallo in fallos:
+        print(fallo)
+    if fallos:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+Latencia de dashboard/summary y stats/series: vistas DRF bajo gunicorn WSGI
+(workers síncronos, como en el Procfile) frente a las variantes de /api/async/
+bajo gunicorn backend.asgi con workers de uvicorn y CONN_MAX_AGE=0. Ambas se
+arrancan con gunicorn.conf.py, que elige la aplicación según GUNICORN_ASGI.
+
+Crea la base de pruebas con usuarios, bolsillos y meses de ResumenMensual,
+arranca cada configuración como un proceso de gunicorn aparte contra esa base
+y lanza --concurrency clientes HTTP simultáneos (una conexión por petición).
+Imprime p50/p95/p99 por endpoint y configuración.
+
+Uso:
+    python benchmarks/async_dashboard.py --users 200 --requests 2000 --concurrency 50
+    DATABASE_URL=postgresql://... python benchmarks/async_dashboard.py --workers 4 --json out.json
+"""
+import argparse
+import datetime
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from decimal import Decimal
+
+import common
+
+ENDPOINTS = {
+    'summary': ('/api/dashboard/summary/', '/api/async/dashboard/summary/'),
+    'series': ('/api/stats/series/?periods=12', '/api/async/stats/series/?periods=12'),
+}
+
+
+def generar_datos(usuarios, meses, categorias):
+    from rest_framework.authtoken.models import Token
+    from finances import models
+
+    print(f'Generando {usuarios} usuarios con {meses} meses de resumen y {categorias} categorías...')
+    models.Usuario.objects.bulk_create([
+        models.Usuario(email=f'bench{i}@example.com', nombre=f'bench{i}', password='!') for i in range(usuarios)
+    ])
+    ids = list(models.Usuario.objects.filter(email__startswith='bench').values_list('pk', flat=True))
+    tokens = [Token(key=Token.generate_key(), user_id=pk) for pk in ids]
+    Token.objects.bulk_create(tokens)
+    models.Bolsillo.objects.bulk_create([
+        models.Bolsillo(usuario_id=pk, nombre=f'B{j}', saldo=Decimal(1000 * (j + 1))) for pk in ids for j in range(3)
+    ])
+    models.Categoria.objects.bulk_create([
+        models.Categoria(usuario_id=pk, nombre=f'c{j}', tipo='eg') for pk in ids for j in range(categorias)
+    ])
+    cats = {}
+    for pk, usuario_id in models.Categoria.objects.values_list('pk', 'usuario_id'):
+        cats.setdefault(usuario_id, []).append(pk)
+
+    hoy = datetime.date.today().replace(day=1)
+    inicios = []
+    for i in range(meses):
+        year, month = divmod(hoy.year * 12 + hoy.month - 1 - i, 12)
+        inicios.append(datetime.date(year, month + 1, 1))
+    rnd = random.Random(1)
+    filas = []
+    for pk in ids:
+        for mes in inicios:
+            filas.append(models.ResumenMensual(
+                usuario_id=pk, mes=mes, tipo='ing', total=Decimal(rnd.randint(1000, 5000)), conteo=rnd.randint(1, 5),
+            ))
+            for categoria_id in cats[pk]:
+                filas.append(models.ResumenMensual(
+                    usuario_id=pk, categoria_id=categoria_id, mes=mes, tipo='eg',
+                    total=Decimal(rnd.randint(10, 900)), conteo=rnd.randint(1, 20),
+                ))
+    models.ResumenMensual.objects.bulk_create(filas, batch_size=2000)
+    return [t.key for t in tokens]
+
+
+def database_url(connection):
+    db = connection.settings_dict
+    if connection.vendor == 'sqlite':
+        return f'sqlite:///{db["NAME"]}'
+    puerto = f':{db["PORT"]}' if db.get('PORT') else ''
+    return f'postgresql://{db["USER"]}:{db["PASSWORD"]}@{db["HOST"]}{puerto}/{db["NAME"]}'
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def arrancar(asgi, workers, url_db):
+    puerto = puerto_libre()
+    env = dict(os.environ, DATABASE_URL=url_db, DEBUG='False', PROFILING_ENABLED='False')
+    env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    # La misma configuración que el despliegue: gunicorn.conf.py elige app, workers y CONN_MAX_AGE
+    env['GUNICORN_ASGI'] = 'True' if asgi else 'False'
+    proceso = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{puerto}', '--workers', str(workers),
+         '--log-level', 'warning'],
+        cwd=common.BACKEND_DIR, env=env,
+    )
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        try:
+            conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=1)
+            conexion.request('GET', '/health/')
+            if conexion.getresponse().status == 200:
+                return proceso, puerto
+        except OSError:
+            time.sleep(0.2)
+    proceso.terminate()
+    raise RuntimeError('gunicorn no respondió en /health/')
+
+
+def medir(puerto, ruta, tokens, peticiones, concurrencia):
+    """Latencias en ms de `peticiones` GET repartidas entre `concurrencia` hilos."""
+    latencias = []
+    errores = []
+    lock = threading.Lock()
+    restantes = iter(range(peticiones))
+
+    def cliente(semilla):
+        rnd = random.Random(semilla)
+        propias = []
+        while True:
+            with lock:
+                if next(restantes, None) is None:
+                    break
+            headers = {'Authorization': f'Token {rnd.choice(tokens)}'}
+            inicio = time.perf_counter()
+            conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+            try:
+                conexion.request('GET', ruta, headers=headers)
+                respuesta = conexion.getresponse()
+                respuesta.read()
+                if respuesta.status != 200:
+                    errores.append(respuesta.status)
+            except OSError as exc:
+                errores.append(type(exc).__name__)
+            finally:
+                conexion.close()
+            propias.append((time.perf_counter() - inicio) * 1000)
+        with lock:
+            latencias.extend(propias)
+
+    hilos = [threading.Thread(target=cliente, args=(i,)) for i in range(concurrencia)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return latencias, time.perf_counter() - inicio, errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--months', type=int, default=24)
+    parser.add_argument('--categories', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=2000, help='peticiones por endpoint y configuración')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=2, help='workers de gunicorn en ambas configuraciones')
+    parser.add_argument('--json', help='guardar los resultados en este archivo')
+    parser.add_argument('--keepdb', action='store_true')
+    args = parser.parse_args()
+
+    common.setup_django()
+    resultados = {}
+    with common.bench_database(keepdb=args.keepdb) as connection:
+        from finances import models
+
+        if not models.ResumenMensual.objects.exists():
+            tokens = generar_datos(args.users, args.months, args.categories)
+        else:
+            from rest_framework.authtoken.models import Token
+            tokens = list(Token.objects.values_list('key', flat=True))
+        url_db = database_url(connection)
+        # El servidor abre sus propias conexiones: cerrar la de este proceso (SQLite bloquea el archivo)
+        connection.close()
+
+        for modo, asgi in (('wsgi', False), ('asgi', True)):
+            proceso, puerto = arrancar(asgi, args.workers, url_db)
+            try:
+                for nombre, rutas in ENDPOINTS.items():
+                    ruta = rutas[1] if asgi else rutas[0]
+                    medir(puerto, ruta, tokens, min(args.concurrency * 2, args.requests), args.concurrency)  # calentamiento
+                    latencias, duracion, errores = medir(puerto, ruta, tokens, args.requests, args.concurrency)
+                    resumen = common.summarize(latencias)
+                    resumen.update({'ruta': ruta, 'rps': round(len(latencias) / duracion, 1), 'errores': len(errores)})
+                    resultados[f'{nombre}:{modo}'] = resumen
+            finally:
+                proceso.terminate()
+                proceso.wait(timeout=30)
+
+    print(f'\n{"endpoint":<10} {"modo":<5} {"rps":>8} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"errores":>8}')
+    for clave, r in resultados.items():
+        nombre, modo = clave.split(':')
+        print(f'{nombre:<10} {modo:<5} {r["rps"]:>8} {r["p50_ms"]:>9} {r["p95_ms"]:>9} {r["p99_ms"]:>9} {r["errores"]:>8}')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'resultados': resultados}, f, indent=2)
+    if any(r['errores'] for r in resultados.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
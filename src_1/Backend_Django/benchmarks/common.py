@@ -0,0 +1,82 @@
+"""
+Utilidades compartidas por los scripts de benchmarks/.
+
+Los benchmarks nunca tocan la base de datos configurada: crean (y borran al
+terminar, salvo --keepdb) la base de pruebas de Django, igual que manage.py test.
+Con DATABASE_URL apuntando a Postgres se usa test_<nombre>; con SQLite se usa un
+archivo benchmarks/bench.sqlite3 en lugar de la base en memoria.
+"""
+import contextlib
+import math
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+    from django.conf import settings
+
+    django.setup()
+    from django.db import connection
+
+    # settings_dict es compartido por todas las conexiones (también las de otros hilos)
+    db = connection.settings_dict
+    if connection.vendor == 'sqlite' and not db['TEST'].get('NAME'):
+        db['TEST']['NAME'] = str(BACKEND_DIR / 'benchmarks' / 'bench.sqlite3')
+    # Los benchmarks miden el API, no los archivos estáticos
+    settings.STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+
+
+@contextlib.contextmanager
+def bench_database(keepdb=False):
+    """Crear la base de pruebas, migrarla y destruirla al salir (salvo keepdb)."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def percentile(values, pct):
+    """Percentil por rango más cercano (pct entre 0 y 100)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[k]
+
+
+def time_call(fn, repeat=20, warmup=2):
+    """Ejecutar fn repetidas veces y devolver las latencias en milisegundos."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples):
+    return {
+        'n': len(samples),
+        'mean_ms': round(statistics.fmean(samples), 3) if samples else 0.0,
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+    }
@@ -0,0 +1,129 @@
+"""
+Prueba de estrés de finances.balances: N escritores concurrentes sobre el mismo
+bolsillo General de un grupo a través del API (ingresos, egresos y transferencias).
+
+Al terminar compacta los asientos pendientes del diario (balances.compactar) y
+compara el saldo guardado con el esperado y con el historial de
+ingresos/egresos; sale con código 1 si se perdió alguna actualización.
+
+Uso:
+    python benchmarks/concurrent_balance.py --writers 200 --ops 5
+    DATABASE_URL=postgresql://... python benchmarks/concurrent_balance.py --writers 200
+"""
+import argparse
+import sys
+import threading
+import time
+from decimal import Decimal
+
+import common
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=200)
+    parser.add_argument('--ops', type=int, default=5, help='operaciones por escritor')
+    args = parser.parse_args()
+
+    common.setup_django()
+    from django.db import connection, connections
+
+    if connection.vendor == 'sqlite':
+        # SQLite no tiene SELECT ... FOR UPDATE: serializar escritores con BEGIN IMMEDIATE
+        connection.settings_dict['OPTIONS'].update({'timeout': 60, 'transaction_mode': 'IMMEDIATE'})
+    from django.db.models import Q, Sum
+    from rest_framework.test import APIClient
+    from finances import balances, models, reconciliacion
+
+    with common.bench_database():
+        admin = models.Usuario.objects.create_user(email='stress-admin@example.com', password='x')
+        grupo = models.Grupo.objects.create(nombre='stress', creador=admin)
+        usuarios = [
+            models.Usuario(email=f'stress{i}@example.com', nombre=f'stress{i}', password='!')
+            for i in range(args.writers)
+        ]
+        models.Usuario.objects.bulk_create(usuarios)
+        usuarios = list(models.Usuario.objects.filter(email__startswith='stress').exclude(pk=admin.pk))
+        models.UsuarioGrupo.objects.bulk_create(
+            [models.UsuarioGrupo(usuario=u, grupo=grupo, rol='miembro') for u in usuarios]
+        )
+        general = models.Bolsillo.objects.create(grupo=grupo, nombre='General', saldo=0)
+        apartado = models.Bolsillo.objects.create(grupo=grupo, nombre='Apartado', saldo=0)
+        if connection.vendor == 'sqlite':
+            connection.close()
+
+        errores = []
+        barrera = threading.Barrier(args.writers)
+
+        def escritor(usuario):
+            client = APIClient()
+            client.force_authenticate(usuario)
+            try:
+                barrera.wait()
+                for _ in range(args.ops):
+                    # +3 al General, -1 del General, y una transferencia ida y vuelta
+                    pasos = [
+                        ('/api/ingresos/', {'monto': '3.00', 'fecha': '2025-01-01', 'bolsillo': general.pk, 'grupo_id': grupo.pk}),
+                        ('/api/egresos/', {'monto': '1.00', 'fecha': '2025-01-01', 'bolsillo': general.pk, 'grupo_id': grupo.pk}),
+                        ('/api/movimientos/transferir/', {'bolsillo_origen_id': general.pk, 'bolsillo_destino_id': apartado.pk, 'monto': '1.00'}),
+                        ('/api/movimientos/transferir/', {'bolsillo_origen_id': apartado.pk, 'bolsillo_destino_id': general.pk, 'monto': '1.00'}),
+                    ]
+                    for url, data in pasos:
+                        r = client.post(url, data, format='json')
+                        if r.status_code >= 300:
+                            errores.append((url, r.status_code, getattr(r, 'data', None)))
+            finally:
+                connections.close_all()
+
+        hilos = [threading.Thread(target=escritor, args=(u,)) for u in usuarios]
+        inicio = time.perf_counter()
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        duracion = time.perf_counter() - inicio
+
+        # Entradas de transferencias que la compactación al confirmar saltó (destino bloqueado)
+        pendientes = balances.compactar()
+        print(f'{pendientes} asientos pendientes compactados al final')
+        general.refresh_from_db()
+        apartado.refresh_from_db()
+        ingresos = models.Ingreso.objects.filter(bolsillo=general).aggregate(t=Sum('monto'))['t'] or 0
+        egresos = models.Egreso.objects.filter(bolsillo=general).aggregate(t=Sum('monto'))['t'] or 0
+        # Las transferencias de ida y vuelta se compensan
+        esperado = Decimal('2.00') * args.writers * args.ops
+        operaciones = args.writers * args.ops * 4
+
+        print(f'{args.writers} escritores x {args.ops} ciclos = {operaciones} operaciones en {duracion:.1f}s '
+              f'({operaciones / duracion:.0f} op/s, {connection.vendor})')
+        print(f'General: {general.saldo} (esperado {esperado}, historial {ingresos - egresos}); Apartado: {apartado.saldo}')
+        if errores:
+            print(f'{len(errores)} peticiones fallaron, p. ej.: {errores[:3]}')
+
+        # El último snapshot diario de cada bolsillo debe coincidir con su saldo
+        snapshots_ok = all(
+            models.BolsilloSnapshot.objects.filter(bolsillo=b).order_by('-fecha').values_list('saldo', flat=True).first() == b.saldo
+            for b in (general, apartado)
+        )
+        if not snapshots_ok:
+            print('Snapshots diarios desalineados con el saldo')
+
+        # El resumen mensual del grupo debe cuadrar con sus ingresos/egresos
+        resumen = models.ResumenMensual.objects.filter(grupo=grupo).aggregate(
+            ing=Sum('total', filter=Q(tipo='ing')), eg=Sum('total', filter=Q(tipo='eg')))
+        resumen_ok = (resumen['ing'] or 0) == ingresos and (resumen['eg'] or 0) == egresos
+        if not resumen_ok:
+            print(f'Resumen mensual desalineado: {resumen} vs ingresos {ingresos}, egresos {egresos}')
+
+        # La conciliación no debe encontrar diferencias entre saldo e historial
+        _, diferencias = reconciliacion.revisar(general.pk, apartado.pk + 1)
+        if diferencias:
+            print(f'Conciliación con diferencias: {diferencias}')
+
+        ok = not errores and snapshots_ok and resumen_ok and not diferencias and general.saldo == esperado == ingresos - egresos and apartado.saldo == 0
+        print('OK: no se perdió ninguna actualización' if ok else 'FALLO: saldo inconsistente')
+        return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
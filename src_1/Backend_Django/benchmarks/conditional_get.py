@@ -0,0 +1,76 @@
+"""
+Costo de revalidar los listados con If-None-Match (304) frente a descargarlos
+completos (200), para un usuario con --rows ingresos y egresos.
+
+Uso:
+    python benchmarks/conditional_get.py --rows 2000
+    DATABASE_URL=postgresql://... python benchmarks/conditional_get.py --rows 5000 --json out.json
+"""
+import argparse
+import datetime
+import json
+import sys
+
+import common
+
+RUTAS = ('/api/bolsillos/', '/api/categorias/', '/api/ingresos/', '/api/egresos/')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000, help='ingresos y egresos del usuario (cada uno)')
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--json', help='guardar los resultados en este archivo')
+    args = parser.parse_args()
+
+    common.setup_django()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+    from finances import models
+
+    resultados = {}
+    fallo = False
+    with common.bench_database():
+        usuario = models.Usuario.objects.create_user(email='etag@example.com', password='x', nombre='etag')
+        bolsillos = [models.Bolsillo.objects.create(usuario=usuario, nombre=f'b{i}', saldo=0) for i in range(5)]
+        categorias = [models.Categoria.objects.create(usuario=usuario, nombre=f'c{i}', tipo='ing') for i in range(10)]
+        fecha = datetime.date(2025, 1, 1)
+        for modelo in (models.Ingreso, models.Egreso):
+            modelo.objects.bulk_create([
+                modelo(usuario=usuario, creado_por=usuario, bolsillo=bolsillos[i % 5], categoria=categorias[i % 10],
+                       monto=i % 1000 + 1, fecha=fecha + datetime.timedelta(days=i % 365), descripcion=f'fila {i}')
+                for i in range(args.rows)
+            ], batch_size=1000)
+        client = APIClient()
+        client.force_authenticate(usuario)
+
+        print(f'{"ruta":18} {"200 p50":>10} {"304 p50":>10} {"queries 304":>12} {"bytes 200":>10}')
+        for ruta in RUTAS:
+            respuesta = client.get(ruta)
+            etag = respuesta['ETag']
+            completo = common.summarize(common.time_call(lambda: client.get(ruta), repeat=args.repeat))
+            condicional = common.summarize(common.time_call(
+                lambda: client.get(ruta, HTTP_IF_NONE_MATCH=etag), repeat=args.repeat))
+            with CaptureQueriesContext(connection) as consultas:
+                estado = client.get(ruta, HTTP_IF_NONE_MATCH=etag).status_code
+            fallo |= estado != 304
+            resultados[ruta] = {
+                'completo': completo,
+                'condicional': condicional,
+                'queries_304': len(consultas),
+                'bytes_200': len(respuesta.content),
+                'estado_condicional': estado,
+            }
+            print(f'{ruta:18} {completo["p50_ms"]:8.2f}ms {condicional["p50_ms"]:8.2f}ms '
+                  f'{len(consultas):12} {len(respuesta.content):10,}' + ('' if estado == 304 else f'  ERROR {estado}'))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'resultados': resultados}, f, indent=2)
+    if fallo:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
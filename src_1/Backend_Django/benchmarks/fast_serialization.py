@@ -0,0 +1,91 @@
+"""
+Listado de ingresos con IngresoSerializer frente a la lectura rápida de
+finances/serializacion.py (?fast=1), para un usuario con --rows ingresos.
+
+Mide tres cosas por camino:
+  - datos: consulta + construcción de la lista de dicts (lo que reemplaza ?fast=1:
+    instanciar modelos y relaciones y serializarlos);
+  - serialización: solo la construcción de dicts, con las filas ya leídas;
+  - api: GET /api/ingresos/ completo (incluye render JSON).
+Comprueba que ambos caminos producen los mismos datos y sale con código 1 si
+la mejora de "datos" es menor que --min-speedup.
+
+Uso:
+    python benchmarks/fast_serialization.py --rows 50000
+"""
+import argparse
+import datetime
+import json
+import sys
+
+import common
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-speedup', type=float, default=5.0)
+    parser.add_argument('--json', help='guardar los resultados en este archivo')
+    args = parser.parse_args()
+
+    common.setup_django()
+    from rest_framework.test import APIClient
+    from finances import models, serializacion, serializers, views
+
+    resultados = {}
+    with common.bench_database():
+        usuario = models.Usuario.objects.create_user(email='fast@example.com', password='x', nombre='fast')
+        bolsillos = [models.Bolsillo.objects.create(usuario=usuario, nombre=f'b{i}', saldo=0) for i in range(5)]
+        categorias = [models.Categoria.objects.create(usuario=usuario, nombre=f'c{i}', tipo='ing') for i in range(10)]
+        fecha = datetime.date(2025, 1, 1)
+        models.Ingreso.objects.bulk_create([
+            models.Ingreso(usuario=usuario, creado_por=usuario, bolsillo=bolsillos[i % 5], categoria=categorias[i % 10],
+                           monto=i % 1000 + 1, fecha=fecha + datetime.timedelta(days=i % 365), descripcion=f'fila {i}')
+            for i in range(args.rows)
+        ], batch_size=2000)
+
+        def queryset():
+            # El mismo queryset que IngresoViewSet.get_queryset() para datos personales
+            return views._con_relaciones(
+                models.Ingreso.objects.filter(usuario=usuario, grupo__isnull=True), 'aportacion_ingreso'
+            ).order_by('-fecha', '-pk')
+
+        def lento():
+            return serializers.IngresoSerializer(list(queryset()), many=True).data
+
+        def rapido():
+            return serializacion.transacciones(models.Ingreso, serializacion.valores(queryset()))
+
+        iguales = json.loads(json.dumps(lento())) == rapido()
+        instancias = list(queryset())
+        filas = list(serializacion.valores(queryset()))
+        medidas = {
+            'datos': (lento, rapido),
+            'serializacion': (
+                lambda: serializers.IngresoSerializer(instancias, many=True).data,
+                lambda: serializacion.transacciones(models.Ingreso, filas),
+            ),
+        }
+        client = APIClient()
+        client.force_authenticate(usuario)
+        medidas['api'] = (lambda: client.get('/api/ingresos/'), lambda: client.get('/api/ingresos/?fast=1'))
+
+        print(f'{args.rows:,} ingresos, mismos datos en ambos caminos: {iguales}')
+        print(f'{"medida":14} {"serializer p50":>15} {"fast p50":>10} {"mejora":>7}')
+        for nombre, (a, b) in medidas.items():
+            serializer = common.summarize(common.time_call(a, repeat=args.repeat, warmup=1))
+            rapida = common.summarize(common.time_call(b, repeat=args.repeat, warmup=1))
+            mejora = serializer['p50_ms'] / rapida['p50_ms']
+            resultados[nombre] = {'serializer': serializer, 'fast': rapida, 'mejora': round(mejora, 2)}
+            print(f'{nombre:14} {serializer["p50_ms"]:13.1f}ms {rapida["p50_ms"]:8.1f}ms {mejora:6.1f}x')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'iguales': iguales, 'resultados': resultados}, f, indent=2)
+    if not iguales or resultados['datos']['mejora'] < args.min_speedup:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+"""
+Planes de ejecución y tiempos de las consultas dueño+fecha con y sin los índices
+compuestos de la migración 0011_owner_fecha_indexes.
+
+Genera un dataset sintético (10M filas por defecto, repartidas entre ingreso,
+egreso, movimiento, aportacion y transferencia) con INSERT ... SELECT en SQL,
+mide cada consulta con la migración 0010 aplicada (sin índices), aplica 0011 y
+vuelve a medir.
+
+Uso:
+    python benchmarks/index_plans.py --rows 10000000
+    DATABASE_URL=postgresql://... python benchmarks/index_plans.py --rows 10000000 --json out.json
+    python benchmarks/index_plans.py --rows 200000 --keepdb   # reutilizar datos entre corridas
+"""
+import argparse
+import datetime
+import json
+import time
+
+import common
+
+SIN_INDICES = '0010_movimiento_vista'
+CON_INDICES = '0011_owner_fecha_indexes'
+
+# Reparto de filas entre las tablas
+REPARTO = {
+    'ingreso': 0.3,
+    'egreso': 0.3,
+    'movimiento': 0.2,
+    'aportacion': 0.1,
+    'transferencia': 0.1,
+}
+
+
+def _series(vendor, n):
+    """(prefijo, origen) para generar i = 1..n en SQL."""
+    if vendor == 'postgresql':
+        return '', f'generate_series(1, {n}) AS s(i)'
+    return f'WITH RECURSIVE s(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM s WHERE i < {n})', 's'
+
+
+def _fecha(vendor, dias):
+    if vendor == 'postgresql':
+        return f"(DATE '2015-01-01' + ({dias})::int)"
+    return f"date('2015-01-01', '+' || ({dias}) || ' days')"
+
+
+def _fecha_hora(vendor, dias):
+    if vendor == 'postgresql':
+        return f"(TIMESTAMP '2015-01-01' + ({dias}) * INTERVAL '1 day')"
+    return f"datetime('2015-01-01', '+' || ({dias}) || ' days')"
+
+
+def generar_datos(connection, filas, usuarios, grupos, dias):
+    from finances import models
+
+    vendor = connection.vendor
+    print(f'Generando {filas:,} filas ({usuarios:,} usuarios, {grupos:,} grupos) en {vendor}...')
+    inicio = time.perf_counter()
+
+    models.Usuario.objects.bulk_create(
+        [models.Usuario(email=f'bench{i}@example.com', nombre=f'bench{i}', password='!') for i in range(usuarios)],
+        batch_size=5000,
+    )
+    u0 = models.Usuario.objects.order_by('usuario_id').values_list('usuario_id', flat=True).first()
+    models.Grupo.objects.bulk_create(
+        [models.Grupo(nombre=f'grupo{i}') for i in range(grupos)],
+        batch_size=5000,
+    )
+    g0 = models.Grupo.objects.order_by('grupo_id').values_list('grupo_id', flat=True).first()
+    models.Bolsillo.objects.bulk_create(
+        [models.Bolsillo(usuario_id=u0 + i, nombre='Principal') for i in range(usuarios)],
+        batch_size=5000,
+    )
+    bp0 = models.Bolsillo.objects.order_by('bolsillo_id').values_list('bolsillo_id', flat=True).first()
+    models.Bolsillo.objects.bulk_create(
+        [models.Bolsillo(grupo_id=g0 + i, nombre='General') for i in range(grupos)],
+        batch_size=5000,
+    )
+    bg0 = models.Bolsillo.objects.filter(grupo__isnull=False).order_by('bolsillo_id').values_list('bolsillo_id', flat=True).first()
+
+    u = f'({u0} + i % {usuarios})'
+    g = f'({g0} + i % {grupos})'
+    bp = f'({bp0} + i % {usuarios})'
+    bg = f'({bg0} + i % {grupos})'
+    monto = '(i % 1000 + 1)'
+    dia = f'(i % {dias})'
+    es_grupo = 'i % 5 = 0'
+
+    sentencias = {
+        'ingreso': (
+            'usuario_id, grupo_id, bolsillo_id, monto, fecha, descripcion',
+            f"CASE WHEN {es_grupo} THEN NULL ELSE {u} END, CASE WHEN {es_grupo} THEN {g} END, "
+            f"CASE WHEN {es_grupo} THEN {bg} ELSE {bp} END, {monto}, {_fecha(vendor, dia)}, 'bench'",
+        ),
+        'egreso': (
+            'usuario_id, grupo_id, bolsillo_id, monto, fecha, descripcion',
+            f"CASE WHEN {es_grupo} THEN NULL ELSE {u} END, CASE WHEN {es_grupo} THEN {g} END, "
+            f"CASE WHEN {es_grupo} THEN {bg} ELSE {bp} END, {monto}, {_fecha(vendor, dia)}, 'bench'",
+        ),
+        'movimiento': (
+            'tipo, usuario_id, grupo_id, bolsillo_id, monto, fecha, descripcion',
+            f"CASE WHEN i % 2 = 0 THEN 'ing' ELSE 'eg' END, CASE WHEN {es_grupo} THEN NULL ELSE {u} END, "
+            f"CASE WHEN {es_grupo} THEN {g} END, CASE WHEN {es_grupo} THEN {bg} ELSE {bp} END, "
+            f"{monto}, {_fecha_hora(vendor, dia)}, 'bench'",
+        ),
+        'aportacion': (
+            'usuario_id, grupo_id, bolsillo_usuario_id, bolsillo_grupo_id, monto, fecha, fecha_creacion',
+            f"{u}, {g}, {bp}, {bg}, {monto}, {_fecha(vendor, dia)}, {_fecha_hora(vendor, dia)}",
+        ),
+        'transferencia': (
+            'de_bolsillo_id, a_bolsillo_id, creado_por_id, monto_origen, monto_destino, fecha',
+            f"{bp}, ({bp0} + (i + 1) % {usuarios}), {u}, {monto}, {monto}, {_fecha_hora(vendor, dia)}",
+        ),
+    }
+
+    with connection.cursor() as cursor:
+        for tabla, (columnas, expresiones) in sentencias.items():
+            n = max(1, int(filas * REPARTO[tabla]))
+            prefijo, origen = _series(vendor, n)
+            cursor.execute(f'INSERT INTO {tabla} ({columnas}) {prefijo} SELECT {expresiones} FROM {origen}')
+            print(f'  {tabla}: {n:,} filas')
+    print(f'Datos generados en {time.perf_counter() - inicio:.1f}s')
+    return u0 + 1, g0 + 1, bp0 + 1
+
+
+def consultas(usuario_id, grupo_id, bolsillo_id):
+    """Consultas representativas de los accesos dueño+fecha de finances/views.py."""
+    from django.db.models import Sum
+    from django.db.models.functions import TruncMonth
+    from finances import models
+
+    desde = datetime.date(2023, 1, 1)
+    hasta = datetime.date(2024, 1, 1)
+    return {
+        'ingreso_personal_recientes': lambda: models.Ingreso.objects.filter(
+            usuario_id=usuario_id, grupo__isnull=True).order_by('-fecha', '-pk')[:100],
+        'ingreso_grupo_recientes': lambda: models.Ingreso.objects.filter(
+            grupo_id=grupo_id).order_by('-fecha', '-pk')[:100],
+        'egreso_personal_mensual': lambda: models.Egreso.objects.filter(
+            usuario_id=usuario_id, grupo__isnull=True, fecha__gte=desde, fecha__lt=hasta
+        ).annotate(mes=TruncMonth('fecha')).values('mes').annotate(total=Sum('monto')).order_by('mes'),
+        'egreso_grupo_mensual': lambda: models.Egreso.objects.filter(
+            grupo_id=grupo_id, fecha__gte=desde, fecha__lt=hasta
+        ).annotate(mes=TruncMonth('fecha')).values('mes').annotate(total=Sum('monto')).order_by('mes'),
+        'movimiento_usuario_recientes': lambda: models.Movimiento.objects.filter(
+            usuario_id=usuario_id, grupo__isnull=True).order_by('-fecha', '-pk')[:100],
+        'aportacion_grupo_recientes': lambda: models.Aportacion.objects.filter(
+            grupo_id=grupo_id).order_by('-fecha', '-pk')[:100],
+        'transferencia_origen_recientes': lambda: models.Transferencia.objects.filter(
+            de_bolsillo_id=bolsillo_id).order_by('-fecha', '-pk')[:100],
+        'transferencia_destino_recientes': lambda: models.Transferencia.objects.filter(
+            a_bolsillo_id=bolsillo_id).order_by('-fecha', '-pk')[:100],
+    }
+
+
+def analizar(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def medir(connection, queries, repeat):
+    resultados = {}
+    for nombre, construir in queries.items():
+        qs = construir()
+        plan = qs.explain()
+        muestras = common.time_call(lambda: list(construir()), repeat=repeat)
+        resultados[nombre] = {'plan': plan, **common.summarize(muestras)}
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--groups', type=int, default=1_000)
+    parser.add_argument('--days', type=int, default=3650, help='días de historia (desde 2015-01-01)')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--keepdb', action='store_true', help='conservar la base de pruebas y sus datos')
+    parser.add_argument('--json', help='guardar los resultados en este archivo')
+    args = parser.parse_args()
+
+    common.setup_django()
+    from django.core.management import call_command
+    from finances import models
+
+    with common.bench_database(keepdb=args.keepdb) as connection:
+        if models.Usuario.objects.filter(email__startswith='bench').exists():
+            print('Reutilizando datos existentes (--keepdb)')
+            usuario_id = models.Usuario.objects.filter(email__startswith='bench').order_by('usuario_id').values_list('usuario_id', flat=True)[1]
+            grupo_id = models.Grupo.objects.order_by('grupo_id').values_list('grupo_id', flat=True)[1]
+            bolsillo_id = models.Bolsillo.objects.filter(usuario_id=usuario_id).values_list('bolsillo_id', flat=True).first()
+        else:
+            usuario_id, grupo_id, bolsillo_id = generar_datos(connection, args.rows, args.users, args.groups, args.days)
+        queries = consultas(usuario_id, grupo_id, bolsillo_id)
+
+        resultados = {}
+        for etiqueta, migracion in (('antes', SIN_INDICES), ('despues', CON_INDICES)):
+            inicio = time.perf_counter()
+            call_command('migrate', 'finances', migracion, verbosity=0)
+            analizar(connection)
+            print(f'\n== {etiqueta}: migrate finances {migracion} ({time.perf_counter() - inicio:.1f}s) ==')
+            resultados[etiqueta] = medir(connection, queries, args.repeat)
+            for nombre, r in resultados[etiqueta].items():
+                print(f'\n-- {nombre}: p50 {r["p50_ms"]:.2f} ms, p95 {r["p95_ms"]:.2f} ms')
+                print(r['plan'])
+
+        print(f'\n{"consulta":34} {"antes p50":>12} {"después p50":>12} {"mejora":>8}')
+        for nombre in queries:
+            antes = resultados['antes'][nombre]['p50_ms']
+            despues = resultados['despues'][nombre]['p50_ms']
+            mejora = antes / despues if despues else float('inf')
+            print(f'{nombre:34} {antes:10.2f}ms {despues:10.2f}ms {mejora:7.1f}x')
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump({'vendor': connection.vendor, 'rows': args.rows, 'resultados': resultados}, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Render y parseo JSON de listados grandes: JSONRenderer/JSONParser de DRF frente
+a FastJSONRenderer/FastJSONParser (finances/renderers.py, finances/parsers.py).
+
+Arma --rows ingresos con la forma de IngresoSerializer, los renderiza y los
+vuelve a parsear con cada clase, e informa si se usó orjson o la versión con
+json de la biblioteca estándar. Sale con código 1 si los bytes o los datos
+parseados no son idénticos, o si la mejora del render es menor que --min-speedup.
+
+Uso:
+    python benchmarks/json_renderer.py --rows 50000
+    python benchmarks/json_renderer.py --rows 50000 --min-speedup 3   # con orjson instalado
+"""
+import argparse
+import datetime
+import io
+import json
+import sys
+
+import common
+
+
+def filas(n):
+    """n ingresos como los devuelve serializacion.transacciones (montos como str, textos con tildes)."""
+    fecha = datetime.date(2025, 1, 1)
+    return [
+        {
+            'ingreso_id': i,
+            'categoria_detalle': {'categoria_id': i % 10, 'nombre': f'Categoría {i % 10}', 'color': '#3B82F6',
+                                  'tipo': 'ing', 'usuario': 1, 'grupo': None},
+            'bolsillo_detalle': {'bolsillo_id': i % 5, 'nombre': f'Bolsillo {i % 5}', 'saldo': f'{i * 37 % 10**9}.50',
+                                 'color': '#10B981', 'usuario': 1, 'grupo': None},
+            'monto': f'{i % 100000}.{i % 100:02d}',
+            'fecha': (fecha + datetime.timedelta(days=i % 365)).isoformat(),
+            'descripcion': f'Ingreso número {i} — pago de nómina',
+            'usuario': 1,
+            'grupo': None,
+            'categoria': {'categoria_id': i % 10, 'nombre': f'Categoría {i % 10}', 'color': '#3B82F6', 'tipo': 'ing'},
+            'bolsillo': {'bolsillo_id': i % 5, 'nombre': f'Bolsillo {i % 5}', 'saldo': f'{i * 37 % 10**9}.50',
+                         'color': '#10B981'},
+            'transferencia': None,
+            'creado_por': 1,
+            'creado_por_info': {'usuario_id': 1, 'email': 'ana@example.com', 'nombre': 'Ana Pérez'},
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-speedup', type=float, default=0.0,
+                        help='mejora mínima del render (p50 DRF / p50 rápido); sin mínimo por defecto')
+    parser.add_argument('--json', help='guardar los resultados en este archivo')
+    args = parser.parse_args()
+
+    common.setup_django()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from finances.parsers import FastJSONParser
+    from finances.renderers import FastJSONRenderer, orjson
+
+    datos = filas(args.rows)
+    drf, rapido = JSONRenderer().render(datos), FastJSONRenderer().render(datos)
+    iguales = drf == rapido and FastJSONParser().parse(io.BytesIO(drf)) == JSONParser().parse(io.BytesIO(drf))
+
+    medidas = {
+        'render': (lambda: JSONRenderer().render(datos), lambda: FastJSONRenderer().render(datos)),
+        'parse': (lambda: JSONParser().parse(io.BytesIO(drf)), lambda: FastJSONParser().parse(io.BytesIO(drf))),
+    }
+    motor = 'orjson' if orjson is not None else 'json (stdlib)'
+    print(f'{args.rows:,} ingresos, {len(drf) / 2**20:.1f} MiB, {motor}, bytes y datos idénticos: {iguales}')
+    print(f'{"medida":8} {"DRF p50":>10} {"rápido p50":>11} {"mejora":>7}')
+    resultados = {}
+    for nombre, (a, b) in medidas.items():
+        base = common.summarize(common.time_call(a, repeat=args.repeat, warmup=1))
+        nuevo = common.summarize(common.time_call(b, repeat=args.repeat, warmup=1))
+        mejora = base['p50_ms'] / nuevo['p50_ms']
+        resultados[nombre] = {'drf': base, 'rapido': nuevo, 'mejora': round(mejora, 2)}
+        print(f'{nombre:8} {base["p50_ms"]:8.1f}ms {nuevo["p50_ms"]:9.1f}ms {mejora:6.1f}x')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'motor': motor, 'iguales': iguales, 'resultados': resultados}, f, indent=2)
+    if not iguales or resultados['render']['mejora'] < args.min_speedup:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
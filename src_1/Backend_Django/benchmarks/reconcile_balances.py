@@ -0,0 +1,144 @@
+"""
+Tiempo de `manage.py reconcile_balances` sobre muchos bolsillos, con uno o
+varios procesos.
+
+Genera --pockets bolsillos y --rows transacciones (ingresos, egresos y
+asientos de transferencia) con INSERT ... SELECT, deja cada saldo cuadrado con su historial,
+desajusta --drift bolsillos al azar y ejecuta el comando con cada valor de
+--workers. Sale con código 1 si alguna corrida no encuentra exactamente los
+bolsillos desajustados.
+
+Uso:
+    python benchmarks/reconcile_balances.py --pockets 1000000 --rows 3000000 --workers 1,4,8
+    DATABASE_URL=postgresql://... python benchmarks/reconcile_balances.py --pockets 1000000 --json out.json
+"""
+import argparse
+import io
+import json
+import random
+import sys
+import time
+
+import common
+from index_plans import _fecha, _fecha_hora, _series
+
+POR_USUARIO = 100
+
+
+def generar_datos(connection, bolsillos, filas):
+    from finances import models
+
+    vendor = connection.vendor
+    print(f'Generando {bolsillos:,} bolsillos y {filas:,} transacciones en {vendor}...')
+    inicio = time.perf_counter()
+
+    usuarios = max(1, bolsillos // POR_USUARIO)
+    models.Usuario.objects.bulk_create(
+        [models.Usuario(email=f'bench{i}@example.com', nombre=f'bench{i}', password='!') for i in range(usuarios)],
+        batch_size=5000,
+    )
+    u0 = models.Usuario.objects.order_by('usuario_id').values_list('usuario_id', flat=True).first()
+    with connection.cursor() as cursor:
+        prefijo, origen = _series(vendor, bolsillos)
+        cursor.execute(
+            f"INSERT INTO bolsillo (usuario_id, nombre, saldo, saldo_ajustes, color) {prefijo} "
+            f"SELECT {u0} + i % {usuarios}, 'b' || i, 0, 0, '#ef4444' FROM {origen}"
+        )
+    b0 = models.Bolsillo.objects.order_by('bolsillo_id').values_list('bolsillo_id', flat=True).first()
+    # La conciliación solo cuenta los movimientos de una transferencia (no mira cuál):
+    # todos los asientos generados apuntan a esta
+    transferencia = models.Transferencia.objects.create(
+        de_bolsillo_id=b0, a_bolsillo_id=b0 + 1, monto_origen=1, monto_destino=1, creado_por_id=u0,
+    ).pk
+
+    bolsillo = f'({b0} + i % {bolsillos})'
+    usuario = f'({u0} + (i % {bolsillos}) % {usuarios})'
+    monto = '(i % 1000 + 1)'
+    dia = '(i % 3650)'
+    sentencias = {
+        'ingreso': (
+            'usuario_id, bolsillo_id, monto, fecha, descripcion',
+            f"{usuario}, {bolsillo}, {monto}, {_fecha(vendor, dia)}, 'bench'",
+        ),
+        'egreso': (
+            'usuario_id, bolsillo_id, monto, fecha, descripcion',
+            f"{usuario}, {bolsillo}, {monto}, {_fecha(vendor, dia)}, 'bench'",
+        ),
+        'movimiento': (
+            'tipo, usuario_id, bolsillo_id, monto, fecha, descripcion, transferencia_id',
+            f"CASE WHEN i % 2 = 0 THEN 'ing' ELSE 'eg' END, {usuario}, {bolsillo}, {monto}, "
+            f"{_fecha_hora(vendor, dia)}, 'bench', {transferencia}",
+        ),
+    }
+    with connection.cursor() as cursor:
+        for tabla, (columnas, expresiones) in sentencias.items():
+            prefijo, origen = _series(vendor, max(1, filas // 3))
+            cursor.execute(f'INSERT INTO {tabla} ({columnas}) {prefijo} SELECT {expresiones} FROM {origen}')
+        # Saldo = historial, como si todo hubiera pasado por el API
+        cursor.execute(
+            'UPDATE bolsillo SET saldo = '
+            'COALESCE((SELECT SUM(monto) FROM ingreso i WHERE i.bolsillo_id = bolsillo.bolsillo_id), 0) '
+            '- COALESCE((SELECT SUM(monto) FROM egreso e WHERE e.bolsillo_id = bolsillo.bolsillo_id), 0) '
+            "+ COALESCE((SELECT SUM(CASE WHEN tipo = 'ing' THEN monto ELSE -monto END) FROM movimiento m "
+            'WHERE m.bolsillo_id = bolsillo.bolsillo_id), 0)'
+        )
+    print(f'Datos generados en {time.perf_counter() - inicio:.1f}s')
+    return b0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pockets', type=int, default=100000)
+    parser.add_argument('--rows', type=int, default=300000, help='transacciones en total')
+    parser.add_argument('--drift', type=int, default=25, help='bolsillos a desajustar')
+    parser.add_argument('--workers', default='1,4', help='lista de procesos a probar, p. ej. 1,4,8')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--json', help='guardar los resultados en este archivo')
+    parser.add_argument('--keepdb', action='store_true')
+    args = parser.parse_args()
+
+    common.setup_django()
+    from django.core.management import call_command
+    from django.core.management.base import CommandError
+    from finances import models
+
+    resultados = {}
+    fallo = False
+    with common.bench_database(keepdb=args.keepdb) as connection:
+        if not models.Bolsillo.objects.exists():
+            generar_datos(connection, args.pockets, args.rows)
+        ids = list(models.Bolsillo.objects.values_list('pk', flat=True))
+        desajustados = set(random.Random(1).sample(ids, min(args.drift, len(ids))))
+        models.Bolsillo.objects.filter(pk__in=desajustados).update(saldo_ajustes=1)
+
+        for workers in [int(w) for w in args.workers.split(',')]:
+            salida = io.StringIO()
+            inicio = time.perf_counter()
+            try:
+                call_command('reconcile_balances', workers=workers, chunk_size=args.chunk_size, stdout=salida)
+            except CommandError:
+                pass  # Hay diferencias: es lo esperado
+            duracion = time.perf_counter() - inicio
+            encontrados = {int(linea.split()[1].rstrip(':')) for linea in salida.getvalue().splitlines()
+                           if linea.startswith('bolsillo ')}
+            ok = encontrados == desajustados
+            fallo |= not ok
+            resultados[f'workers={workers}'] = {
+                'segundos': round(duracion, 2),
+                'bolsillos_por_segundo': round(len(ids) / duracion),
+                'diferencias': len(encontrados),
+                'ok': ok,
+            }
+            print(f'{workers:>3} procesos: {duracion:7.2f}s ({len(ids) / duracion:,.0f} bolsillos/s), '
+                  f'{len(encontrados)} diferencias {"OK" if ok else "ERROR"}')
+        models.Bolsillo.objects.filter(pk__in=desajustados).update(saldo_ajustes=0)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'vendor': connection.vendor, 'resultados': resultados}, f, indent=2)
+    if fallo:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
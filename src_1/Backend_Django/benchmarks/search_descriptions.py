@@ -0,0 +1,120 @@
+"""
+Latencia de GET /api/movimientos/search/?q= sobre muchos ingresos y egresos.
+
+Genera --rows filas (mitad ingresos, mitad egresos) repartidas entre --users
+usuarios, con descripciones de dos palabras de un vocabulario fijo, y mide
+términos frecuentes, raros y varias palabras para un usuario. En
+Postgres se apoya en los índices GIN de la migración 0016; en SQLite, en la
+tabla FTS5 (que los triggers llenan durante la generación). Sale con código 1 si
+algún p50 supera --max-ms.
+
+Uso:
+    python benchmarks/search_descriptions.py --rows 1000000
+    DATABASE_URL=postgresql://... python benchmarks/search_descriptions.py --rows 10000000 --json out.json
+"""
+import argparse
+import json
+import sys
+import time
+
+import common
+from index_plans import _fecha, _series
+
+PALABRAS = (
+    'cafe', 'mercado', 'arriendo', 'gasolina', 'almuerzo', 'farmacia', 'cine', 'taxi', 'salario', 'internet',
+    'gimnasio', 'libros', 'regalo', 'viaje', 'hotel', 'seguro', 'luz', 'agua', 'ropa', 'restaurante',
+)
+# Palabra que solo aparece en una de cada RARA filas
+RARA = 97
+
+CONSULTAS = {
+    'frecuente': 'cafe',
+    'dos_palabras': 'mercado gimnasio',
+    'mayusculas_acentos': 'CINE Farmácia',
+    'rara': 'aguinaldo',
+    'sin_resultados': 'inexistente',
+}
+
+
+def _palabra(expresion):
+    casos = ' '.join(f"WHEN {n} THEN '{p}'" for n, p in enumerate(PALABRAS))
+    return f'CASE ({expresion}) % {len(PALABRAS)} {casos} END'
+
+
+def generar_datos(connection, filas, usuarios):
+    from finances import models
+
+    vendor = connection.vendor
+    print(f'Generando {filas:,} ingresos/egresos ({usuarios:,} usuarios) en {vendor}...')
+    inicio = time.perf_counter()
+    models.Usuario.objects.bulk_create(
+        [models.Usuario(email=f'bench{i}@example.com', nombre=f'bench{i}', password='!') for i in range(usuarios)],
+        batch_size=5000,
+    )
+    u0 = models.Usuario.objects.order_by('usuario_id').values_list('usuario_id', flat=True).first()
+    # k = número de fila dentro del usuario: cada usuario recibe combinaciones distintas
+    k = f'(i / {usuarios})'
+    descripcion = (
+        f"CASE WHEN i % {RARA} = 0 THEN 'aguinaldo' ELSE {_palabra(k)} END "
+        f"|| ' ' || {_palabra(f'{k} * 7 + 3')}"
+    )
+    with connection.cursor() as cursor:
+        for tabla in ('ingreso', 'egreso'):
+            prefijo, origen = _series(vendor, max(1, filas // 2))
+            cursor.execute(
+                f'INSERT INTO {tabla} (usuario_id, monto, fecha, descripcion) {prefijo} '
+                f"SELECT {u0} + i % {usuarios}, i % 1000 + 1, {_fecha(vendor, 'i % 3650')}, {descripcion} "
+                f'FROM {origen}'
+            )
+        cursor.execute('ANALYZE')
+    print(f'Datos generados en {time.perf_counter() - inicio:.1f}s')
+    return models.Usuario.objects.get(pk=u0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--max-ms', type=float, default=50.0, help='p50 máximo aceptado por consulta')
+    parser.add_argument('--keepdb', action='store_true', help='conservar la base de pruebas y sus datos')
+    parser.add_argument('--json', help='guardar los resultados en este archivo')
+    args = parser.parse_args()
+
+    common.setup_django()
+    from rest_framework.test import APIClient
+    from finances import models
+
+    resultados = {}
+    with common.bench_database(keepdb=args.keepdb) as connection:
+        if models.Usuario.objects.filter(email__startswith='bench').exists():
+            print('Reutilizando datos existentes (--keepdb)')
+            usuario = models.Usuario.objects.filter(email__startswith='bench').order_by('usuario_id').first()
+        else:
+            usuario = generar_datos(connection, args.rows, args.users)
+        client = APIClient()
+        client.force_authenticate(usuario)
+
+        for nombre, texto in CONSULTAS.items():
+            url = f'/api/movimientos/search/?q={texto}&page_size={args.page_size}'
+            respuesta = client.get(url)
+            assert respuesta.status_code == 200, respuesta.content
+            encontrados = len(respuesta.data['results'])
+            muestras = common.time_call(lambda: client.get(url), repeat=args.repeat)
+            resultados[nombre] = {'q': texto, 'resultados_pagina': encontrados, **common.summarize(muestras)}
+            r = resultados[nombre]
+            print(f'{nombre:18} q={texto!r:20} {encontrados:3} filas  '
+                  f'p50 {r["p50_ms"]:8.2f} ms  p95 {r["p95_ms"]:8.2f} ms  p99 {r["p99_ms"]:8.2f} ms')
+
+    lentas = [n for n, r in resultados.items() if r['p50_ms'] > args.max_ms]
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'vendor': connection.vendor, 'resultados': resultados}, f, indent=2)
+    if lentas:
+        print(f'p50 por encima de {args.max_ms} ms: {", ".join(lentas)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
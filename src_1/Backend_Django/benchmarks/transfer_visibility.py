@@ -0,0 +1,156 @@
+"""
+Latencia del listado de transferencias (GET /api/transferencias/) a medida que
+crece el volumen global de transferencias, con el filtro anterior (OR de cuatro
+condiciones con JOIN a bolsillo) y con el actual (UNION por los índices de
+origen y destino sobre los bolsillos visibles del usuario).
+
+El usuario medido tiene un número fijo de transferencias (--own) entre su
+bolsillo y el General de su grupo; las demás (--volumes, acumulativas) son entre
+bolsillos de otros usuarios. Sale con código 1 si el p50 del listado actual en
+el volumen mayor supera --max-growth veces el del volumen menor.
+
+Uso:
+    python benchmarks/transfer_visibility.py --volumes 10000,100000,1000000
+    DATABASE_URL=postgresql://... python benchmarks/transfer_visibility.py --volumes 100000,1000000,10000000 --json out.json
+"""
+import argparse
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+import common
+from index_plans import _fecha_hora, _series
+
+USUARIOS = 10_000
+
+
+def generar_base(connection, propias):
+    from finances import models
+
+    models.Usuario.objects.bulk_create(
+        [models.Usuario(email=f'bench{i}@example.com', nombre=f'bench{i}', password='!') for i in range(USUARIOS)],
+        batch_size=5000,
+    )
+    u0 = models.Usuario.objects.order_by('usuario_id').values_list('usuario_id', flat=True).first()
+    models.Bolsillo.objects.bulk_create(
+        [models.Bolsillo(usuario_id=u0 + i, nombre='Principal') for i in range(USUARIOS)],
+        batch_size=5000,
+    )
+    b0 = models.Bolsillo.objects.order_by('bolsillo_id').values_list('bolsillo_id', flat=True).first()
+
+    usuario = models.Usuario.objects.get(pk=u0)
+    grupo = models.Grupo.objects.create(nombre='bench', creador=usuario)
+    models.UsuarioGrupo.objects.create(usuario=usuario, grupo=grupo, rol='admin')
+    general = models.Bolsillo.objects.create(grupo=grupo, nombre='General')
+
+    vendor = connection.vendor
+    with connection.cursor() as cursor:
+        prefijo, origen = _series(vendor, propias)
+        cursor.execute(
+            'INSERT INTO transferencia (de_bolsillo_id, a_bolsillo_id, creado_por_id, monto_origen, monto_destino, fecha) '
+            f'{prefijo} SELECT CASE WHEN i % 2 = 0 THEN {b0} ELSE {general.pk} END, '
+            f'CASE WHEN i % 2 = 0 THEN {general.pk} ELSE {b0} END, {u0}, 1, 1, {_fecha_hora(vendor, "i % 3650")} '
+            f'FROM {origen}'
+        )
+    return usuario, b0
+
+
+def agregar_ajenas(connection, b0, n):
+    """n transferencias entre bolsillos de los otros usuarios (nunca el b0)."""
+    vendor = connection.vendor
+    otros = USUARIOS - 1
+    with connection.cursor() as cursor:
+        prefijo, origen = _series(vendor, n)
+        cursor.execute(
+            'INSERT INTO transferencia (de_bolsillo_id, a_bolsillo_id, creado_por_id, monto_origen, monto_destino, fecha) '
+            f'{prefijo} SELECT {b0} + 1 + i % {otros}, {b0} + 1 + (i + 1) % {otros}, '
+            f'(SELECT usuario_id FROM bolsillo WHERE bolsillo_id = {b0} + 1 + i % {otros}), '
+            f'i % 1000 + 1, i % 1000 + 1, {_fecha_hora(vendor, "i % 3650")} FROM {origen}'
+        )
+        cursor.execute('ANALYZE')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--volumes', default='10000,100000,1000000',
+                        help='transferencias globales (acumulativas) a medir')
+    parser.add_argument('--own', type=int, default=200, help='transferencias del usuario medido')
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--max-growth', type=float, default=3.0,
+                        help='crecimiento máximo aceptado del p50 entre el volumen menor y el mayor')
+    parser.add_argument('--json', help='guardar los resultados en este archivo')
+    args = parser.parse_args()
+
+    common.setup_django()
+    from django.db.models import Q
+    from rest_framework.test import APIClient
+    from finances import membership, models
+
+    volumenes = sorted(int(v) for v in args.volumes.split(','))
+    resultados = {}
+    with common.bench_database() as connection:
+        usuario, b0 = generar_base(connection, args.own)
+        client = APIClient()
+        client.force_authenticate(usuario)
+        url = f'/api/transferencias/?page_size={args.page_size}'
+
+        def anterior():
+            grupos = membership.grupos_ids(usuario)
+            return list(models.Transferencia.objects.filter(
+                Q(de_bolsillo__usuario=usuario) | Q(a_bolsillo__usuario=usuario)
+                | Q(de_bolsillo__grupo__in=grupos) | Q(a_bolsillo__grupo__in=grupos)
+            ).order_by('-fecha', '-pk')[:args.page_size + 1])
+
+        def listado():
+            respuesta = client.get(url)
+            assert respuesta.status_code == 200, respuesta.content
+            return respuesta
+
+        esperados = len(listado().data['results'])
+        assert esperados == min(args.own, args.page_size), esperados
+
+        total = 0
+        for volumen in volumenes:
+            inicio = time.perf_counter()
+            agregar_ajenas(connection, b0, volumen - total)
+            total = volumen
+            print(f'\n== {volumen:,} transferencias globales (+{args.own} propias, '
+                  f'generadas en {time.perf_counter() - inicio:.1f}s) ==')
+            assert [t.pk for t in anterior()[:args.page_size]] == [t['transferencia_id'] for t in listado().data['results']]
+            resultados[volumen] = {
+                'anterior_or_join': common.summarize(common.time_call(anterior, repeat=args.repeat)),
+                'union_consulta': common.summarize(common.time_call(
+                    lambda: list(_consulta_actual(usuario)[:args.page_size + 1]), repeat=args.repeat)),
+                'api_listado': common.summarize(common.time_call(listado, repeat=args.repeat)),
+            }
+            for nombre, r in resultados[volumen].items():
+                print(f'  {nombre:18} p50 {r["p50_ms"]:9.2f} ms  p95 {r["p95_ms"]:9.2f} ms')
+
+        print('\nPlan actual:')
+        print(_consulta_actual(usuario)[:args.page_size + 1].explain())
+
+    menor, mayor = resultados[volumenes[0]], resultados[volumenes[-1]]
+    crecimiento = mayor['api_listado']['p50_ms'] / menor['api_listado']['p50_ms']
+    print(f'\np50 del listado: {menor["api_listado"]["p50_ms"]:.2f} ms con {volumenes[0]:,} -> '
+          f'{mayor["api_listado"]["p50_ms"]:.2f} ms con {volumenes[-1]:,} ({crecimiento:.2f}x, '
+          f'máximo {args.max_growth}x)')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'vendor': connection.vendor, 'crecimiento': crecimiento,
+                       'resultados': resultados}, f, indent=2)
+    if crecimiento > args.max_growth:
+        sys.exit(1)
+
+
+def _consulta_actual(usuario):
+    from finances.views import TransferenciaViewSet
+
+    vista = TransferenciaViewSet()
+    vista.request = SimpleNamespace(user=usuario)
+    return vista.get_queryset().order_by('-fecha', '-pk')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FinancesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'finances'
+
+    def ready(self):
+        # Registrar las señales (invalidación de cachés)
+        from . import signals  # noqa: F401
@@ -0,0 +1,96 @@
+"""
+Variantes async (solo lectura) de /api/dashboard/summary/ y /api/stats/series/.
+
+Se sirven en /api/async/... y devuelven exactamente lo mismo que las vistas
+de DRF (comparten consultas y formato de respuesta con finances.views).
+
+Usan el ORM async (aaggregate, iteración async) y lanzan las consultas
+independientes del resumen a la vez con asyncio.gather. En Django 5.2 esas
+llamadas corren en el hilo síncrono de la petición, una tras otra y sobre la
+misma conexión, así que el SQL de una petición no se solapa; lo que se gana
+es que el worker atiende otras peticiones mientras espera a la base de datos.
+
+Solo tienen sentido bajo ASGI: GUNICORN_ASGI=True sirve backend.asgi con
+workers de uvicorn y CONN_MAX_AGE=0 (ver gunicorn.conf.py). Con WSGI Django
+las ejecuta en un event loop por petición.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated, ValidationError
+
+from .authentication import CachedTokenAuthentication
+from .views import (
+    _dashboard_consultas, _dashboard_respuesta, _dashboard_saldo, _dashboard_totales, _filtro_propietario,
+    _series_consulta, _series_periodos, _series_respuesta,
+)
+
+
+def _error(exc, autenticacion=None):
+    response = JsonResponse(exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}, status=exc.status_code)
+    if autenticacion is not None:
+        response['WWW-Authenticate'] = autenticacion.authenticate_header(None)
+    return response
+
+
+async def _usuario(request):
+    """Usuario autenticado por token (o AuthenticationFailed/NotAuthenticated)."""
+    resultado = await CachedTokenAuthentication().aauthenticate(request)
+    if resultado is None:
+        raise NotAuthenticated()
+    user, _ = resultado
+    return user
+
+
+async def _lista(queryset):
+    return [fila async for fila in queryset]
+
+
+async def _filtro(user, grupo_id):
+    if grupo_id:
+        # La membresía puede necesitar una query (caché vacía): fuera del event loop
+        return await sync_to_async(_filtro_propietario)(user, grupo_id)
+    return Q(usuario=user, grupo__isnull=True)
+
+
+def _vista_async(funcion):
+    """Autenticación y errores de DRF (401/400) para una vista async de solo lectura."""
+    @require_GET
+    async def vista(request):
+        try:
+            user = await _usuario(request)
+        except (AuthenticationFailed, NotAuthenticated) as exc:
+            return _error(exc, CachedTokenAuthentication())
+        try:
+            return JsonResponse(await funcion(request, user), safe=False)
+        except ValidationError as exc:
+            return _error(exc)
+
+    vista.__name__ = funcion.__name__
+    return vista
+
+
+@_vista_async
+async def dashboard_summary(request, user):
+    """Igual que DashboardViewSet.summary, con las tres consultas lanzadas con gather."""
+    grupo_id = request.GET.get('grupo_id')
+    filtro = await _filtro(user, grupo_id)
+    bolsillos, resumen, por_categoria = _dashboard_consultas(filtro)
+    saldo, totales, categorias = await asyncio.gather(
+        bolsillos.aaggregate(**_dashboard_saldo()),
+        resumen.aaggregate(**_dashboard_totales()),
+        _lista(por_categoria),
+    )
+    return _dashboard_respuesta(grupo_id, saldo['total'], totales, categorias)
+
+
+@_vista_async
+async def stats_series(request, user):
+    """Igual que StatsViewSet.series."""
+    inicios, fin, trunc, formato = _series_periodos(request.GET)
+    filtro = await _filtro(user, request.GET.get('grupo_id'))
+    filas = await _lista(_series_consulta(filtro, inicios, fin, trunc))
+    return _series_respuesta(filas, inicios, formato)
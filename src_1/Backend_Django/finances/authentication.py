@@ -0,0 +1,123 @@
+"""
+TokenAuthentication con caché en memoria del par token -> usuario.
+
+Cada petición autenticada hace por defecto un JOIN Token + Usuario antes de
+llegar a la vista. CachedTokenAuthentication guarda el resultado en un LRU
+acotado (TOKEN_AUTH_CACHE_SIZE entradas) con expiración (TOKEN_AUTH_CACHE_TTL
+segundos) por proceso. Las señales de signals.py lo vacían al borrar un token o
+al guardar/borrar un usuario (p. ej. al desactivarlo); en otros workers la
+entrada vive como máximo el TTL.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+from . import metrics
+
+
+class TokenCache:
+    """
+    LRU con TTL, seguro entre hilos. Los aciertos, fallos, desalojos y el tamaño
+    se publican en /metrics (finances_token_cache_*).
+    """
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'TOKEN_AUTH_CACHE_TTL', 60)
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'TOKEN_AUTH_CACHE_SIZE', 10000)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[2] < time.monotonic():
+                del self._data[key]
+                metrics.TOKEN_CACHE_TAMANO.set(len(self._data))
+                entry = None
+            if entry is None:
+                metrics.TOKEN_CACHE.labels('miss').inc()
+                return None
+            self._data.move_to_end(key)
+            metrics.TOKEN_CACHE.labels('hit').inc()
+            return entry[0], entry[1]
+
+    def set(self, key, user, token):
+        with self._lock:
+            self._data[key] = (user, token, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                metrics.TOKEN_CACHE_DESALOJOS.labels('lru').inc()
+            metrics.TOKEN_CACHE_TAMANO.set(len(self._data))
+
+    def evict_key(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                metrics.TOKEN_CACHE_DESALOJOS.labels('token').inc()
+                metrics.TOKEN_CACHE_TAMANO.set(len(self._data))
+
+    def evict_user(self, user_id):
+        with self._lock:
+            keys = [k for k, (user, _, _) in self._data.items() if user.pk == user_id]
+            for k in keys:
+                del self._data[k]
+            if keys:
+                metrics.TOKEN_CACHE_DESALOJOS.labels('usuario').inc(len(keys))
+                metrics.TOKEN_CACHE_TAMANO.set(len(self._data))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            metrics.TOKEN_CACHE_TAMANO.set(0)
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Reemplazo directo de rest_framework.authentication.TokenAuthentication."""
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            user, token = cached
+            # Copia por petición: nadie comparte (ni modifica) la misma instancia
+            return copy.copy(user), token
+        return self._validar(key)
+
+    def _validar(self, key):
+        # Token inválido o usuario inactivo -> AuthenticationFailed (no se cachea)
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token)
+        return copy.copy(user), token
+
+    async def aauthenticate(self, request):
+        """
+        authenticate() para vistas async (finances.async_views): con el token en
+        caché no sale del event loop; si no, lo valida contra la base de datos
+        en un hilo, con los mismos errores que la versión síncrona.
+        """
+        partes = get_authorization_header(request).split()
+        if len(partes) != 2 or partes[0].lower() != self.keyword.lower().encode():
+            # Sin cabecera (None) o cabecera mal formada (AuthenticationFailed): no toca la BD
+            return self.authenticate(request)
+        try:
+            key = partes[1].decode()
+        except UnicodeError:
+            return self.authenticate(request)
+        cached = token_cache.get(key)
+        if cached is not None:
+            user, token = cached
+            return copy.copy(user), token
+        return await sync_to_async(self._validar)(key)
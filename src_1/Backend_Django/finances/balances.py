@@ -0,0 +1,208 @@
+"""
+Servicio central para modificar Bolsillo.saldo.
+
+Todas las rutas que mueven dinero (ingresos, egresos, transferencias,
+aportaciones y ajustes de bolsillos de grupo) deben pasar por aquí:
+
+    with transaction.atomic():
+        bolsillos = balances.bloquear(origen_id, destino_id)
+        ... validar saldo con bolsillos[pk].saldo ...
+        balances.aplicar({origen_id: -monto, destino_id: monto}, bolsillos)
+
+- bloquear() toma SELECT ... FOR UPDATE siempre en orden de pk, así dos flujos
+  que tocan los mismos bolsillos nunca se bloquean mutuamente (deadlock).
+- aplicar() escribe UPDATE bolsillo SET saldo = saldo + delta (F expression y
+  update_fields=['saldo']), de modo que ninguna actualización concurrente se
+  pierde aunque el objeto en memoria esté desactualizado.
+- Los cambios de saldo que no dejan transacción (traspasos con el bolsillo
+  General) van por ajustar(), que además suma en saldo_ajustes para que la
+  conciliación (reconciliacion.py) los cuente.
+- aplicar() también mantiene BolsilloSnapshot (ver snapshots.py). Quien conoce la
+  fecha contable del cambio (ingresos, egresos, aportaciones) pasa los flujos con
+  snapshots.flujo(); el resto del delta cuenta como entrada o salida de hoy.
+
+Diario de asientos pendientes: la entrada de una transferencia no bloquea el
+bolsillo de destino. Se anota como Movimiento con pendiente=True (INSERT sin
+bloqueo) y compactar() la suma después al saldo y a los snapshots, con un solo
+UPDATE por bolsillo para todos los asientos acumulados. Así muchas transferencias
+hacia el mismo bolsillo no se esperan entre sí. El saldo de un bolsillo es
+entonces saldo + pendiente():
+
+- bloquear() compacta los asientos pendientes de los bolsillos que bloquea, de
+  modo que el saldo leído bajo el bloqueo (el que validan las salidas) siempre
+  está completo.
+- Las lecturas sin bloqueo (listados, dashboard) suman pendiente().
+- La conciliación y los snapshots solo cuentan asientos ya compactados.
+"""
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import models, snapshots, versiones
+
+# Signo de un asiento: las entradas suman y las salidas restan
+_NETO = Case(When(tipo='ing', then=F('monto')), default=-F('monto'))
+
+
+def bloquear(*bolsillo_ids):
+    """
+    Bloquear los bolsillos indicados (ids o instancias) en orden de pk.
+    Devuelve {pk: Bolsillo} con el saldo leído bajo el bloqueo, ya con sus
+    asientos pendientes compactados.
+    Debe llamarse dentro de transaction.atomic().
+    """
+    ids = sorted({getattr(b, 'pk', b) for b in bolsillo_ids if b is not None})
+    if not ids:
+        return {}
+    qs = models.Bolsillo.objects.select_for_update().filter(pk__in=ids).order_by('pk')
+    bloqueados = {b.pk: b for b in qs}
+    _compactar_bloqueados(bloqueados)
+    return bloqueados
+
+
+def aplicar(deltas, bloqueados=None, flujos=None):
+    """
+    Aplicar {bolsillo_id: delta} con saldo = saldo + delta, en orden de pk.
+    Si se pasan los bolsillos devueltos por bloquear(), su saldo en memoria se
+    actualiza para poder devolverlo en la respuesta sin otra consulta.
+    flujos: {(bolsillo_id, fecha): [ingresos, egresos]} para los snapshots diarios.
+    """
+    bloqueados = bloqueados or {}
+    for pk in sorted(deltas):
+        delta = Decimal(deltas[pk])
+        if not delta:
+            continue
+        bolsillo = bloqueados.get(pk)
+        if bolsillo is None:
+            # update() no emite post_save: avisar el cambio de versión aquí
+            models.Bolsillo.objects.filter(pk=pk).update(saldo=F('saldo') + delta)
+            versiones.marcar(*(
+                versiones.de_instancia(b) for b in models.Bolsillo.objects.filter(pk=pk).only('usuario', 'grupo')
+            ))
+            continue
+        saldo_bloqueado = bolsillo.saldo
+        bolsillo.saldo = F('saldo') + delta
+        bolsillo.save(update_fields=['saldo'])
+        # La fila está bloqueada: el valor nuevo es exactamente saldo + delta
+        bolsillo.saldo = saldo_bloqueado + delta
+    _registrar_snapshots(deltas, bloqueados, flujos)
+    return bloqueados
+
+
+def ajustar(deltas, bloqueados=None):
+    """aplicar() para movimientos sin transacción: también suma en saldo_ajustes."""
+    bloqueados = aplicar(deltas, bloqueados)
+    for pk in sorted(deltas):
+        delta = Decimal(deltas[pk])
+        if not delta:
+            continue
+        models.Bolsillo.objects.filter(pk=pk).update(saldo_ajustes=F('saldo_ajustes') + delta)
+        if pk in bloqueados:
+            bloqueados[pk].saldo_ajustes += delta
+    return bloqueados
+
+
+def registrar_asignacion(bolsillo, saldo_anterior=Decimal('0')):
+    """
+    Reflejar en los snapshots un saldo asignado directamente con save() (alta de
+    un bolsillo con saldo inicial o edición manual del saldo). Quien guarda el
+    bolsillo también debe sumar la diferencia en saldo_ajustes.
+    """
+    diferencia = Decimal(bolsillo.saldo) - Decimal(saldo_anterior)
+    if diferencia:
+        _registrar_snapshots({bolsillo.pk: diferencia}, {bolsillo.pk: bolsillo}, None)
+
+
+def _registrar_snapshots(deltas, bloqueados, flujos):
+    flujos = {clave: list(valor) for clave, valor in (flujos or {}).items()}
+    # Lo que los flujos no explican de cada delta es una entrada/salida de hoy
+    explicado = {}
+    for (pk, _), (ingresos, egresos) in flujos.items():
+        explicado[pk] = explicado.get(pk, Decimal('0')) + ingresos - egresos
+    hoy = timezone.localdate()
+    for pk, delta in deltas.items():
+        resto = Decimal(delta) - explicado.get(pk, Decimal('0'))
+        if resto > 0:
+            snapshots.flujo(flujos, pk, hoy, ingresos=resto)
+        elif resto < 0:
+            snapshots.flujo(flujos, pk, hoy, egresos=-resto)
+    if not flujos:
+        return
+
+    saldos = {pk: b.saldo for pk, b in bloqueados.items()}
+    faltantes = {pk for pk, _ in flujos} - saldos.keys()
+    if faltantes:
+        saldos.update(models.Bolsillo.objects.filter(pk__in=faltantes).values_list('pk', 'saldo'))
+    snapshots.registrar(flujos, saldos)
+
+
+def pendiente(bolsillo='pk'):
+    """
+    Expresión con la suma de los asientos pendientes del bolsillo OuterRef(bolsillo)
+    (0 si no hay), para annotate() en lecturas sin bloqueo.
+    """
+    suma = (
+        models.Movimiento.objects.filter(bolsillo=OuterRef(bolsillo), pendiente=True).order_by()
+        .values('bolsillo').annotate(total=Sum(_NETO)).values('total')
+    )
+    campo = DecimalField(max_digits=15, decimal_places=2)
+    return Coalesce(Subquery(suma, output_field=campo), Value(Decimal('0')), output_field=campo)
+
+
+def compactar(bolsillo_ids=None, esperar=True):
+    """
+    Sumar al saldo los asientos pendientes de los bolsillos indicados (todos si
+    None), un bolsillo por transacción. Con esperar=False se saltan los bolsillos
+    que otra transacción tiene bloqueados (SKIP LOCKED): quien los tiene compacta
+    al bloquearlos, o lo hará la próxima compactación. Devuelve cuántos asientos
+    se compactaron.
+    """
+    pendientes = models.Movimiento.objects.filter(pendiente=True, bolsillo__isnull=False)
+    if bolsillo_ids is not None:
+        pendientes = pendientes.filter(bolsillo_id__in=[getattr(b, 'pk', b) for b in bolsillo_ids])
+    saltar = not esperar and connection.features.has_select_for_update_skip_locked
+    compactados = 0
+    for pk in sorted(set(pendientes.order_by().values_list('bolsillo_id', flat=True))):
+        with transaction.atomic():
+            bloqueados = {
+                b.pk: b for b in models.Bolsillo.objects.select_for_update(skip_locked=saltar).filter(pk=pk)
+            }
+            compactados += _compactar_bloqueados(bloqueados)
+    return compactados
+
+
+def _compactar_bloqueados(bloqueados):
+    # Los asientos se leen después de tomar el bloqueo: ningún otro compactador
+    # puede sumarlos a la vez, y los que lleguen después quedan para la próxima.
+    if not bloqueados:
+        return 0
+    asientos = list(
+        models.Movimiento.objects.filter(pendiente=True, bolsillo_id__in=list(bloqueados))
+        .values_list('pk', 'bolsillo_id', 'tipo', 'monto', 'fecha')
+    )
+    if not asientos:
+        return 0
+    deltas, flujos = {}, {}
+    for _, pk, tipo, monto, fecha in asientos:
+        fecha = timezone.localdate(fecha) if timezone.is_aware(fecha) else fecha.date()
+        if tipo == 'ing':
+            acumular(deltas, pk, monto)
+            snapshots.flujo(flujos, pk, fecha, ingresos=monto)
+        else:
+            acumular(deltas, pk, -monto)
+            snapshots.flujo(flujos, pk, fecha, egresos=monto)
+    aplicar(deltas, bloqueados, flujos)
+    models.Movimiento.objects.filter(pk__in=[a[0] for a in asientos]).update(pendiente=False)
+    return len(asientos)
+
+
+def acumular(deltas, bolsillo, delta):
+    """Sumar delta al bolsillo dentro de un dict de deltas (ignora bolsillo None)."""
+    if bolsillo is not None and delta:
+        pk = getattr(bolsillo, 'pk', bolsillo)
+        deltas[pk] = deltas.get(pk, Decimal('0')) + Decimal(delta)
+    return deltas
+
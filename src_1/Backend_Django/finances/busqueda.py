@@ -0,0 +1,172 @@
+"""
+Búsqueda de texto en la descripción de ingresos y egresos.
+
+En Postgres se usa to_tsvector('spanish', descripcion) con un índice GIN por
+tabla (migración 0016) y websearch_to_tsquery, ordenando por ts_rank. En SQLite
+(local/dev) la misma migración crea la tabla FTS5 movimiento_busqueda, que se
+mantiene con triggers sobre ingreso y egreso:
+
+    rowid = ingreso_id * 2 | egreso_id * 2 + 1
+    propietario = 'u<usuario_id>' (personal) | 'g<grupo_id>' (grupo)
+
+El propietario es un término más del índice, así que el filtro por dueño se
+resuelve dentro de FTS5 (intersección de listas) y no filtrando después las
+coincidencias de todos los usuarios. Se ordena por bm25 solo de la descripción.
+
+Resultados(...)[desde:hasta] ejecuta la búsqueda de esa página: una consulta de
+ids ordenados por relevancia y una por tabla para traer las filas.
+"""
+import re
+
+from django.db import connection
+from django.db.models import CharField, Value
+
+from . import models
+
+TIPOS = {'ing': models.Ingreso, 'eg': models.Egreso}
+PALABRA = re.compile(r'\w+')
+
+# (tabla, pk, desplazamiento del rowid en movimiento_busqueda)
+SQLITE_TABLAS = (('ingreso', 'ingreso_id', 0), ('egreso', 'egreso_id', 1))
+
+SQLITE_FILA = """
+    SELECT {fila}.{pk} * 2 + {desplazamiento},
+           CASE WHEN {fila}.grupo_id IS NOT NULL THEN 'g' || {fila}.grupo_id ELSE 'u' || {fila}.usuario_id END,
+           {fila}.descripcion
+"""
+
+SQLITE_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_ai AFTER INSERT ON {tabla} BEGIN
+        INSERT INTO movimiento_busqueda (rowid, propietario, descripcion) {fila_nueva}
+        WHERE COALESCE(NEW.descripcion, '') != '';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_ad AFTER DELETE ON {tabla} BEGIN
+        DELETE FROM movimiento_busqueda WHERE rowid = OLD.{pk} * 2 + {desplazamiento};
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_au AFTER UPDATE OF descripcion, usuario_id, grupo_id ON {tabla} BEGIN
+        DELETE FROM movimiento_busqueda WHERE rowid = OLD.{pk} * 2 + {desplazamiento};
+        INSERT INTO movimiento_busqueda (rowid, propietario, descripcion) {fila_nueva}
+        WHERE COALESCE(NEW.descripcion, '') != '';
+    END
+    """,
+)
+
+
+def instalar_sqlite(ejecutar, poblar=False):
+    """
+    Crear (si faltan) la tabla FTS5 y sus triggers; con poblar=True, indexar las
+    filas existentes. Se vuelve a llamar después de cada migrate (signals.py)
+    porque al rehacer una tabla en SQLite (ALTER de Django) se pierden sus triggers.
+    """
+    ejecutar(
+        # detail=column: sin posiciones (no hay búsqueda de frases), listas más cortas
+        "CREATE VIRTUAL TABLE IF NOT EXISTS movimiento_busqueda USING fts5("
+        "propietario, descripcion, tokenize = 'unicode61 remove_diacritics 2', detail = column)"
+    )
+    for tabla, pk, desplazamiento in SQLITE_TABLAS:
+        fila = {'pk': pk, 'desplazamiento': desplazamiento}
+        for trigger in SQLITE_TRIGGERS:
+            ejecutar(trigger.format(tabla=tabla, fila_nueva=SQLITE_FILA.format(fila='NEW', **fila), **fila))
+        if poblar:
+            ejecutar(
+                'INSERT INTO movimiento_busqueda (rowid, propietario, descripcion) '
+                f"{SQLITE_FILA.format(fila=tabla, **fila)} FROM {tabla} WHERE COALESCE(descripcion, '') != ''"
+            )
+
+
+def desinstalar_sqlite(ejecutar):
+    for tabla, _, _ in SQLITE_TABLAS:
+        for sufijo in ('ai', 'ad', 'au'):
+            ejecutar(f'DROP TRIGGER IF EXISTS {tabla}_busqueda_{sufijo}')
+    ejecutar('DROP TABLE IF EXISTS movimiento_busqueda')
+
+
+def _consulta_fts5(propietario, texto):
+    """
+    Expresión MATCH de FTS5 con todas las palabras (como websearch_to_tsquery
+    sin operadores). Sin prefijos: un término con * no puede saltar por la lista
+    del propietario y recorre todas las coincidencias de la tabla.
+    """
+    palabras = PALABRA.findall(texto)
+    if not palabras:
+        return None
+    terminos = ' '.join(f'"{p}"' for p in palabras)
+    return f'propietario : "{propietario}" AND descripcion : ({terminos})'
+
+
+def _ids_sqlite(propietario, texto, desde, cantidad):
+    consulta = _consulta_fts5(propietario, texto)
+    if consulta is None:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT rowid FROM movimiento_busqueda WHERE movimiento_busqueda MATCH %s '
+            'ORDER BY bm25(movimiento_busqueda, 0.0, 1.0), rowid DESC LIMIT %s OFFSET %s',
+            [consulta, cantidad, desde],
+        )
+        return [('eg' if rowid % 2 else 'ing', rowid // 2) for (rowid,) in cursor.fetchall()]
+
+
+def _ids_postgres(filtro, texto, desde, cantidad):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+    # Mismo SearchVector que el índice GIN de la migración 0016
+    vector = SearchVector('descripcion', config='spanish')
+    consulta = SearchQuery(texto, config='spanish', search_type='websearch')
+
+    def coincidencias(modelo, tipo):
+        return (
+            modelo.objects.filter(filtro).annotate(documento=vector).filter(documento=consulta)
+            .order_by().annotate(tipo=Value(tipo, output_field=CharField()), rank=SearchRank(vector, consulta))
+            .values_list('tipo', 'pk', 'rank', 'fecha')
+        )
+
+    filas = coincidencias(models.Ingreso, 'ing').union(coincidencias(models.Egreso, 'eg'), all=True)
+    return [(tipo, pk) for tipo, pk, _, _ in filas.order_by('-rank', '-fecha', '-pk')[desde:desde + cantidad]]
+
+
+class Resultados:
+    """
+    Resultados de buscar `texto` entre los datos de un dueño, ordenados por
+    relevancia. Se pueden rebanar como un queryset (lo que usa la paginación).
+    """
+
+    def __init__(self, user, grupo_id, filtro, texto):
+        self.propietario = f'g{int(grupo_id)}' if grupo_id else f'u{user.pk}'
+        self.filtro = filtro
+        self.texto = texto
+
+    def __getitem__(self, rebanada):
+        desde = rebanada.start or 0
+        cantidad = rebanada.stop - desde
+        if connection.vendor == 'postgresql':
+            ids = _ids_postgres(self.filtro, self.texto, desde, cantidad)
+        else:
+            ids = _ids_sqlite(self.propietario, self.texto, desde, cantidad)
+        return self._filas(ids)
+
+    def _filas(self, ids):
+        por_tipo = {}
+        for tipo, pk in ids:
+            por_tipo.setdefault(tipo, []).append(pk)
+        filas = {}
+        for tipo, pks in por_tipo.items():
+            # El filtro de dueño se repite: en SQLite los ids vienen del índice FTS5
+            for pk, fecha, monto, descripcion, categoria, bolsillo in TIPOS[tipo].objects.filter(
+                self.filtro, pk__in=pks
+            ).values_list('pk', 'fecha', 'monto', 'descripcion', 'categoria__nombre', 'bolsillo__nombre'):
+                filas[tipo, pk] = {
+                    'tipo': tipo,
+                    'id': pk,
+                    'fecha': fecha,
+                    'monto': str(monto),
+                    'descripcion': descripcion,
+                    'categoria': categoria,
+                    'bolsillo': bolsillo,
+                }
+        return [filas[clave] for clave in ids if clave in filas]
@@ -0,0 +1,143 @@
+"""
+Importación masiva de ingresos y egresos (extractos bancarios, migraciones).
+
+Cada fila lleva tipo (ing|eg), monto, fecha (YYYY-MM-DD) y opcionalmente
+descripcion, categoria y bolsillo (id o nombre). Se valida todo en memoria,
+categorías y bolsillos se resuelven con una consulta cada uno, y la vista inserta
+con bulk_create por lotes aplicando un único delta de saldo por bolsillo.
+"""
+import csv
+import datetime
+import io
+from decimal import Decimal
+
+from rest_framework import serializers
+
+from . import models, snapshots
+
+MAX_ERRORES = 50
+
+_MONTO_INVALIDO = 'El monto debe ser un número mayor a 0'
+_MONTO_PRECISION = 'El monto admite como máximo 12 dígitos enteros y 2 decimales'
+# Mismas reglas que Ingreso.monto/Egreso.monto (max_digits=14, decimal_places=2)
+MONTO = serializers.DecimalField(
+    max_digits=14, decimal_places=2, min_value=Decimal('0.01'),
+    error_messages={
+        'required': _MONTO_INVALIDO, 'null': _MONTO_INVALIDO, 'invalid': _MONTO_INVALIDO,
+        'min_value': _MONTO_INVALIDO, 'max_string_length': _MONTO_PRECISION,
+        'max_digits': _MONTO_PRECISION, 'max_decimal_places': _MONTO_PRECISION,
+        'max_whole_digits': _MONTO_PRECISION,
+    },
+)
+
+
+def leer_filas(request):
+    """
+    Filas como lista de dicts desde un archivo CSV (multipart, campo `file`) o
+    desde un JSON que sea una lista o {"movimientos": [...]}.
+    """
+    archivo = request.FILES.get('file')
+    if archivo is not None:
+        texto = io.TextIOWrapper(archivo.file, encoding='utf-8-sig')
+        return list(csv.DictReader(texto))
+    data = request.data
+    if isinstance(data, dict):
+        data = data.get('movimientos')
+    if not isinstance(data, list):
+        return None
+    return data
+
+
+def _indices(objetos, campo_id):
+    """(por_id, por_nombre) para resolver referencias por id o por nombre."""
+    por_id = {getattr(o, campo_id): o for o in objetos}
+    por_nombre = {}
+    for o in objetos:
+        clave = (o.nombre.strip().lower(), getattr(o, 'tipo', None))
+        por_nombre.setdefault(clave, o)
+    return por_id, por_nombre
+
+
+def _resolver(valor, por_id, por_nombre, tipo=None):
+    if valor in (None, ''):
+        return None, True
+    if isinstance(valor, int) or (isinstance(valor, str) and valor.strip().isdigit()):
+        obj = por_id.get(int(valor))
+        return obj, obj is not None
+    obj = por_nombre.get((str(valor).strip().lower(), tipo))
+    return obj, obj is not None
+
+
+def construir(filas, filtro, propietario):
+    """
+    Validar filas y construir instancias sin guardar.
+
+    filtro: dict para Categoria/Bolsillo del dueño (usuario o grupo).
+    propietario: kwargs comunes de cada transacción (usuario/grupo y creado_por).
+    Devuelve (ingresos, egresos, deltas, flujos, errores).
+    """
+    categorias = list(models.Categoria.objects.filter(**filtro).only('categoria_id', 'nombre', 'tipo'))
+    bolsillos = list(models.Bolsillo.objects.filter(**filtro).only('bolsillo_id', 'nombre'))
+    cat_por_id, cat_por_nombre = _indices(categorias, 'categoria_id')
+    bol_por_id, bol_por_nombre = _indices(bolsillos, 'bolsillo_id')
+
+    ingresos, egresos, errores = [], [], []
+    deltas, flujos = {}, {}
+
+    for i, fila in enumerate(filas, start=1):
+        if not isinstance(fila, dict):
+            errores.append({'fila': i, 'error': 'Cada fila debe ser un objeto'})
+            continue
+        tipo = str(fila.get('tipo') or '').strip().lower()
+        if tipo not in ('ing', 'eg'):
+            errores.append({'fila': i, 'error': 'El tipo debe ser "ing" o "eg"'})
+            continue
+        try:
+            monto = MONTO.run_validation(fila.get('monto'))
+        except serializers.ValidationError as exc:
+            errores.append({'fila': i, 'error': str(exc.detail[0])})
+            continue
+        try:
+            fecha = datetime.date.fromisoformat(str(fila.get('fecha')).strip())
+        except ValueError:
+            errores.append({'fila': i, 'error': 'La fecha debe tener formato YYYY-MM-DD'})
+            continue
+        categoria, ok = _resolver(fila.get('categoria'), cat_por_id, cat_por_nombre, tipo)
+        if not ok:
+            errores.append({'fila': i, 'error': f'La categoría "{fila.get("categoria")}" no existe'})
+            continue
+        if categoria is not None and categoria.tipo != tipo:
+            # Por nombre ya se busca con el tipo de la fila; por id hay que comprobarlo
+            errores.append({'fila': i, 'error': f'La categoría "{fila.get("categoria")}" es de tipo {categoria.tipo}, no {tipo}'})
+            continue
+        bolsillo, ok = _resolver(fila.get('bolsillo'), bol_por_id, bol_por_nombre)
+        if not ok:
+            errores.append({'fila': i, 'error': f'El bolsillo "{fila.get("bolsillo")}" no existe'})
+            continue
+
+        descripcion = str(fila.get('descripcion') or '').strip() or None
+        if descripcion and len(descripcion) > 255:
+            errores.append({'fila': i, 'error': 'La descripción no puede superar 255 caracteres'})
+            continue
+
+        datos = dict(
+            propietario,
+            categoria=categoria,
+            bolsillo=bolsillo,
+            monto=monto,
+            fecha=fecha,
+            descripcion=descripcion,
+        )
+        if tipo == 'ing':
+            ingresos.append(models.Ingreso(**datos))
+        else:
+            egresos.append(models.Egreso(**datos))
+        if bolsillo is not None:
+            delta = monto if tipo == 'ing' else -monto
+            deltas[bolsillo.pk] = deltas.get(bolsillo.pk, Decimal('0')) + delta
+            snapshots.flujo(flujos, bolsillo, fecha, **{'ingresos' if tipo == 'ing' else 'egresos': monto})
+
+        if len(errores) >= MAX_ERRORES:
+            break
+
+    return ingresos, egresos, deltas, flujos, errores
@@ -0,0 +1,37 @@
+"""
+Reconstruir BolsilloSnapshot desde el historial de ingresos, egresos y
+transferencias. Necesario una vez tras la migración 0012 (bolsillos con
+historial anterior) y útil si los snapshots se desalinean.
+
+    python manage.py backfill_snapshots
+    python manage.py backfill_snapshots --bolsillo 3 --bolsillo 7
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from finances import models, snapshots
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los snapshots diarios de saldo de los bolsillos desde su historial'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bolsillo', type=int, action='append', dest='bolsillos',
+                            help='id de bolsillo a reconstruir (repetible); por defecto todos')
+
+    def handle(self, *args, **options):
+        ids = models.Bolsillo.objects.order_by('pk').values_list('pk', flat=True)
+        if options['bolsillos']:
+            ids = ids.filter(pk__in=options['bolsillos'])
+
+        total_bolsillos = total_filas = 0
+        for pk in ids.iterator():
+            # Un bolsillo por transacción, bloqueado para que no cambie mientras se recalcula
+            with transaction.atomic():
+                bolsillo = models.Bolsillo.objects.select_for_update().get(pk=pk)
+                total_filas += snapshots.reconstruir(bolsillo)
+            total_bolsillos += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_bolsillos} bolsillos reconstruidos, {total_filas} snapshots diarios'
+        ))
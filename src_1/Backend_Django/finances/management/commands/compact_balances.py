@@ -0,0 +1,30 @@
+"""
+Sumar a Bolsillo.saldo los asientos pendientes del diario (entradas de
+transferencias que no bloquearon el bolsillo de destino, ver finances/balances.py).
+
+Cada transferencia ya intenta compactar su destino al confirmarse; este comando
+recoge lo que quedó pendiente (bolsillos que estaban bloqueados en ese momento o
+procesos que terminaron antes). Pensado para ejecutarse periódicamente:
+
+    python manage.py compact_balances
+    python manage.py compact_balances --bolsillo 3 --bolsillo 7
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from finances import balances
+
+
+class Command(BaseCommand):
+    help = 'Compacta en el saldo de cada bolsillo sus asientos pendientes de transferencias'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bolsillo', type=int, action='append', dest='bolsillos',
+                            help='id de bolsillo a compactar (repetible); por defecto todos')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        compactados = balances.compactar(options['bolsillos'])
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(f'{compactados} asientos compactados en {duracion:.1f}s'))
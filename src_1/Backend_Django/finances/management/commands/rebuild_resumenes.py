@@ -0,0 +1,32 @@
+"""
+Recalcular ResumenMensual desde ingresos y egresos, agregando en la base de
+datos por bloques de usuarios/grupos (una transacción por bloque).
+
+    python manage.py rebuild_resumenes
+    python manage.py rebuild_resumenes --usuario 5 --grupo 2 --chunk-size 200
+"""
+from django.core.management.base import BaseCommand
+
+from finances import resumenes
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el resumen mensual por dueño y categoría desde ingresos y egresos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', type=int, action='append', dest='usuarios',
+                            help='id de usuario (datos personales) a reconstruir; repetible')
+        parser.add_argument('--grupo', type=int, action='append', dest='grupos',
+                            help='id de grupo a reconstruir; repetible')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='usuarios o grupos agregados por transacción (default 500)')
+
+    def handle(self, *args, **options):
+        log = self.stdout.write if options['verbosity'] > 1 else None
+        filas = resumenes.reconstruir(
+            usuario_ids=options['usuarios'],
+            grupo_ids=options['grupos'],
+            chunk_size=options['chunk_size'],
+            log=log,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Resumen mensual reconstruido: {filas} filas'))
@@ -0,0 +1,77 @@
+"""
+Comparar Bolsillo.saldo con el saldo esperado según el historial (ver
+finances/reconciliacion.py) y, con --fix, corregir las diferencias.
+
+Los bolsillos se revisan por rangos de ids (--chunk-size); con --workers N los
+rangos se reparten entre N procesos, cada uno con su propia conexión.
+
+    python manage.py reconcile_balances
+    python manage.py reconcile_balances --workers 8 --chunk-size 20000
+    python manage.py reconcile_balances --fix
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from finances import reconciliacion
+
+
+def _inicializar_proceso():
+    # Con spawn/forkserver el proceso hijo arranca sin Django configurado
+    import django
+
+    django.setup()
+
+
+def _revisar(rango, corregir):
+    desde, hasta = rango
+    return rango, reconciliacion.revisar(desde, hasta, corregir=corregir)
+
+
+class Command(BaseCommand):
+    help = 'Concilia el saldo de cada bolsillo con su historial de transacciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true',
+                            help='dejar el saldo esperado en los bolsillos con diferencias')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='procesos en paralelo (default 1: en este proceso)')
+        parser.add_argument('--chunk-size', type=int, default=10000,
+                            help='ids de bolsillo por rango (default 10000)')
+
+    def handle(self, *args, **options):
+        corregir = options['fix']
+        inicio = time.perf_counter()
+        rangos = reconciliacion.rangos(options['chunk_size'])
+
+        if options['workers'] > 1 and len(rangos) > 1:
+            # Los hijos no deben heredar conexiones abiertas del proceso padre
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=_inicializar_proceso) as pool:
+                futuros = [pool.submit(_revisar, rango, corregir) for rango in rangos]
+                resultados = [f.result() for f in as_completed(futuros)]
+        else:
+            resultados = [_revisar(rango, corregir) for rango in rangos]
+
+        revisados = 0
+        diferencias = []
+        for (desde, hasta), (n, encontradas) in sorted(resultados, key=lambda r: r[0]):
+            revisados += n
+            diferencias.extend(encontradas)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'bolsillos {desde}-{hasta - 1}: {n} revisados, {len(encontradas)} con diferencias')
+
+        for d in diferencias:
+            self.stdout.write(
+                f"bolsillo {d['bolsillo_id']}: saldo {d['saldo']}, esperado {d['esperado']} "
+                f"(diferencia {d['diferencia']})"
+            )
+        duracion = time.perf_counter() - inicio
+        resumen = f'{revisados} bolsillos revisados en {duracion:.1f}s, {len(diferencias)} con diferencias'
+        if diferencias and not corregir:
+            raise CommandError(resumen + ' (usa --fix para corregirlas)')
+        if diferencias:
+            resumen += ' corregidas'
+        self.stdout.write(self.style.SUCCESS(resumen))
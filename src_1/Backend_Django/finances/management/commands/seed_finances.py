@@ -0,0 +1,499 @@
+"""
+Generar datos de prueba realistas: usuarios con sus bolsillos y categorías,
+grupos con miembros, ingresos (salario mensual y otros), egresos,
+transferencias entre bolsillos propios, aportaciones a grupos y gastos de grupo,
+repartidos en los últimos --years años.
+
+    python manage.py seed_finances --users 1000 --groups 100 --tx-per-user 200
+    python manage.py seed_finances --users 100000 --groups 10000 --tx-per-user 100 --workers 8
+
+Cada usuario se genera con su propio random.Random(seed, índice), así que el
+resultado solo depende de --seed, del número de usuarios/grupos y de la fecha
+de hoy, no de --workers ni de --chunk-size. Los ids se asignan explícitamente
+a partir del máximo existente de cada tabla, con un rango fijo por usuario (un
+hueco de --tx-per-user ids por tabla de transacciones); así los procesos
+insertan sin coordinarse y los objetos se enlazan antes de guardarse. Debe
+correrse con la base sin otras escrituras.
+
+El saldo de cada bolsillo es exactamente la suma de su historial (saldo_ajustes
+0) y ningún bolsillo queda en negativo en ninguna fecha. También se crean los
+snapshots diarios y el resumen mensual, de modo que `reconcile_balances` no
+encuentra diferencias.
+"""
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, time as hora, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from finances import models, reconciliacion, resumenes, snapshots
+
+BOLSILLOS = ('Cuenta principal', 'Ahorros', 'Efectivo')
+COLORES = ('#3b82f6', '#22c55e', '#f59e0b', '#ef4444', '#8b5cf6', '#14b8a6', '#ec4899', '#64748b')
+
+# (nombre, tipo, descripciones)
+CATEGORIAS = (
+    ('Salario', 'ing', ('Pago de nómina', 'Salario mensual')),
+    ('Freelance', 'ing', ('Proyecto freelance', 'Consultoría', 'Diseño web')),
+    ('Otros ingresos', 'ing', ('Venta de artículos', 'Reembolso', 'Intereses')),
+    ('Mercado', 'eg', ('Mercado semanal', 'Supermercado', 'Tienda de barrio', 'Frutas y verduras')),
+    ('Arriendo', 'eg', ('Pago de arriendo', 'Administración edificio')),
+    ('Transporte', 'eg', ('Taxi', 'Gasolina', 'Bus', 'Parqueadero')),
+    ('Restaurantes', 'eg', ('Almuerzo', 'Café', 'Cena con amigos', 'Domicilio')),
+    ('Servicios', 'eg', ('Luz', 'Agua', 'Internet', 'Plan celular')),
+    ('Salud', 'eg', ('Farmacia', 'Consulta médica', 'Gimnasio')),
+    ('Ocio', 'eg', ('Cine', 'Libros', 'Concierto', 'Viaje')),
+)
+CATEGORIAS_GRUPO = (
+    ('Mercado', 'eg', ('Mercado de la casa', 'Compras del mes')),
+    ('Servicios', 'eg', ('Servicios del apartamento', 'Internet de la casa')),
+    ('Paseos', 'eg', ('Paseo de fin de semana', 'Asado', 'Regalo de cumpleaños')),
+)
+NOMBRES = ('Ana', 'Luis', 'Camila', 'Andrés', 'Valentina', 'Juan', 'Sofía', 'Carlos', 'Laura', 'Diego', 'María', 'Felipe')
+APELLIDOS = ('García', 'Rodríguez', 'Martínez', 'López', 'Gómez', 'Pérez', 'Díaz', 'Torres', 'Ramírez', 'Vargas')
+GRUPOS = ('Casa', 'Familia', 'Viaje', 'Apartamento', 'Amigos', 'Oficina')
+
+# Ids que cada usuario y cada grupo ocupan en las tablas de datos fijos
+POR_USUARIO = {'bolsillo': len(BOLSILLOS), 'categoria': len(CATEGORIAS)}
+POR_GRUPO = {'bolsillo': 1, 'categoria': len(CATEGORIAS_GRUPO)}
+
+# Peso de cada tipo de transacción después de los salarios
+TIPOS = (('egreso', 75), ('transferencia', 10), ('ingreso', 5), ('aportacion', 5), ('gasto_grupo', 5))
+
+MODELOS = {
+    'usuario': models.Usuario,
+    'grupo': models.Grupo,
+    'bolsillo': models.Bolsillo,
+    'categoria': models.Categoria,
+    'ingreso': models.Ingreso,
+    'egreso': models.Egreso,
+    'transferencia': models.Transferencia,
+    'aportacion': models.Aportacion,
+}
+
+
+def _inicializar_proceso():
+    # Con spawn/forkserver el proceso hijo arranca sin Django configurado
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def _fechas_historicas():
+    """Desactivar auto_now_add para poder guardar fechas pasadas (transferencias, movimientos...)."""
+    campos = [
+        campo for modelo in (models.Grupo, models.Transferencia, models.Movimiento, models.Aportacion)
+        for campo in modelo._meta.concrete_fields if getattr(campo, 'auto_now_add', False)
+    ]
+    for campo in campos:
+        campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo in campos:
+            campo.auto_now_add = True
+
+
+def _pesos(rng, minimo, maximo):
+    """Monto aleatorio en miles de pesos entre minimo y maximo."""
+    return Decimal(rng.randrange(minimo // 1000, maximo // 1000 + 1) * 1000)
+
+
+def _momento(fecha, rng):
+    return timezone.make_aware(datetime.combine(fecha, hora(rng.randrange(7, 22), rng.randrange(60), rng.randrange(60))))
+
+
+def _grupo(plan, g):
+    """Ids y nombre del grupo número g (calculados, sin consultar la base)."""
+    bases = plan['bases']
+    categorias = bases['categoria'] + g * POR_GRUPO['categoria']
+    return {
+        'grupo_id': bases['grupo'] + g,
+        'nombre': f'{GRUPOS[g % len(GRUPOS)]} {g + 1}',
+        'general': bases['bolsillo'] + g,
+        'categorias': [(categorias + k, descripciones) for k, (_, _, descripciones) in enumerate(CATEGORIAS_GRUPO)],
+    }
+
+
+def _membresias(seed, usuarios, grupos):
+    """{índice de usuario: [(índice de grupo, rol)]} con grupos de 2 a 6 miembros."""
+    rng = random.Random(f'{seed}:grupos')
+    miembros = defaultdict(list)
+    for g in range(grupos if usuarios >= 2 else 0):
+        for n, u in enumerate(rng.sample(range(usuarios), min(usuarios, rng.randint(2, 6)))):
+            miembros[u].append((g, 'admin' if n == 0 else 'miembro'))
+    return miembros
+
+
+def _crear_grupos(plan, batch_size):
+    """Grupos (sin creador hasta que existan los usuarios), su bolsillo General y sus categorías."""
+    inicio = timezone.make_aware(datetime.combine(plan['desde'], hora(8)))
+    grupos, bolsillos, categorias = [], [], []
+    for g in range(plan['grupos']):
+        datos = _grupo(plan, g)
+        grupos.append(models.Grupo(
+            grupo_id=datos['grupo_id'], nombre=datos['nombre'], fecha_creacion=inicio,
+            descripcion=f'Gastos compartidos de {datos["nombre"]}',
+        ))
+        bolsillos.append(models.Bolsillo(
+            bolsillo_id=datos['general'], grupo_id=datos['grupo_id'], nombre='General', saldo=0, color=COLORES[0],
+        ))
+        for (pk, _), (nombre, tipo, _) in zip(datos['categorias'], CATEGORIAS_GRUPO):
+            categorias.append(models.Categoria(
+                categoria_id=pk, grupo_id=datos['grupo_id'], nombre=nombre, tipo=tipo,
+                color=COLORES[pk % len(COLORES)],
+            ))
+    with transaction.atomic(), _fechas_historicas():
+        models.Grupo.objects.bulk_create(grupos, batch_size=batch_size)
+        models.Bolsillo.objects.bulk_create(bolsillos, batch_size=batch_size)
+        models.Categoria.objects.bulk_create(categorias, batch_size=batch_size)
+
+
+class _Usuario:
+    """Historial de un usuario, generado en orden de fecha con sus saldos al día."""
+
+    def __init__(self, plan, i, rng):
+        self.plan = plan
+        self.rng = rng
+        bases = plan['bases']
+        k = plan['tx_por_usuario']
+        self.pk = bases['usuario'] + i
+        self.bolsillos = [bases['bolsillo'] + plan['grupos'] * POR_GRUPO['bolsillo'] + i * POR_USUARIO['bolsillo'] + n
+                          for n in range(len(BOLSILLOS))]
+        primera = bases['categoria'] + plan['grupos'] * POR_GRUPO['categoria'] + i * POR_USUARIO['categoria']
+        self.categorias = {nombre: (primera + n, descripciones) for n, (nombre, _, descripciones) in enumerate(CATEGORIAS)}
+        # Siguiente id libre de cada tabla dentro del rango del usuario
+        self.ids = {tabla: bases[tabla] + i * k for tabla in ('ingreso', 'egreso', 'transferencia', 'aportacion')}
+
+        nombre = f'{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}'
+        self.usuario = models.Usuario(
+            usuario_id=self.pk, email=f'seed{self.pk}@example.com', nombre=nombre, password=plan['password'],
+            date_joined=timezone.make_aware(datetime.combine(plan['desde'], hora(8))),
+        )
+        self.salario = _pesos(rng, 1_500_000, 9_000_000)
+        self.saldos = dict.fromkeys(self.bolsillos, Decimal('0'))
+        # Aportado y aún no gastado por grupo: los gastos de grupo del usuario nunca lo superan,
+        # así que el bolsillo General de cada grupo tampoco queda en negativo
+        self.disponible_grupo = {}
+
+        self.ingresos, self.egresos, self.transferencias, self.movimientos, self.aportaciones = [], [], [], [], []
+        self.flujos = defaultdict(lambda: [Decimal('0'), Decimal('0')])
+        self.resumen = defaultdict(lambda: [Decimal('0'), 0])
+
+    def _id(self, tabla):
+        pk = self.ids[tabla]
+        self.ids[tabla] += 1
+        return pk
+
+    def _mover(self, bolsillo, fecha, monto):
+        self.saldos[bolsillo] += monto
+        self.flujos[bolsillo, fecha][0 if monto > 0 else 1] += abs(monto)
+
+    def ingreso(self, fecha, categoria, monto, bolsillo=None):
+        bolsillo = bolsillo or self.bolsillos[0]
+        categoria_id, descripciones = self.categorias[categoria]
+        self.ingresos.append(models.Ingreso(
+            ingreso_id=self._id('ingreso'), usuario_id=self.pk, categoria_id=categoria_id, bolsillo_id=bolsillo,
+            monto=monto, fecha=fecha, descripcion=self.rng.choice(descripciones), creado_por_id=self.pk,
+        ))
+        self._mover(bolsillo, fecha, monto)
+        self.resumen[categoria_id, fecha.replace(day=1), 'ing'][0] += monto
+        self.resumen[categoria_id, fecha.replace(day=1), 'ing'][1] += 1
+
+    def egreso(self, fecha):
+        # Arriendo y servicios salen de la cuenta principal; el resto, a veces en efectivo
+        nombre, _, descripciones = self.rng.choice(CATEGORIAS[3:])
+        bolsillo = self.bolsillos[2] if nombre in ('Mercado', 'Restaurantes', 'Transporte') and self.rng.random() < 0.3 \
+            else self.bolsillos[0]
+        monto = _pesos(self.rng, 800_000, 2_500_000) if nombre == 'Arriendo' else _pesos(self.rng, 5_000, 300_000)
+        if self.saldos[bolsillo] < monto:
+            return self.ingreso(fecha, 'Otros ingresos', _pesos(self.rng, 50_000, 500_000), bolsillo)
+        categoria_id = self.categorias[nombre][0]
+        self.egresos.append(models.Egreso(
+            egreso_id=self._id('egreso'), usuario_id=self.pk, categoria_id=categoria_id, bolsillo_id=bolsillo,
+            monto=monto, fecha=fecha, descripcion=self.rng.choice(descripciones), creado_por_id=self.pk,
+        ))
+        self._mover(bolsillo, fecha, -monto)
+        self.resumen[categoria_id, fecha.replace(day=1), 'eg'][0] += monto
+        self.resumen[categoria_id, fecha.replace(day=1), 'eg'][1] += 1
+
+    def transferencia(self, fecha):
+        origen, destino = self.rng.choice(((0, 1), (0, 2), (1, 0)))
+        origen, destino = self.bolsillos[origen], self.bolsillos[destino]
+        monto = min(self.saldos[origen], _pesos(self.rng, 50_000, 1_000_000))
+        if monto <= 0:
+            return self.egreso(fecha)
+        momento = _momento(fecha, self.rng)
+        transferencia = models.Transferencia(
+            transferencia_id=self._id('transferencia'), de_bolsillo_id=origen, a_bolsillo_id=destino,
+            monto_origen=monto, monto_destino=monto, fecha=momento, descripcion=None, creado_por_id=self.pk,
+        )
+        self.transferencias.append(transferencia)
+        nombres = dict(zip(self.bolsillos, BOLSILLOS))
+        for tipo, bolsillo, descripcion in (
+            ('eg', origen, f'Transferencia a {nombres[destino]}'),
+            ('ing', destino, f'Transferencia desde {nombres[origen]}'),
+        ):
+            self.movimientos.append(models.Movimiento(
+                tipo=tipo, monto=monto, fecha=momento, descripcion=descripcion, usuario_id=self.pk,
+                bolsillo_id=bolsillo, transferencia_id=transferencia.transferencia_id,
+            ))
+        self._mover(origen, fecha, -monto)
+        self._mover(destino, fecha, monto)
+
+    def aportacion(self, fecha, grupo):
+        bolsillo = self.bolsillos[0]
+        monto = min(self.saldos[bolsillo], _pesos(self.rng, 20_000, 400_000))
+        if monto <= 0:
+            return self.egreso(fecha)
+        egreso = models.Egreso(
+            egreso_id=self._id('egreso'), usuario_id=self.pk, bolsillo_id=bolsillo, monto=monto, fecha=fecha,
+            descripcion=f'Aportación al grupo {grupo["nombre"]}', creado_por_id=self.pk,
+        )
+        ingreso = models.Ingreso(
+            ingreso_id=self._id('ingreso'), grupo_id=grupo['grupo_id'], bolsillo_id=grupo['general'], monto=monto,
+            fecha=fecha, descripcion=f'Aportación de {self.usuario.nombre}', creado_por_id=self.pk,
+        )
+        self.egresos.append(egreso)
+        self.ingresos.append(ingreso)
+        self.aportaciones.append(models.Aportacion(
+            aportacion_id=self._id('aportacion'), usuario_id=self.pk, grupo_id=grupo['grupo_id'], monto=monto,
+            fecha=fecha, descripcion='', egreso_usuario_id=egreso.egreso_id, ingreso_grupo_id=ingreso.ingreso_id,
+            bolsillo_usuario_id=bolsillo, bolsillo_grupo_id=grupo['general'], fecha_creacion=_momento(fecha, self.rng),
+        ))
+        self._mover(bolsillo, fecha, -monto)
+        self.resumen[None, fecha.replace(day=1), 'eg'][0] += monto
+        self.resumen[None, fecha.replace(day=1), 'eg'][1] += 1
+        self.disponible_grupo[grupo['grupo_id']] = self.disponible_grupo.get(grupo['grupo_id'], 0) + monto
+
+    def gasto_grupo(self, fecha, grupo):
+        monto = _pesos(self.rng, 10_000, 200_000)
+        if self.disponible_grupo.get(grupo['grupo_id'], 0) < monto:
+            return self.aportacion(fecha, grupo)
+        categoria_id, descripciones = self.rng.choice(grupo['categorias'])
+        self.egresos.append(models.Egreso(
+            egreso_id=self._id('egreso'), grupo_id=grupo['grupo_id'], categoria_id=categoria_id,
+            bolsillo_id=grupo['general'], monto=monto, fecha=fecha, descripcion=self.rng.choice(descripciones),
+            creado_por_id=self.pk,
+        ))
+        self.disponible_grupo[grupo['grupo_id']] -= monto
+
+    def generar(self, grupos):
+        plan, rng = self.plan, self.rng
+        desde, hoy, k = plan['desde'], plan['hoy'], plan['tx_por_usuario']
+        dias = (hoy - desde).days
+
+        # Salario en los primeros días de cada mes (los más recientes si no alcanzan las transacciones)
+        meses = []
+        mes = hoy.replace(day=1)
+        while mes >= desde and len(meses) < k // 4:
+            meses.append(mes)
+            mes = (mes - timedelta(days=1)).replace(day=1)
+        eventos = [(mes + timedelta(days=rng.randrange(5)), 'salario') for mes in meses]
+        tipos = [t for t, _ in TIPOS if grupos or t not in ('aportacion', 'gasto_grupo')]
+        pesos = [p for t, p in TIPOS if t in tipos]
+        eventos += [
+            (desde + timedelta(days=rng.randrange(dias + 1)), tipo)
+            for tipo in rng.choices(tipos, pesos, k=k - len(eventos))
+        ]
+
+        for fecha, tipo in sorted(eventos, key=lambda e: e[0]):
+            fecha = min(fecha, hoy)
+            if tipo == 'salario':
+                self.ingreso(fecha, 'Salario', self.salario)
+            elif tipo == 'ingreso':
+                self.ingreso(fecha, rng.choice(('Freelance', 'Otros ingresos')), _pesos(rng, 100_000, 2_000_000))
+            elif tipo == 'egreso':
+                self.egreso(fecha)
+            elif tipo == 'transferencia':
+                self.transferencia(fecha)
+            else:
+                getattr(self, tipo)(fecha, rng.choice(grupos))
+
+    def fijos(self):
+        """Usuario, bolsillos (con el saldo final) y categorías."""
+        bolsillos = [
+            models.Bolsillo(bolsillo_id=pk, usuario_id=self.pk, nombre=nombre, saldo=self.saldos[pk],
+                            color=COLORES[n % len(COLORES)])
+            for n, (pk, nombre) in enumerate(zip(self.bolsillos, BOLSILLOS))
+        ]
+        categorias = [
+            models.Categoria(categoria_id=self.categorias[nombre][0], usuario_id=self.pk, nombre=nombre, tipo=tipo,
+                             color=COLORES[n % len(COLORES)])
+            for n, (nombre, tipo, _) in enumerate(CATEGORIAS)
+        ]
+        return self.usuario, bolsillos, categorias
+
+    def filas_snapshot(self):
+        """Snapshots diarios de los bolsillos personales, con el saldo acumulado al final de cada día."""
+        filas = []
+        saldos = defaultdict(Decimal)
+        for (bolsillo, fecha), (ingresos, egresos) in sorted(self.flujos.items(), key=lambda f: (f[0][1], f[0][0])):
+            saldos[bolsillo] += ingresos - egresos
+            filas.append(models.BolsilloSnapshot(
+                bolsillo_id=bolsillo, fecha=fecha, saldo=saldos[bolsillo], ingresos=ingresos, egresos=egresos,
+            ))
+        return filas
+
+    def filas_resumen(self):
+        return [
+            models.ResumenMensual(usuario_id=self.pk, categoria_id=categoria_id, mes=mes, tipo=tipo,
+                                  total=total, conteo=conteo)
+            for (categoria_id, mes, tipo), (total, conteo) in self.resumen.items()
+        ]
+
+
+def _sembrar(plan, desde, hasta, membresias):
+    """Generar e insertar los usuarios [desde, hasta) en una transacción. Devuelve los conteos."""
+    filas = defaultdict(list)
+    for i in range(desde, hasta):
+        rng = random.Random(f'{plan["seed"]}:{i}')
+        usuario = _Usuario(plan, i, rng)
+        grupos = [_grupo(plan, g) for g, _ in membresias.get(i, ())]
+        usuario.generar(grupos)
+        fijo, bolsillos, categorias = usuario.fijos()
+        filas['usuario'].append(fijo)
+        filas['bolsillo'] += bolsillos
+        filas['categoria'] += categorias
+        filas['usuario_grupo'] += [
+            models.UsuarioGrupo(usuario_id=usuario.pk, grupo_id=plan['bases']['grupo'] + g, rol=rol)
+            for g, rol in membresias.get(i, ())
+        ]
+        filas['transferencia'] += usuario.transferencias
+        filas['ingreso'] += usuario.ingresos
+        filas['egreso'] += usuario.egresos
+        filas['movimiento'] += usuario.movimientos
+        filas['aportacion'] += usuario.aportaciones
+        filas['snapshot'] += usuario.filas_snapshot()
+        filas['resumen'] += usuario.filas_resumen()
+
+    # Orden de inserción según las claves foráneas
+    orden = (
+        ('usuario', models.Usuario), ('bolsillo', models.Bolsillo), ('categoria', models.Categoria),
+        ('usuario_grupo', models.UsuarioGrupo), ('transferencia', models.Transferencia),
+        ('ingreso', models.Ingreso), ('egreso', models.Egreso), ('movimiento', models.Movimiento),
+        ('aportacion', models.Aportacion), ('snapshot', models.BolsilloSnapshot), ('resumen', models.ResumenMensual),
+    )
+    with transaction.atomic(), _fechas_historicas():
+        for nombre, modelo in orden:
+            modelo.objects.bulk_create(filas[nombre], batch_size=plan['batch_size'])
+    return {nombre: len(filas[nombre]) for nombre, _ in orden}
+
+
+def _cerrar_grupos(plan, membresias, chunk_size):
+    """Creador de cada grupo, saldo del bolsillo General desde su historial, snapshots y resumen."""
+    admins = {g: plan['bases']['usuario'] + u for u, grupos in membresias.items() for g, rol in grupos if rol == 'admin'}
+    grupos = [models.Grupo(grupo_id=plan['bases']['grupo'] + g, creador_id=pk) for g, pk in admins.items()]
+    models.Grupo.objects.bulk_update(grupos, ['creador'], batch_size=plan['batch_size'])
+
+    generales = [_grupo(plan, g)['general'] for g in range(plan['grupos'])]
+    for inicio in range(0, len(generales), chunk_size):
+        ids = generales[inicio:inicio + chunk_size]
+        with transaction.atomic():
+            netos = reconciliacion.historial(ids=ids)
+            for bolsillo in models.Bolsillo.objects.select_for_update().filter(pk__in=ids).order_by('pk'):
+                bolsillo.saldo = netos.get(bolsillo.pk, Decimal('0'))
+                bolsillo.save(update_fields=['saldo'])
+                snapshots.reconstruir(bolsillo)
+    if plan['grupos']:
+        resumenes.reconstruir(grupo_ids=[plan['bases']['grupo'] + g for g in range(plan['grupos'])])
+
+
+class Command(BaseCommand):
+    help = 'Genera usuarios, grupos y transacciones de prueba con saldos coherentes con su historial'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='usuarios a crear (default 100)')
+        parser.add_argument('--groups', type=int, default=10, help='grupos a crear, de 2 a 6 miembros (default 10)')
+        parser.add_argument('--tx-per-user', type=int, default=100,
+                            help='transacciones por usuario: ingresos, egresos, transferencias y aportaciones (default 100)')
+        parser.add_argument('--years', type=int, default=2, help='años de historial hasta hoy (default 2)')
+        parser.add_argument('--seed', type=int, default=1, help='semilla; la misma semilla genera los mismos datos')
+        parser.add_argument('--batch-size', type=int, default=5000, help='filas por INSERT (default 5000)')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='usuarios por transacción y por tarea (default 500)')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='procesos en paralelo (default 1: en este proceso; en SQLite siempre 1)')
+        parser.add_argument('--password', help='contraseña de todos los usuarios creados (por defecto inutilizable)')
+
+    def handle(self, *args, **options):
+        usuarios, grupos = options['users'], options['groups']
+        if usuarios < 1 or grupos < 0 or options['tx_per_user'] < 1 or options['years'] < 1:
+            raise CommandError('--users, --tx-per-user y --years deben ser positivos y --groups no negativo')
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            # SQLite admite un solo escritor: los procesos se bloquearían entre sí
+            self.stderr.write('SQLite no admite escrituras en paralelo; se usa un solo proceso')
+            workers = 1
+
+        inicio = time.perf_counter()
+        hoy = timezone.localdate()
+        plan = {
+            'seed': options['seed'],
+            'grupos': grupos,
+            'tx_por_usuario': options['tx_per_user'],
+            'batch_size': options['batch_size'],
+            'hoy': hoy,
+            'desde': hoy.replace(year=hoy.year - options['years'], day=1),
+            # Un solo hash para todos: calcularlo por usuario tomaría más que generar sus datos
+            'password': make_password(options['password']),
+            # Primer id libre de cada tabla; cada usuario y grupo ocupa un rango fijo a partir de aquí
+            'bases': {
+                nombre: (modelo.objects.aggregate(m=Max('pk'))['m'] or 0) + 1 for nombre, modelo in MODELOS.items()
+            },
+        }
+        membresias = _membresias(options['seed'], usuarios, grupos)
+        _crear_grupos(plan, options['batch_size'])
+
+        tamano = options['chunk_size']
+        bloques = [(desde, min(desde + tamano, usuarios)) for desde in range(0, usuarios, tamano)]
+
+        def tarea(bloque):
+            desde, hasta = bloque
+            return plan, desde, hasta, {u: membresias[u] for u in range(desde, hasta) if u in membresias}
+
+        totales = defaultdict(int)
+
+        def sumar(bloque, conteos):
+            for nombre, n in conteos.items():
+                totales[nombre] += n
+            if options['verbosity'] > 1:
+                self.stdout.write(f'usuarios {bloque[0]}-{bloque[1] - 1}: {conteos["ingreso"] + conteos["egreso"]} '
+                                  f'ingresos/egresos, {conteos["transferencia"]} transferencias')
+
+        if workers > 1 and len(bloques) > 1:
+            # Los hijos no deben heredar conexiones abiertas del proceso padre
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_proceso) as pool:
+                futuros = {pool.submit(_sembrar, *tarea(bloque)): bloque for bloque in bloques}
+                for futuro in as_completed(futuros):
+                    sumar(futuros[futuro], futuro.result())
+        else:
+            for bloque in bloques:
+                sumar(bloque, _sembrar(*tarea(bloque)))
+
+        _cerrar_grupos(plan, membresias, tamano)
+
+        # Postgres: llevar las secuencias más allá de los ids explícitos
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), list(MODELOS.values())):
+                cursor.execute(sql)
+
+        duracion = time.perf_counter() - inicio
+        transacciones = totales['ingreso'] + totales['egreso'] + totales['transferencia']
+        self.stdout.write(self.style.SUCCESS(
+            f'{totales["usuario"]} usuarios, {grupos} grupos, {totales["ingreso"]} ingresos, '
+            f'{totales["egreso"]} egresos, {totales["transferencia"]} transferencias, '
+            f'{totales["aportacion"]} aportaciones en {duracion:.1f}s '
+            f'({transacciones / max(duracion, 1e-9):,.0f} transacciones/s)'
+        ))
@@ -0,0 +1,87 @@
+"""
+Caché de membresías y roles de grupo por usuario.
+
+Casi todas las acciones del API necesitan saber a qué grupos pertenece el usuario
+(y con qué rol). En lugar de consultar UsuarioGrupo en cada una, se guarda un
+dict {grupo_id: rol} por usuario en el framework de caché de Django
+(MEMBERSHIP_CACHE_ALIAS, por defecto 'default' = LocMemCache).
+
+La entrada de un usuario se invalida con las señales post_save/post_delete de
+UsuarioGrupo (ver signals.py). Con varios workers de gunicorn y LocMemCache cada
+proceso tiene su propia copia, así que MEMBERSHIP_CACHE_TTL limita cuánto puede
+tardar en verse un cambio hecho en otro worker; con un backend compartido
+(Redis, Memcached, base de datos) la invalidación es inmediata para todos.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+
+from . import models
+
+
+def _cache():
+    return caches[getattr(settings, 'MEMBERSHIP_CACHE_ALIAS', 'default')]
+
+
+def _key(usuario_id):
+    return f'finances:membresias:{usuario_id}'
+
+
+def _grupo_id(grupo):
+    """Normalizar grupo (instancia, id o string del query param) a int o None."""
+    grupo = getattr(grupo, 'pk', grupo)
+    try:
+        return int(grupo)
+    except (TypeError, ValueError):
+        return None
+
+
+def roles(user):
+    """
+    {grupo_id: rol} de todos los grupos del usuario. Es el único punto que
+    consulta UsuarioGrupo para permisos; el resto de helpers se apoyan en él.
+    """
+    if not user or user.is_anonymous:
+        return {}
+    cache = _cache()
+    key = _key(user.pk)
+    data = cache.get(key)
+    if data is None:
+        data = dict(models.UsuarioGrupo.objects.filter(usuario_id=user.pk).values_list('grupo_id', 'rol'))
+        cache.set(key, data, getattr(settings, 'MEMBERSHIP_CACHE_TTL', 300))
+    return data
+
+
+def grupos_ids(user):
+    """Lista de ids de grupos del usuario (para filtros grupo__in)."""
+    return list(roles(user))
+
+
+def bolsillos_visibles(user):
+    """
+    Lista de ids de los bolsillos que el usuario puede ver: los suyos y los de
+    sus grupos. Una consulta a bolsillo por los índices de usuario_id y grupo_id.
+    """
+    if not user or user.is_anonymous:
+        return []
+    return list(
+        models.Bolsillo.objects.filter(Q(usuario_id=user.pk) | Q(grupo_id__in=grupos_ids(user)))
+        .order_by().values_list('pk', flat=True)
+    )
+
+
+def rol(user, grupo):
+    """Rol del usuario en el grupo ('admin', 'miembro') o None si no es miembro."""
+    return roles(user).get(_grupo_id(grupo))
+
+
+def es_miembro(user, grupo):
+    return rol(user, grupo) is not None
+
+
+def es_admin(user, grupo):
+    return rol(user, grupo) == 'admin'
+
+
+def invalidar(usuario_id):
+    _cache().delete(_key(usuario_id))
@@ -0,0 +1,140 @@
+"""
+Métricas en formato Prometheus (GET /metrics) con prometheus_client.
+
+- MetricsMiddleware mide cada petición: latencia por vista y acción del viewset,
+  número de queries y respuestas con error (4xx/5xx). Funciona en WSGI y ASGI;
+  bajo ASGI no cuenta queries (el ORM corre en otro hilo, fuera del wrapper).
+- Los contadores de dominio (transferencias, aportaciones, rechazos por saldo
+  insuficiente) se incrementan desde finances.views.
+
+Con varios workers de gunicorn hay que definir PROMETHEUS_MULTIPROC_DIR (un
+directorio local escribible) antes de arrancar: cada worker escribe sus valores
+en archivos mmap y /metrics los suma al responder. gunicorn.conf.py limpia el
+directorio al arrancar y marca los workers que terminan. Sin esa variable las
+métricas son solo del proceso actual (runserver, un único worker).
+"""
+import os
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+PETICIONES = Counter(
+    'finances_http_requests_total', 'Peticiones HTTP atendidas',
+    ['view', 'action', 'method', 'status'],
+)
+LATENCIA = Histogram(
+    'finances_http_request_duration_seconds', 'Latencia de las peticiones HTTP',
+    ['view', 'action', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+QUERIES = Histogram(
+    'finances_db_queries_per_request', 'Queries SQL ejecutadas por petición',
+    ['view', 'action'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 500),
+)
+ERRORES = Counter(
+    'finances_http_errors_total', 'Respuestas con código 4xx o 5xx',
+    ['view', 'action', 'status'],
+)
+
+TRANSFERENCIAS = Counter('finances_transferencias_total', 'Transferencias entre bolsillos realizadas', ['ambito'])
+TRANSFERENCIAS_MONTO = Counter('finances_transferencias_monto_total', 'Monto total transferido entre bolsillos', ['ambito'])
+APORTACIONES = Counter('finances_aportaciones_total', 'Aportaciones a grupos realizadas')
+APORTACIONES_MONTO = Counter('finances_aportaciones_monto_total', 'Monto total aportado a grupos')
+SALDO_INSUFICIENTE = Counter(
+    'finances_saldo_insuficiente_total', 'Operaciones rechazadas por saldo insuficiente', ['operacion'],
+)
+TOKEN_CACHE = Counter('finances_token_cache_total', 'Consultas a la caché de tokens de autenticación', ['resultado'])
+TOKEN_CACHE_DESALOJOS = Counter(
+    'finances_token_cache_evictions_total', 'Entradas sacadas de la caché de tokens (por tamaño o por invalidación)',
+    ['motivo'],
+)
+# Con PROMETHEUS_MULTIPROC_DIR se suma el tamaño de la caché de los workers vivos
+TOKEN_CACHE_TAMANO = Gauge(
+    'finances_token_cache_size', 'Entradas en la caché de tokens de autenticación', multiprocess_mode='livesum',
+)
+
+
+def _etiquetas(view_func, method):
+    """(vista, acción): nombre de la clase y acción del viewset (list, retrieve, transferir...)."""
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return getattr(view_func, '__name__', 'desconocida'), method.lower()
+    acciones = getattr(view_func, 'actions', None) or {}
+    return cls.__name__, acciones.get(method.lower(), method.lower())
+
+
+class _ContadorQueries:
+    __slots__ = ('total',)
+
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self._acall(request)
+        contador = _ContadorQueries()
+        inicio = time.perf_counter()
+        with ExitStack() as stack:
+            for conexion in connections.all():
+                stack.enter_context(conexion.execute_wrapper(contador))
+            response = self.get_response(request)
+        self._registrar(request, response, time.perf_counter() - inicio, contador.total)
+        return response
+
+    async def _acall(self, request):
+        inicio = time.perf_counter()
+        response = await self.get_response(request)
+        self._registrar(request, response, time.perf_counter() - inicio, None)
+        return response
+
+    def _registrar(self, request, response, duracion, queries):
+        # La vista sale de resolver_match (no de process_view, que bajo ASGI
+        # costaría un salto a otro hilo por petición). Rutas sin vista (404 del
+        # resolver) quedan como 'sin_ruta'; el scrape de /metrics no se cuenta
+        match = getattr(request, 'resolver_match', None)
+        vista, accion = _etiquetas(match.func, request.method) if match else ('sin_ruta', '')
+        if vista == 'MetricsAPIView':
+            return
+        metodo = request.method
+        estado = str(response.status_code)
+        PETICIONES.labels(vista, accion, metodo, estado).inc()
+        LATENCIA.labels(vista, accion, metodo).observe(duracion)
+        if queries is not None:
+            QUERIES.labels(vista, accion).observe(queries)
+        if response.status_code >= 400:
+            ERRORES.labels(vista, accion, estado).inc()
+
+
+def exportar():
+    """(cuerpo, content_type) con las métricas de todos los workers."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0009_egreso_creado_por_ingreso_creado_por'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoVista',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('ing', 'ing'), ('eg', 'eg')], max_length=3)),
+                ('monto', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('fecha', models.DateField()),
+                ('descripcion', models.CharField(blank=True, max_length=255, null=True)),
+            ],
+            options={
+                'db_table': 'v_movimientos',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0010_movimiento_vista'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aportacion',
+            index=models.Index(fields=['grupo', 'fecha', 'aportacion_id'], name='idx_aportacion_grupo_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='egreso',
+            index=models.Index(condition=models.Q(('grupo__isnull', True)), fields=['usuario', 'fecha', 'egreso_id'], name='idx_egreso_usuario_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='egreso',
+            index=models.Index(condition=models.Q(('grupo__isnull', False)), fields=['grupo', 'fecha', 'egreso_id'], name='idx_egreso_grupo_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='ingreso',
+            index=models.Index(condition=models.Q(('grupo__isnull', True)), fields=['usuario', 'fecha', 'ingreso_id'], name='idx_ingreso_usuario_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='ingreso',
+            index=models.Index(condition=models.Q(('grupo__isnull', False)), fields=['grupo', 'fecha', 'ingreso_id'], name='idx_ingreso_grupo_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='movimiento',
+            index=models.Index(condition=models.Q(('grupo__isnull', True)), fields=['usuario', 'fecha', 'movimiento_id'], name='idx_mov_usuario_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='movimiento',
+            index=models.Index(condition=models.Q(('grupo__isnull', False)), fields=['grupo', 'fecha', 'movimiento_id'], name='idx_mov_grupo_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='transferencia',
+            index=models.Index(fields=['de_bolsillo', 'fecha', 'transferencia_id'], name='idx_transf_de_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='transferencia',
+            index=models.Index(fields=['a_bolsillo', 'fecha', 'transferencia_id'], name='idx_transf_a_fecha'),
+        ),
+    ]
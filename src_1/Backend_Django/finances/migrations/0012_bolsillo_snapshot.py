@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0011_owner_fecha_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BolsilloSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('saldo', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('egresos', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('bolsillo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='finances.bolsillo')),
+            ],
+            options={
+                'db_table': 'bolsillo_snapshot',
+                'constraints': [models.UniqueConstraint(fields=('bolsillo', 'fecha'), name='uk_snapshot_bolsillo_fecha')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def poblar(apps, schema_editor):
+    """
+    Llenar el resumen con el historial existente: una fila por dueño (usuario
+    sin grupo, o grupo), categoría, mes y tipo. Es lo mismo que hace
+    finances.resumenes.reconstruir(), copiado aquí para que la migración no
+    dependa del código actual de la app.
+    """
+    Resumen = apps.get_model('finances', 'ResumenMensual')
+    for nombre, tipo in (('Ingreso', 'ing'), ('Egreso', 'eg')):
+        filas = (
+            apps.get_model('finances', nombre).objects.order_by()
+            .annotate(mes=TruncMonth('fecha'))
+            .values('usuario_id', 'grupo_id', 'categoria_id', 'mes')
+            .annotate(total=Sum('monto'), conteo=Count('pk'))
+        )
+        Resumen.objects.bulk_create((
+            Resumen(
+                usuario_id=r['usuario_id'] if r['grupo_id'] is None else None, grupo_id=r['grupo_id'],
+                categoria_id=r['categoria_id'], mes=r['mes'], tipo=tipo, total=r['total'], conteo=r['conteo'],
+            )
+            for r in filas.iterator()
+        ), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0012_bolsillo_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField()),
+                ('tipo', models.CharField(choices=[('ing', 'ing'), ('eg', 'eg')], max_length=3)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('conteo', models.IntegerField(default=0)),
+                ('categoria', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='finances.categoria')),
+                ('grupo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='finances.grupo')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'resumen_mensual',
+                'indexes': [models.Index(condition=models.Q(('grupo__isnull', True)), fields=['usuario', 'mes'], name='idx_resumen_usuario_mes'), models.Index(condition=models.Q(('grupo__isnull', False)), fields=['grupo', 'mes'], name='idx_resumen_grupo_mes')],
+            },
+        ),
+        migrations.RunPython(poblar, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0013_resumen_mensual'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bolsillo',
+            name='saldo_ajustes',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=14),
+        ),
+    ]
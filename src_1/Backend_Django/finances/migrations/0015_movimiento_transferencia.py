@@ -0,0 +1,154 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:47
+
+import django.db.models.deletion
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from itertools import groupby
+
+from django.db import migrations, models, transaction
+from django.db.models import Case, F, Sum, When
+
+
+VENTANA = timedelta(seconds=5)
+
+
+def _emparejar(legs):
+    """
+    Pares (salida, entrada) sin ambigüedad de un mismo dueño y monto (ordenados
+    por fecha): la entrada tiene una sola salida candidata, de otro bolsillo y
+    registrada como mucho VENTANA antes, y esa salida no tiene otra entrada
+    candidata. Devuelve (pares, ambiguos).
+    """
+    candidatas = defaultdict(list)
+    for i, entrada in enumerate(legs):
+        if entrada.tipo != 'ing':
+            continue
+        for salida in reversed(legs[:i]):
+            if entrada.fecha - salida.fecha > VENTANA:
+                break
+            if salida.tipo == 'eg' and salida.bolsillo_id != entrada.bolsillo_id:
+                candidatas[entrada.pk].append(salida)
+    entradas_por_salida = defaultdict(int)
+    for salidas in candidatas.values():
+        for salida in salidas:
+            entradas_por_salida[salida.pk] += 1
+
+    por_pk = {m.pk: m for m in legs}
+    pares, ambiguos = [], []
+    for entrada_pk, salidas in candidatas.items():
+        if len(salidas) == 1 and entradas_por_salida[salidas[0].pk] == 1:
+            pares.append((salidas[0], por_pk[entrada_pk]))
+        else:
+            ambiguos.append(entrada_pk)
+            ambiguos.extend(s.pk for s in salidas)
+    return pares, ambiguos
+
+
+def _informar(titulo, ids):
+    if ids:
+        ids = sorted(set(ids))
+        muestra = ', '.join(map(str, ids[:20])) + (' ...' if len(ids) > 20 else '')
+        print(f'\n  0015: {len(ids)} {titulo} (movimiento_id: {muestra})', end='')
+
+
+def vincular(apps, schema_editor):
+    """
+    Crear la Transferencia de los pares salida/entrada que transferir() escribía
+    antes de esta migración (ver _emparejar). No se adivina: los asientos con
+    más de una pareja posible (transferencias iguales casi simultáneas) y los de
+    grupos sin creador (Transferencia necesita un autor) quedan sin vincular y
+    se informan. poblar_ajustes() cuenta su efecto en saldo_ajustes, así que la
+    conciliación sigue cuadrando; se pueden vincular a mano después.
+    """
+    Movimiento = apps.get_model('finances', 'Movimiento')
+    Transferencia = apps.get_model('finances', 'Transferencia')
+    Grupo = apps.get_model('finances', 'Grupo')
+    creadores = dict(Grupo.objects.values_list('pk', 'creador_id'))
+
+    pares, ambiguos, sin_autor = [], [], []
+    movimientos = (
+        Movimiento.objects.filter(transferencia__isnull=True, bolsillo__isnull=False)
+        .order_by('usuario_id', 'grupo_id', 'monto', 'fecha', 'pk').iterator()
+    )
+    for _, legs in groupby(movimientos, key=lambda m: (m.usuario_id, m.grupo_id, m.monto)):
+        encontrados, dudosos = _emparejar(list(legs))
+        ambiguos.extend(dudosos)
+        for salida, entrada in encontrados:
+            if salida.usuario_id or creadores.get(salida.grupo_id):
+                pares.append((salida, entrada))
+            else:
+                sin_autor.extend((salida.pk, entrada.pk))
+
+    for inicio in range(0, len(pares), 1000):
+        bloque = [
+            (salida, entrada, Transferencia(
+                de_bolsillo_id=salida.bolsillo_id, a_bolsillo_id=entrada.bolsillo_id,
+                monto_origen=salida.monto, monto_destino=entrada.monto,
+                descripcion=salida.descripcion, creado_por_id=salida.usuario_id or creadores[salida.grupo_id],
+            ))
+            for salida, entrada in pares[inicio:inicio + 1000]
+        ]
+        transferencias = Transferencia.objects.bulk_create([t for _, _, t in bloque])
+        for (salida, entrada, _), transferencia in zip(bloque, transferencias):
+            # auto_now_add pisó la fecha al insertar: conservar la original
+            transferencia.fecha = salida.fecha
+            salida.transferencia = entrada.transferencia = transferencia
+        Transferencia.objects.bulk_update(transferencias, ['fecha'])
+        Movimiento.objects.bulk_update([m for s, e, _ in bloque for m in (s, e)], ['transferencia'])
+
+    _informar('asientos con más de una pareja posible, sin vincular', ambiguos)
+    _informar('asientos de transferencias de grupos sin creador, sin vincular', sin_autor)
+
+
+def poblar_ajustes(apps, schema_editor):
+    """
+    Tomar los saldos actuales como correctos: saldo_ajustes (columna de 0014) es
+    lo que el historial no explica, saldo - (ingresos - egresos + asientos 'ing' -
+    asientos 'eg'), por bloques de 10000 bolsillos. Solo cuentan los movimientos
+    ya vinculados a una transferencia: uno suelto (POST /api/movimientos/) nunca
+    cambió el saldo.
+    """
+    Bolsillo = apps.get_model('finances', 'Bolsillo')
+    Movimiento = apps.get_model('finances', 'Movimiento')
+    historial = (
+        (apps.get_model('finances', 'Ingreso').objects, Sum('monto')),
+        (apps.get_model('finances', 'Egreso').objects, -Sum('monto')),
+        (Movimiento.objects.filter(transferencia__isnull=False),
+         Sum(Case(When(tipo='ing', then=F('monto')), default=-F('monto')))),
+    )
+    ids = Bolsillo.objects.order_by('pk').values_list('pk', flat=True)
+    primero, ultimo = ids.first(), ids.last()
+    if primero is None:
+        return
+    for desde in range(primero, ultimo + 1, 10000):
+        rango = {'bolsillo_id__gte': desde, 'bolsillo_id__lt': desde + 10000}
+        with transaction.atomic():
+            netos = {}
+            for queryset, neto in historial:
+                for pk, valor in (
+                    queryset.filter(**rango).order_by().values('bolsillo_id')
+                    .annotate(neto=neto).values_list('bolsillo_id', 'neto')
+                ):
+                    netos[pk] = netos.get(pk, Decimal('0')) + (valor or Decimal('0'))
+            filas = list(Bolsillo.objects.filter(pk__gte=desde, pk__lt=desde + 10000).only('pk', 'saldo'))
+            for bolsillo in filas:
+                bolsillo.saldo_ajustes = bolsillo.saldo - netos.get(bolsillo.pk, Decimal('0'))
+            Bolsillo.objects.bulk_update(filas, ['saldo_ajustes'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0014_bolsillo_saldo_ajustes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movimiento',
+            name='transferencia',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='movimientos', to='finances.transferencia'),
+        ),
+        migrations.RunPython(vincular, migrations.RunPython.noop),
+        migrations.RunPython(poblar_ajustes, migrations.RunPython.noop),
+    ]
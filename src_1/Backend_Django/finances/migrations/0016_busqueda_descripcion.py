@@ -0,0 +1,95 @@
+# Búsqueda de texto en ingreso/egreso.descripcion: índices GIN en Postgres,
+# tabla FTS5 con triggers en SQLite (ver finances/busqueda.py). El SQL de SQLite
+# es una copia del de busqueda.instalar_sqlite() en el momento de esta migración.
+from django.db import migrations
+
+# (tabla, pk, desplazamiento del rowid en movimiento_busqueda)
+SQLITE_TABLAS = (('ingreso', 'ingreso_id', 0), ('egreso', 'egreso_id', 1))
+
+SQLITE_FILA = """
+    SELECT {fila}.{pk} * 2 + {desplazamiento},
+           CASE WHEN {fila}.grupo_id IS NOT NULL THEN 'g' || {fila}.grupo_id ELSE 'u' || {fila}.usuario_id END,
+           {fila}.descripcion
+"""
+
+SQLITE_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_ai AFTER INSERT ON {tabla} BEGIN
+        INSERT INTO movimiento_busqueda (rowid, propietario, descripcion) {fila_nueva}
+        WHERE COALESCE(NEW.descripcion, '') != '';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_ad AFTER DELETE ON {tabla} BEGIN
+        DELETE FROM movimiento_busqueda WHERE rowid = OLD.{pk} * 2 + {desplazamiento};
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_au AFTER UPDATE OF descripcion, usuario_id, grupo_id ON {tabla} BEGIN
+        DELETE FROM movimiento_busqueda WHERE rowid = OLD.{pk} * 2 + {desplazamiento};
+        INSERT INTO movimiento_busqueda (rowid, propietario, descripcion) {fila_nueva}
+        WHERE COALESCE(NEW.descripcion, '') != '';
+    END
+    """,
+)
+
+
+def _nombre_indice(tabla):
+    return f'idx_{tabla}_busqueda'
+
+
+def _instalar_sqlite(ejecutar):
+    ejecutar(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS movimiento_busqueda USING fts5("
+        "propietario, descripcion, tokenize = 'unicode61 remove_diacritics 2', detail = column)"
+    )
+    for tabla, pk, desplazamiento in SQLITE_TABLAS:
+        fila = {'pk': pk, 'desplazamiento': desplazamiento}
+        for trigger in SQLITE_TRIGGERS:
+            ejecutar(trigger.format(tabla=tabla, fila_nueva=SQLITE_FILA.format(fila='NEW', **fila), **fila))
+        ejecutar(
+            'INSERT INTO movimiento_busqueda (rowid, propietario, descripcion) '
+            f"{SQLITE_FILA.format(fila=tabla, **fila)} FROM {tabla} WHERE COALESCE(descripcion, '') != ''"
+        )
+
+
+def _desinstalar_sqlite(ejecutar):
+    for tabla, _, _ in SQLITE_TABLAS:
+        for sufijo in ('ai', 'ad', 'au'):
+            ejecutar(f'DROP TRIGGER IF EXISTS {tabla}_busqueda_{sufijo}')
+    ejecutar('DROP TABLE IF EXISTS movimiento_busqueda')
+
+
+def crear(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+        from django.contrib.postgres.search import SearchVector
+
+        for modelo, tabla in (('Ingreso', 'ingreso'), ('Egreso', 'egreso')):
+            schema_editor.add_index(
+                apps.get_model('finances', modelo),
+                GinIndex(SearchVector('descripcion', config='spanish'), name=_nombre_indice(tabla)),
+            )
+    elif vendor == 'sqlite':
+        _instalar_sqlite(schema_editor.execute)
+
+
+def borrar(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for tabla in ('ingreso', 'egreso'):
+            schema_editor.execute(f'DROP INDEX IF EXISTS {_nombre_indice(tabla)}')
+    elif vendor == 'sqlite':
+        _desinstalar_sqlite(schema_editor.execute)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0015_movimiento_transferencia'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear, borrar),
+    ]
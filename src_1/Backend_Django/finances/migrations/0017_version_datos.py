@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0016_busqueda_descripcion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionDatos',
+            fields=[
+                ('propietario', models.CharField(max_length=24, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'version_datos',
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0017_version_datos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movimiento',
+            name='pendiente',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='movimiento',
+            index=models.Index(condition=models.Q(('pendiente', True)), fields=['bolsillo', 'movimiento_id'], name='idx_mov_pendiente'),
+        ),
+    ]
@@ -79,6 +79,9 @@ class Bolsillo(models.Model):
     grupo = models.ForeignKey(Grupo, on_delete=models.SET_NULL, null=True, blank=True)
     nombre = models.CharField(max_length=100)
     saldo = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
+    # Parte del saldo que no deja transacción (saldo inicial, ediciones manuales,
+    # traspasos con el bolsillo General); ver reconciliacion.py
+    saldo_ajustes = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
     # color para mostrar en UI (ej. #ef4444)
     color = models.CharField(max_length=7, default='#ef4444')
 
@@ -126,6 +129,10 @@ class Transferencia(models.Model):
             models.CheckConstraint(check=~models.Q(de_bolsillo=models.F('a_bolsillo')), name="chk_transferencia_bolsillos_diff"),
             models.CheckConstraint(check=(models.Q(monto_origen__gt=0) & models.Q(monto_destino__gt=0)), name="chk_transferencia_montos_pos"),
         ]
+        indexes = [
+            models.Index(fields=["de_bolsillo", "fecha", "transferencia_id"], name="idx_transf_de_fecha"),
+            models.Index(fields=["a_bolsillo", "fecha", "transferencia_id"], name="idx_transf_a_fecha"),
+        ]
 
 
 class Ingreso(models.Model):
@@ -146,6 +153,11 @@ class Ingreso(models.Model):
             models.CheckConstraint(check=(models.Q(usuario__isnull=True) ^ models.Q(grupo__isnull=True)), name="chk_ingreso_owner"),
             models.CheckConstraint(check=models.Q(monto__gt=0), name="chk_ingreso_monto"),
         ]
+        indexes = [
+            # Listados y agregados por dueño ordenados/agrupados por fecha
+            models.Index(fields=["usuario", "fecha", "ingreso_id"], name="idx_ingreso_usuario_fecha", condition=models.Q(grupo__isnull=True)),
+            models.Index(fields=["grupo", "fecha", "ingreso_id"], name="idx_ingreso_grupo_fecha", condition=models.Q(grupo__isnull=False)),
+        ]
 
 
 class Egreso(models.Model):
@@ -166,6 +178,10 @@ class Egreso(models.Model):
             models.CheckConstraint(check=(models.Q(usuario__isnull=True) ^ models.Q(grupo__isnull=True)), name="chk_egreso_owner"),
             models.CheckConstraint(check=models.Q(monto__gt=0), name="chk_egreso_monto"),
         ]
+        indexes = [
+            models.Index(fields=["usuario", "fecha", "egreso_id"], name="idx_egreso_usuario_fecha", condition=models.Q(grupo__isnull=True)),
+            models.Index(fields=["grupo", "fecha", "egreso_id"], name="idx_egreso_grupo_fecha", condition=models.Q(grupo__isnull=False)),
+        ]
 
 
 class Movimiento(models.Model):
@@ -179,6 +195,10 @@ class Movimiento(models.Model):
     grupo = models.ForeignKey(Grupo, on_delete=models.SET_NULL, null=True, blank=True)
     categoria = models.ForeignKey(Categoria, on_delete=models.SET_NULL, null=True, blank=True)
     bolsillo = models.ForeignKey(Bolsillo, on_delete=models.SET_NULL, null=True, blank=True)
+    # Transferencia a la que pertenece este asiento (una salida y una entrada por transferencia)
+    transferencia = models.ForeignKey(Transferencia, related_name='movimientos', on_delete=models.PROTECT, null=True, blank=True)
+    # Asiento anotado en el diario que aún no se sumó a Bolsillo.saldo (ver balances.compactar)
+    pendiente = models.BooleanField(default=False)
 
     class Meta:
         db_table = "movimiento"
@@ -186,6 +206,11 @@ class Movimiento(models.Model):
             models.CheckConstraint(check=(models.Q(usuario__isnull=True) ^ models.Q(grupo__isnull=True)), name="chk_movimiento_owner"),
             models.CheckConstraint(check=models.Q(monto__gt=0), name="chk_movimiento_monto"),
         ]
+        indexes = [
+            models.Index(fields=["usuario", "fecha", "movimiento_id"], name="idx_mov_usuario_fecha", condition=models.Q(grupo__isnull=True)),
+            models.Index(fields=["grupo", "fecha", "movimiento_id"], name="idx_mov_grupo_fecha", condition=models.Q(grupo__isnull=False)),
+            models.Index(fields=["bolsillo", "movimiento_id"], name="idx_mov_pendiente", condition=models.Q(pendiente=True)),
+        ]
 
 
 class Aportacion(models.Model):
@@ -215,7 +240,92 @@ class Aportacion(models.Model):
         constraints = [
             models.CheckConstraint(check=models.Q(monto__gt=0), name="chk_aportacion_monto"),
         ]
+        indexes = [
+            models.Index(fields=["grupo", "fecha", "aportacion_id"], name="idx_aportacion_grupo_fecha"),
+        ]
     
     def __str__(self):
         return f"{self.usuario.email} -> {self.grupo.nombre}: {self.monto}"
 
+
+class BolsilloSnapshot(models.Model):
+    """
+    Saldo de un bolsillo al final de cada día con movimientos, más las entradas
+    (ingresos) y salidas (egresos) de ese día. Se mantiene desde finances.balances
+    en cada cambio de saldo (ver finances/snapshots.py); el saldo de un día sin
+    fila es el de la última fila anterior.
+    """
+    bolsillo = models.ForeignKey(Bolsillo, on_delete=models.CASCADE, related_name='snapshots')
+    fecha = models.DateField()
+    saldo = models.DecimalField(max_digits=14, decimal_places=2)
+    ingresos = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    egresos = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = "bolsillo_snapshot"
+        constraints = [
+            models.UniqueConstraint(fields=["bolsillo", "fecha"], name="uk_snapshot_bolsillo_fecha"),
+        ]
+
+    def __str__(self):
+        return f"{self.bolsillo_id} {self.fecha}: {self.saldo}"
+
+
+class ResumenMensual(models.Model):
+    """
+    Totales de ingresos/egresos por dueño (usuario o grupo), categoría y mes.
+    Se mantiene desde las vistas de ingresos/egresos (ver finances/resumenes.py)
+    y se reconstruye con `manage.py rebuild_resumenes`. Siempre se lee con Sum():
+    una misma clave puede repartirse en varias filas (p. ej. al borrar una
+    categoría, sus filas pasan a categoria=NULL).
+    """
+    TIPO_CHOICES = [("ing", "ing"), ("eg", "eg")]
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    grupo = models.ForeignKey(Grupo, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    categoria = models.ForeignKey(Categoria, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    mes = models.DateField()
+    tipo = models.CharField(max_length=3, choices=TIPO_CHOICES)
+    total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    conteo = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "resumen_mensual"
+        indexes = [
+            models.Index(fields=["usuario", "mes"], name="idx_resumen_usuario_mes", condition=models.Q(grupo__isnull=True)),
+            models.Index(fields=["grupo", "mes"], name="idx_resumen_grupo_mes", condition=models.Q(grupo__isnull=False)),
+        ]
+
+
+
+class VersionDatos(models.Model):
+    """
+    Versión de los datos de un dueño ('u<usuario_id>' o 'g<grupo_id>'). Cambia
+    con cada escritura que afecta sus listados y se usa para calcular los ETag
+    (ver finances/versiones.py). El valor es opaco: solo importa que cambie.
+    """
+    propietario = models.CharField(max_length=24, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "version_datos"
+
+
+class MovimientoVista(models.Model):
+    """
+    Vista de solo lectura v_movimientos (ingresos y egresos unidos).
+    Los egresos aparecen con monto negativo. Ver migración 0002.
+    """
+    id = models.IntegerField(primary_key=True)
+    TIPO_CHOICES = [("ing", "ing"), ("eg", "eg")]
+    tipo = models.CharField(max_length=3, choices=TIPO_CHOICES)
+    monto = models.DecimalField(max_digits=14, decimal_places=2)
+    fecha = models.DateField()
+    descripcion = models.CharField(max_length=255, blank=True, null=True)
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, null=True, related_name='+', db_constraint=False)
+    grupo = models.ForeignKey(Grupo, on_delete=models.DO_NOTHING, null=True, related_name='+', db_constraint=False)
+    categoria = models.ForeignKey(Categoria, on_delete=models.DO_NOTHING, null=True, related_name='+', db_constraint=False)
+    bolsillo = models.ForeignKey(Bolsillo, on_delete=models.DO_NOTHING, null=True, related_name='+', db_constraint=False)
+
+    class Meta:
+        managed = False
+        db_table = "v_movimientos"
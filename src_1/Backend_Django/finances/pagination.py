@@ -0,0 +1,162 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class FechaCursorPagination(BasePagination):
+    """
+    Paginación por cursor (keyset) ordenada por (fecha, pk) descendente.
+
+    El cursor guarda la fecha y el pk de la última fila entregada y la siguiente
+    página se obtiene con WHERE (fecha, pk) < (cursor), así que una página profunda
+    cuesta lo mismo que la primera (no se usa OFFSET).
+
+    Modo compatibilidad (API_PAGINATION_MODE='opt-in', por defecto): solo se pagina
+    cuando el cliente envía `cursor` o `page_size`; si no, se devuelve la lista
+    completa como antes. Con 'always' se pagina siempre.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering_field = 'fecha'
+    invalid_cursor_message = 'Cursor inválido'
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'API_PAGE_SIZE', 100)
+        self.max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 1000)
+        self.mode = getattr(settings, 'API_PAGINATION_MODE', 'opt-in')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.should_paginate(request):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by('-' + self.ordering_field, '-pk')
+
+        cursor = self.decode_cursor(request, queryset.model)
+        if cursor is not None:
+            fecha, pk = cursor
+            queryset = queryset.filter(
+                Q(**{self.ordering_field + '__lt': fecha}) |
+                Q(**{self.ordering_field: fecha, 'pk__lt': pk})
+            )
+
+        # Pedir una fila extra para saber si hay página siguiente sin un COUNT(*)
+        results = list(queryset[:page_size + 1])
+        self.has_next = len(results) > page_size
+        self.page = results[:page_size]
+        return self.page
+
+    def should_paginate(self, request):
+        if self.mode == 'always':
+            return True
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(last))
+
+    def get_first_link(self):
+        return remove_query_param(self.base_url, self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('first', self.get_first_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def encode_cursor(self, instance):
+        # Instancia del modelo o fila de values() con 'pk' (listados ?fast=1)
+        if isinstance(instance, dict):
+            value, pk = instance[self.ordering_field], instance['pk']
+        else:
+            value, pk = getattr(instance, self.ordering_field), instance.pk
+        payload = json.dumps({'f': value.isoformat(), 'p': pk}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii'))
+            field = model._meta.get_field(self.ordering_field)
+            return field.to_python(payload['f']), int(payload['p'])
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+
+class RelevanciaPagination(FechaCursorPagination):
+    """
+    Paginación de resultados ordenados por relevancia (búsqueda de texto).
+
+    No hay una columna estable con la que hacer keyset, así que el cursor guarda
+    la posición (OFFSET) de la siguiente página; `queryset` puede ser cualquier
+    objeto que se rebane como un queryset (ver finances/busqueda.py). Siempre
+    pagina, aunque el cliente no envíe `cursor` ni `page_size`.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        self.offset = self.decode_cursor(request)
+
+        results = list(queryset[self.offset:self.offset + page_size + 1])
+        self.has_next = len(results) > page_size
+        self.page = results[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        cursor = self.encode_cursor(self.offset + len(self.page))
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def encode_cursor(self, offset):
+        payload = json.dumps({'o': offset}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request, model=None):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return 0
+        try:
+            offset = int(json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii'))['o'])
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        if offset < 0:
+            raise NotFound(self.invalid_cursor_message)
+        return offset
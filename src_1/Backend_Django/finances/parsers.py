@@ -0,0 +1,47 @@
+"""
+Parser JSON del API (DEFAULT_PARSER_CLASSES en settings.py).
+
+Lee el cuerpo de una vez y lo decodifica con orjson si está instalado, o con
+json.loads sin el StreamReader de codecs que usa rest_framework.parsers.JSONParser.
+Acepta y rechaza lo mismo que el parser de DRF (STRICT_JSON: sin NaN ni
+Infinity): si orjson no puede con un cuerpo (surrogates sueltos o un JSON
+inválido) se vuelve a leer con json, así que los datos y los mensajes de
+"JSON parse error" son los mismos. Los cuerpos con números de 19 dígitos o más
+van directo a json, porque orjson lee los enteros fuera de 64 bits como float.
+"""
+import json
+
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.json import strict_constant
+
+from .renderers import FastJSONRenderer, orjson
+
+# Tabla para bytes.translate: cada dígito a b'0' y el resto a b' '
+SOLO_DIGITOS = bytes(ord('0') if c in b'0123456789' else ord(' ') for c in range(256))
+NUMERO_LARGO = b'0' * 19
+
+
+class FastJSONParser(parsers.JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        cuerpo = stream.read()
+
+        if (
+            orjson is not None and self.strict and encoding.lower().replace('_', '-') in ('utf-8', 'utf8')
+            and NUMERO_LARGO not in cuerpo.translate(SOLO_DIGITOS)
+        ):
+            try:
+                return orjson.loads(cuerpo)
+            except orjson.JSONDecodeError:
+                pass
+
+        try:
+            parse_constant = strict_constant if self.strict else None
+            return json.loads(cuerpo.decode(encoding), parse_constant=parse_constant)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,140 @@
+"""
+Perfilado opcional por petición: número de queries, tiempo de base de datos,
+tiempo de serialización y tiempo de la vista.
+
+Se activa con PROFILING_ENABLED=1. Desactivado, el middleware lanza
+MiddlewareNotUsed y Django lo retira de la cadena al arrancar, así que no cuesta
+nada por petición. Activado:
+
+- añade las cabeceras Server-Timing (db, ser, view, total) y X-Query-Count;
+- registra en el logger 'finances.profiling' las peticiones que superan
+  PROFILING_SLOW_MS, con las queries repetidas agrupadas por huella (SQL sin
+  parámetros), que es como se ve un N+1.
+
+El tiempo de serialización se mide envolviendo BaseSerializer.data de DRF (solo
+cuando el perfilado está activo).
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('finances.profiling')
+
+_perfil = ContextVar('finances_profiling', default=None)
+
+_RE_IN = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_RE_NUM = re.compile(r'\b\d+\b')
+_RE_STR = re.compile(r"'(?:[^']|'')*'")
+
+
+def huella(sql):
+    """SQL normalizado: listas IN de cualquier tamaño y literales se colapsan."""
+    sql = _RE_STR.sub('?', sql)
+    sql = _RE_NUM.sub('?', sql)
+    return _RE_IN.sub('(...)', sql)
+
+
+class Perfil:
+    __slots__ = ('queries', 'db', 'ser', 'ser_nivel', 'inicio_vista', 'vista', 'huellas')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.ser = 0.0
+        self.ser_nivel = 0
+        self.inicio_vista = None
+        self.vista = 0.0
+        self.huellas = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper de Django: se llama en cada query de la conexión
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - inicio
+            self.queries += 1
+            self.huellas[huella(sql)] += 1
+
+    def repetidas(self, limite=5):
+        return [(sql, n) for sql, n in self.huellas.most_common(limite) if n > 1]
+
+
+def _instrumentar_serializers():
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data
+    if getattr(original.fget, '_perfilado', False):
+        return
+
+    def data(self):
+        perfil = _perfil.get()
+        if perfil is None:
+            return original.fget(self)
+        # Serializers anidados (p. ej. .data dentro de un SerializerMethodField) no se cuentan dos veces
+        perfil.ser_nivel += 1
+        inicio = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            perfil.ser_nivel -= 1
+            if not perfil.ser_nivel:
+                perfil.ser += time.perf_counter() - inicio
+
+    data._perfilado = True
+    BaseSerializer.data = property(data)
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.umbral = getattr(settings, 'PROFILING_SLOW_MS', 500) / 1000
+        _instrumentar_serializers()
+
+    def __call__(self, request):
+        perfil = Perfil()
+        token = _perfil.set(perfil)
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conexion in connections.all():
+                    stack.enter_context(conexion.execute_wrapper(perfil))
+                response = self.get_response(request)
+        finally:
+            _perfil.reset(token)
+        total = time.perf_counter() - inicio
+        if perfil.inicio_vista is not None:
+            perfil.vista = time.perf_counter() - perfil.inicio_vista
+
+        response['X-Query-Count'] = str(perfil.queries)
+        response['Server-Timing'] = ', '.join([
+            f'db;desc="SQL ({perfil.queries})";dur={perfil.db * 1000:.1f}',
+            f'ser;desc="Serializers";dur={perfil.ser * 1000:.1f}',
+            f'view;desc="Vista";dur={perfil.vista * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+        if total >= self.umbral:
+            repetidas = perfil.repetidas()
+            logger.warning(
+                'Petición lenta %s %s -> %s: %.0f ms, %d queries (%.0f ms SQL, %.0f ms serializers)%s',
+                request.method, request.get_full_path(), response.status_code,
+                total * 1000, perfil.queries, perfil.db * 1000, perfil.ser * 1000,
+                ''.join(f'\n  {n}x {sql}' for sql, n in repetidas),
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        perfil = _perfil.get()
+        if perfil is not None:
+            perfil.inicio_vista = time.perf_counter()
+        return None
@@ -0,0 +1,109 @@
+"""
+Conciliación de Bolsillo.saldo con el historial de transacciones.
+
+Bolsillo.saldo es un contador que las vistas mantienen a través de balances.py.
+El saldo esperado de un bolsillo es
+
+    saldo_ajustes + ingresos - egresos + asientos 'ing' - asientos 'eg'
+
+donde los asientos son los movimientos de una transferencia (transferencia no
+nula; un movimiento suelto nunca cambió el saldo) ya compactados (los pendientes
+del diario todavía no están en el saldo, ver balances.py) y saldo_ajustes acumula lo que
+no deja transacción (saldo inicial, ediciones manuales y traspasos con el
+bolsillo General al crear o editar bolsillos de grupo).
+
+revisar() compara un rango de ids sin bloquear nada: una lectura de bolsillos y
+una consulta agrupada (UNION ALL de ingresos, egresos y movimientos). Cada
+diferencia se confirma después con los bolsillos bloqueados, porque entre la
+lectura del saldo y la del historial pudo confirmarse una transacción. Con
+corregir=True el saldo confirmado se reemplaza por el esperado y se reconstruyen
+sus snapshots diarios.
+"""
+from decimal import Decimal
+
+from django.apps import apps as django_apps
+from django.db import transaction
+from django.db.models import Case, F, Sum, Value, When
+
+from . import balances, models, snapshots
+
+CERO = Decimal('0')
+
+
+def rangos(chunk_size, apps=None):
+    """Rangos [desde, hasta) de chunk_size ids que cubren todos los bolsillos."""
+    Bolsillo = (apps or django_apps).get_model('finances', 'Bolsillo')
+    extremos = Bolsillo.objects.order_by().values_list('pk', flat=True)
+    primero, ultimo = extremos.order_by('pk').first(), extremos.order_by('-pk').first()
+    if primero is None:
+        return []
+    return [(desde, min(desde + chunk_size, ultimo + 1)) for desde in range(primero, ultimo + 1, chunk_size)]
+
+
+def historial(desde=None, hasta=None, ids=None, apps=None):
+    """{bolsillo_id: neto del historial} para un rango de ids o una lista de ids."""
+    apps = apps or django_apps
+    filtro = {'bolsillo_id__in': ids} if ids is not None else {'bolsillo_id__gte': desde, 'bolsillo_id__lt': hasta}
+    Ingreso = apps.get_model('finances', 'Ingreso')
+    Egreso = apps.get_model('finances', 'Egreso')
+    Movimiento = apps.get_model('finances', 'Movimiento')
+
+    def agrupado(queryset, neto):
+        return queryset.filter(**filtro).order_by().values('bolsillo_id').annotate(neto=neto).values_list('bolsillo_id', 'neto')
+
+    consulta = agrupado(Ingreso.objects, Sum('monto')).union(
+        agrupado(Egreso.objects, Sum('monto') * Value(-1)),
+        agrupado(
+            Movimiento.objects.filter(transferencia__isnull=False, pendiente=False),
+            Sum(Case(When(tipo='ing', then=F('monto')), default=-F('monto'))),
+        ),
+        all=True,
+    )
+    netos = {}
+    for pk, neto in consulta:
+        netos[pk] = netos.get(pk, CERO) + (neto or CERO)
+    return netos
+
+
+def _diferencias(bolsillos, netos):
+    diferencias = []
+    for pk, saldo, ajustes in bolsillos:
+        esperado = ajustes + netos.get(pk, CERO)
+        if saldo != esperado:
+            diferencias.append({
+                'bolsillo_id': pk,
+                'saldo': saldo,
+                'esperado': esperado,
+                'diferencia': saldo - esperado,
+            })
+    return diferencias
+
+
+def revisar(desde, hasta, corregir=False):
+    """
+    Diferencias [{bolsillo_id, saldo, esperado, diferencia}] de los bolsillos
+    con id en [desde, hasta), confirmadas bajo bloqueo. Devuelve también cuántos
+    bolsillos se revisaron: (revisados, diferencias).
+    """
+    bolsillos = list(
+        models.Bolsillo.objects.filter(pk__gte=desde, pk__lt=hasta).order_by()
+        .values_list('pk', 'saldo', 'saldo_ajustes')
+    )
+    sospechosos = _diferencias(bolsillos, historial(desde, hasta))
+    if not sospechosos:
+        return len(bolsillos), []
+
+    with transaction.atomic():
+        bloqueados = balances.bloquear(*(d['bolsillo_id'] for d in sospechosos))
+        confirmadas = _diferencias(
+            [(b.pk, b.saldo, b.saldo_ajustes) for b in bloqueados.values()],
+            historial(ids=list(bloqueados)),
+        )
+        if corregir:
+            for d in confirmadas:
+                bolsillo = bloqueados[d['bolsillo_id']]
+                bolsillo.saldo = d['esperado']
+                bolsillo.save(update_fields=['saldo'])
+                snapshots.reconstruir(bolsillo)
+    return len(bolsillos), confirmadas
+
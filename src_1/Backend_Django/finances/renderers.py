@@ -0,0 +1,77 @@
+"""
+Renderer JSON del API (DEFAULT_RENDERER_CLASSES en settings.py).
+
+Con orjson instalado, FastJSONRenderer lo usa; sin él, usa json de la
+biblioteca estándar con un encoder que se arma una sola vez por proceso. En
+ambos casos la salida es byte a byte la de rest_framework.renderers.JSONRenderer:
+separadores compactos, UTF-8 sin escapar (UNICODE_JSON), U+2028/U+2029
+escapados, y los tipos que JSON no conoce (fechas, Decimal sueltos, UUID,
+lazy strings, querysets) pasan por el mismo encoders.JSONEncoder.default de DRF.
+Los DecimalField (saldo, monto) ya llegan como str desde los serializers
+(COERCE_DECIMAL_TO_STRING) y se copian tal cual, sin perder precisión.
+
+Si la petición pide indentación (Accept: application/json; indent=4, o la
+vista navegable), si la configuración no es la compacta por defecto, o si
+orjson no puede con un valor (un entero de más de 64 bits, claves que no son
+str), se usa el render de DRF. También si la salida de orjson tiene un float
+escrito distinto que repr() (ver _float_distinto). Un float NaN o infinito, que
+DRF rechaza (STRICT_JSON), sale como null con orjson; el API solo devuelve
+floats de montos y porcentajes.
+"""
+import functools
+import re
+
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Lo mismo que JSONRenderer hace con str.replace, sobre los bytes UTF-8
+SEPARADORES_JS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+# orjson escribe distinto que repr() los floats entre 1e-6 y 1e-4 (0.00001 y no
+# 1e-05) y los exponentes negativos de una cifra (1e-7 y no 1e-07). Los de dos o
+# tres cifras (1e-16) y los positivos (1e+16) coinciden.
+FLOAT_DISTINTO = re.compile(rb'(?:^|[,:\[-])0\.0000|\de-\d(?!\d)')
+
+
+@functools.cache
+def _encoder(encoder_class):
+    return encoder_class(ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+
+
+def _float_distinto(ret):
+    """¿Hay en la salida de orjson un float que repr() escribe distinto? (en textos solo da falsos positivos)"""
+    return FLOAT_DISTINTO.search(ret) is not None
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer con orjson (o un encoder reutilizado) para la salida compacta."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            self.ensure_ascii or not self.compact or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder = _encoder(self.encoder_class)
+        if orjson is not None:
+            try:
+                ret = orjson.dumps(data, default=encoder.default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+            except orjson.JSONEncodeError:
+                return super().render(data, accepted_media_type, renderer_context)
+            if _float_distinto(ret):
+                return super().render(data, accepted_media_type, renderer_context)
+            for caracter, escapado in SEPARADORES_JS:
+                if caracter in ret:
+                    ret = ret.replace(caracter, escapado)
+            return ret
+
+        ret = encoder.encode(data)
+        if '\u2028' in ret or '\u2029' in ret:
+            ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
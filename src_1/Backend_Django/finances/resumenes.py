@@ -0,0 +1,134 @@
+"""
+Mantenimiento de ResumenMensual (totales por dueño, categoría, mes y tipo).
+
+Las vistas que crean, editan o borran ingresos/egresos acumulan sus cambios con
+acumular() y los aplican con registrar() dentro de la misma transacción:
+
+    cambios = resumenes.acumular({}, ingreso_original, -1)
+    cambios = resumenes.acumular(cambios, ingreso_nuevo, +1)
+    resumenes.registrar(cambios)
+
+Cada clave suma sobre una sola fila (la de menor pk) con F(); si dos
+transacciones crean a la vez la misma clave quedan dos filas, lo que no afecta
+a los totales porque ResumenMensual siempre se lee con Sum().
+"""
+from decimal import Decimal
+
+from django.apps import apps as django_apps
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+from . import models
+
+
+def _mes(fecha):
+    fecha = models.ResumenMensual._meta.get_field('mes').to_python(fecha)
+    return fecha.replace(day=1)
+
+
+def acumular(cambios, transaccion, signo):
+    """
+    Sumar (signo=+1) o restar (signo=-1) un Ingreso/Egreso a {clave: [total, conteo]}.
+    """
+    tipo = 'ing' if isinstance(transaccion, models.Ingreso) else 'eg'
+    # grupo_id puede venir como string del request (serializer.save(grupo_id=...))
+    grupo_id = int(transaccion.grupo_id) if transaccion.grupo_id is not None else None
+    clave = (
+        transaccion.usuario_id if grupo_id is None else None,
+        grupo_id,
+        transaccion.categoria_id,
+        _mes(transaccion.fecha),
+        tipo,
+    )
+    actual = cambios.setdefault(clave, [Decimal('0'), 0])
+    actual[0] += Decimal(transaccion.monto) * signo
+    actual[1] += signo
+    return cambios
+
+
+def registrar(cambios):
+    """Aplicar {(usuario_id, grupo_id, categoria_id, mes, tipo): [total, conteo]}."""
+    # Orden fijo de claves: dos transacciones nunca actualizan filas en orden inverso
+    for clave in sorted(cambios, key=str):
+        total, conteo = cambios[clave]
+        if not total and not conteo:
+            continue
+        usuario_id, grupo_id, categoria_id, mes, tipo = clave
+        filtro = {
+            'usuario_id': usuario_id, 'grupo_id': grupo_id, 'categoria_id': categoria_id,
+            'mes': mes, 'tipo': tipo,
+        }
+        fila = models.ResumenMensual.objects.filter(**filtro).order_by('pk').values_list('pk', 'conteo').first()
+        if fila is None:
+            models.ResumenMensual.objects.create(total=total, conteo=conteo, **filtro)
+            continue
+        pk, conteo_actual = fila
+        models.ResumenMensual.objects.filter(pk=pk).update(total=F('total') + total, conteo=F('conteo') + conteo)
+        if conteo_actual + conteo <= 0:
+            # Ya no quedan transacciones en la fila (la condición se evalúa tras el UPDATE)
+            models.ResumenMensual.objects.filter(pk=pk, conteo__lte=0, total=0).delete()
+
+
+def registrar_lote(transacciones):
+    """Sumar transacciones nuevas (p. ej. tras bulk_create) en una sola pasada."""
+    cambios = {}
+    for transaccion in transacciones:
+        acumular(cambios, transaccion, 1)
+    registrar(cambios)
+
+
+def reconstruir(usuario_ids=None, grupo_ids=None, chunk_size=500, apps=None, log=None):
+    """
+    Recalcular ResumenMensual desde Ingreso/Egreso agregando en la base de datos
+    por bloques de chunk_size propietarios (una transacción por bloque). Sin ids
+    reconstruye todo. `apps` permite usarlo desde una migración.
+    Devuelve el número de filas creadas.
+    """
+    apps = apps or django_apps
+    Usuario = apps.get_model('finances', 'Usuario')
+    Grupo = apps.get_model('finances', 'Grupo')
+    Ingreso = apps.get_model('finances', 'Ingreso')
+    Egreso = apps.get_model('finances', 'Egreso')
+    Resumen = apps.get_model('finances', 'ResumenMensual')
+
+    todos = usuario_ids is None and grupo_ids is None
+    propietarios = []
+    if todos or usuario_ids:
+        ids = Usuario.objects.order_by('pk').values_list('pk', flat=True)
+        propietarios.append(('usuario', list(ids.filter(pk__in=usuario_ids) if usuario_ids else ids)))
+    if todos or grupo_ids:
+        ids = Grupo.objects.order_by('pk').values_list('pk', flat=True)
+        propietarios.append(('grupo', list(ids.filter(pk__in=grupo_ids) if grupo_ids else ids)))
+
+    creadas = 0
+    for campo, ids in propietarios:
+        for inicio in range(0, len(ids), chunk_size):
+            bloque = ids[inicio:inicio + chunk_size]
+            # Personales: usuario en el bloque y sin grupo; de grupo: grupo en el bloque
+            filtro = {f'{campo}_id__in': bloque}
+            if campo == 'usuario':
+                filtro['grupo__isnull'] = True
+            with transaction.atomic():
+                borrar = Resumen.objects.filter(**{f'{campo}_id__in': bloque})
+                if campo == 'usuario':
+                    borrar = borrar.filter(grupo__isnull=True)
+                borrar.delete()
+                filas = []
+                for modelo, tipo in ((Ingreso, 'ing'), (Egreso, 'eg')):
+                    for r in (
+                        modelo.objects.filter(**filtro).order_by()
+                        .annotate(mes=TruncMonth('fecha'))
+                        .values(f'{campo}_id', 'categoria_id', 'mes')
+                        .annotate(total=Sum('monto'), conteo=Count('pk'))
+                    ):
+                        filas.append(Resumen(
+                            **{f'{campo}_id': r[f'{campo}_id']},
+                            categoria_id=r['categoria_id'], mes=r['mes'], tipo=tipo,
+                            total=r['total'], conteo=r['conteo'],
+                        ))
+                Resumen.objects.bulk_create(filas, batch_size=1000)
+            creadas += len(filas)
+            if log:
+                log(f'{campo}s {bloque[0]}-{bloque[-1]}: {len(filas)} filas')
+    return creadas
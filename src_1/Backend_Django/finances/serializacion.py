@@ -0,0 +1,134 @@
+"""
+Lectura rápida de ingresos y egresos para listados grandes (?fast=1).
+
+IngresoSerializer/EgresoSerializer crean por fila el modelo, sus relaciones y
+dos serializers anidados. Aquí la consulta es un values() con las columnas de
+categoría, bolsillo y autor ya unidas, y cada fila se arma directamente como
+dict con la misma forma (y el mismo orden de claves) que el serializer:
+
+    {ingreso_id|egreso_id, categoria_detalle, bolsillo_detalle, monto, fecha,
+     descripcion, usuario, grupo, categoria, bolsillo, transferencia,
+     creado_por, creado_por_info}
+
+Si alguna fila no tiene creado_por ni usuario (ingresos de grupo creados por
+una aportación), su autor sale de una consulta más a aportacion.
+"""
+from decimal import Decimal
+
+from . import models
+
+CENTAVO = Decimal('0.01')
+
+CAMPOS = (
+    'pk', 'fecha', 'monto', 'descripcion', 'usuario_id', 'grupo_id', 'categoria_id', 'bolsillo_id',
+    'transferencia_id', 'creado_por_id',
+    'categoria__nombre', 'categoria__color', 'categoria__tipo', 'categoria__usuario_id', 'categoria__grupo_id',
+    'bolsillo__nombre', 'bolsillo__saldo', 'bolsillo__color', 'bolsillo__usuario_id', 'bolsillo__grupo_id',
+    'creado_por__email', 'creado_por__nombre', 'usuario__email', 'usuario__nombre',
+)
+
+# Campo de Aportacion que apunta a cada tipo de transacción (autor de las de grupo)
+APORTACION = {models.Ingreso: 'ingreso_grupo_id', models.Egreso: 'egreso_usuario_id'}
+
+
+def monto(valor):
+    """
+    Texto de un monto como serializers.DecimalField(decimal_places=2): cuantizado
+    y sin notación científica. También para totales de Sum(), que en SQLite
+    llegan sin escala fija (p. ej. 100 o 100.5).
+    """
+    return f'{Decimal(valor).quantize(CENTAVO):f}'
+
+
+def valores(queryset):
+    """El queryset de la vista como filas de CAMPOS (sin select_related/prefetch, que values() no usa)."""
+    # bolsillo_pendiente: asientos sin compactar del bolsillo (annotate de la vista)
+    extra = ('bolsillo_pendiente',) if 'bolsillo_pendiente' in queryset.query.annotations else ()
+    return queryset.select_related(None).prefetch_related(None).values(*CAMPOS, *extra)
+
+
+def _autores_aportacion(modelo, pks):
+    """{pk de la transacción: (usuario_id, email, nombre)} de su primera aportación."""
+    campo = APORTACION[modelo]
+    autores = {}
+    for pk, usuario_id, email, nombre in (
+        models.Aportacion.objects.filter(**{f'{campo}__in': pks}, usuario__isnull=False)
+        .order_by('pk').values_list(campo, 'usuario_id', 'usuario__email', 'usuario__nombre')
+    ):
+        autores.setdefault(pk, (usuario_id, email, nombre))
+    return autores
+
+
+def transacciones(modelo, filas):
+    """Lista de dicts con la forma de IngresoSerializer/EgresoSerializer para filas de valores()."""
+    filas = list(filas)
+    sin_autor = [f['pk'] for f in filas if f['creado_por_id'] is None and f['usuario_id'] is None]
+    autores = _autores_aportacion(modelo, sin_autor) if sin_autor else {}
+    pk_nombre = modelo._meta.pk.name
+
+    resultado = []
+    for f in filas:
+        categoria_id, bolsillo_id = f['categoria_id'], f['bolsillo_id']
+        if categoria_id is None:
+            categoria_detalle = categoria = None
+        else:
+            categoria_detalle = {
+                'categoria_id': categoria_id,
+                'nombre': f['categoria__nombre'],
+                'color': f['categoria__color'],
+                'tipo': f['categoria__tipo'],
+                'usuario': f['categoria__usuario_id'],
+                'grupo': f['categoria__grupo_id'],
+            }
+            categoria = {
+                'categoria_id': categoria_id,
+                'nombre': f['categoria__nombre'],
+                'color': f['categoria__color'],
+                'tipo': f['categoria__tipo'],
+            }
+        if bolsillo_id is None:
+            bolsillo_detalle = bolsillo = None
+        else:
+            saldo = f['bolsillo__saldo'] + f.get('bolsillo_pendiente', 0)
+            bolsillo_detalle = {
+                'bolsillo_id': bolsillo_id,
+                'nombre': f['bolsillo__nombre'],
+                'saldo': monto(saldo),
+                'color': f['bolsillo__color'],
+                'usuario': f['bolsillo__usuario_id'],
+                'grupo': f['bolsillo__grupo_id'],
+            }
+            bolsillo = {
+                'bolsillo_id': bolsillo_id,
+                'nombre': f['bolsillo__nombre'],
+                'saldo': str(saldo),
+                'color': f['bolsillo__color'],
+            }
+
+        # Mismo orden de prioridad que el serializer: creado_por > usuario > aportación
+        if f['creado_por_id'] is not None:
+            autor = {'usuario_id': f['creado_por_id'], 'email': f['creado_por__email'], 'nombre': f['creado_por__nombre']}
+        elif f['usuario_id'] is not None:
+            autor = {'usuario_id': f['usuario_id'], 'email': f['usuario__email'], 'nombre': f['usuario__nombre']}
+        elif f['pk'] in autores:
+            usuario_id, email, nombre = autores[f['pk']]
+            autor = {'usuario_id': usuario_id, 'email': email, 'nombre': nombre}
+        else:
+            autor = None
+
+        resultado.append({
+            pk_nombre: f['pk'],
+            'categoria_detalle': categoria_detalle,
+            'bolsillo_detalle': bolsillo_detalle,
+            'monto': monto(f['monto']),
+            'fecha': f['fecha'].isoformat(),
+            'descripcion': f['descripcion'],
+            'usuario': f['usuario_id'],
+            'grupo': f['grupo_id'],
+            'categoria': categoria,
+            'bolsillo': bolsillo,
+            'transferencia': f['transferencia_id'],
+            'creado_por': f['creado_por_id'],
+            'creado_por_info': autor,
+        })
+    return resultado
@@ -56,7 +56,15 @@ class GrupoSerializer(serializers.ModelSerializer):
 class BolsilloSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Bolsillo
-        fields = '__all__'
+        exclude = ['saldo_ajustes']
+
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        # Asientos de transferencias aún no compactados (annotate en BolsilloViewSet)
+        pendiente = getattr(instance, 'saldo_pendiente', None)
+        if pendiente:
+            representation['saldo'] = self.fields['saldo'].to_representation(instance.saldo + pendiente)
+        return representation
 
 
 class CategoriaSerializer(serializers.ModelSerializer):
@@ -81,6 +89,9 @@ class IngresoSerializer(serializers.ModelSerializer):
         fields = '__all__'
     
     def to_representation(self, instance):
+        # bolsillo_detalle (BolsilloSerializer) también suma los asientos pendientes
+        if instance.bolsillo is not None and hasattr(instance, 'bolsillo_pendiente'):
+            instance.bolsillo.saldo_pendiente = instance.bolsillo_pendiente
         representation = super().to_representation(instance)
         # Incluir información anidada de categoría y bolsillo
         if instance.categoria:
@@ -94,7 +105,7 @@ class IngresoSerializer(serializers.ModelSerializer):
             representation['bolsillo'] = {
                 'bolsillo_id': instance.bolsillo.bolsillo_id,
                 'nombre': instance.bolsillo.nombre,
-                'saldo': str(instance.bolsillo.saldo),
+                'saldo': str(instance.bolsillo.saldo + getattr(instance.bolsillo, 'saldo_pendiente', 0)),
                 'color': instance.bolsillo.color,
             }
         
@@ -109,8 +120,12 @@ class IngresoSerializer(serializers.ModelSerializer):
         elif instance.usuario:
             usuario_autor = instance.usuario
         # 3. Si es una aportación al grupo, buscar en la relación inversa
-        elif hasattr(instance, 'aportacion_ingreso'):
-            aportacion = instance.aportacion_ingreso.first()
+        #    (usar la relación precargada en get_queryset si existe)
+        else:
+            if hasattr(instance, 'aportaciones_prefetch'):
+                aportacion = instance.aportaciones_prefetch[0] if instance.aportaciones_prefetch else None
+            else:
+                aportacion = instance.aportacion_ingreso.select_related('usuario').first()
             if aportacion and aportacion.usuario:
                 usuario_autor = aportacion.usuario
         
@@ -137,6 +152,9 @@ class EgresoSerializer(serializers.ModelSerializer):
         fields = '__all__'
     
     def to_representation(self, instance):
+        # bolsillo_detalle (BolsilloSerializer) también suma los asientos pendientes
+        if instance.bolsillo is not None and hasattr(instance, 'bolsillo_pendiente'):
+            instance.bolsillo.saldo_pendiente = instance.bolsillo_pendiente
         representation = super().to_representation(instance)
         # Incluir información anidada de categoría y bolsillo
         if instance.categoria:
@@ -150,7 +168,7 @@ class EgresoSerializer(serializers.ModelSerializer):
             representation['bolsillo'] = {
                 'bolsillo_id': instance.bolsillo.bolsillo_id,
                 'nombre': instance.bolsillo.nombre,
-                'saldo': str(instance.bolsillo.saldo),
+                'saldo': str(instance.bolsillo.saldo + getattr(instance.bolsillo, 'saldo_pendiente', 0)),
                 'color': instance.bolsillo.color,
             }
         
@@ -165,8 +183,12 @@ class EgresoSerializer(serializers.ModelSerializer):
         elif instance.usuario:
             usuario_autor = instance.usuario
         # 3. Si es una aportación del grupo, buscar en la relación inversa
-        elif hasattr(instance, 'aportacion_egreso'):
-            aportacion = instance.aportacion_egreso.first()
+        #    (usar la relación precargada en get_queryset si existe)
+        else:
+            if hasattr(instance, 'aportaciones_prefetch'):
+                aportacion = instance.aportaciones_prefetch[0] if instance.aportaciones_prefetch else None
+            else:
+                aportacion = instance.aportacion_egreso.select_related('usuario').first()
             if aportacion and aportacion.usuario:
                 usuario_autor = aportacion.usuario
         
@@ -187,6 +209,8 @@ class MovimientoSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Movimiento
         fields = '__all__'
+        # Solo transferir() enlaza asientos con su transferencia
+        read_only_fields = ['transferencia']
 
 
 class UsuarioGrupoSerializer(serializers.ModelSerializer):
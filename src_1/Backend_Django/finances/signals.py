@@ -0,0 +1,60 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import busqueda, membership, models, versiones
+from .authentication import token_cache
+
+
+@receiver(post_save, sender=models.UsuarioGrupo)
+@receiver(post_delete, sender=models.UsuarioGrupo)
+def invalidar_membresias(sender, instance, **kwargs):
+    """Cualquier alta, cambio de rol o baja en un grupo invalida la caché del usuario."""
+    membership.invalidar(instance.usuario_id)
+
+
+@receiver(post_delete, sender=Token)
+def invalidar_token(sender, instance, **kwargs):
+    token_cache.evict_key(instance.key)
+
+
+@receiver(post_save, sender=models.Usuario)
+@receiver(post_delete, sender=models.Usuario)
+def invalidar_tokens_usuario(sender, instance, **kwargs):
+    """Al desactivar, editar o borrar un usuario se descartan sus tokens cacheados."""
+    token_cache.evict_user(instance.pk)
+
+
+@receiver(post_save, sender=models.Bolsillo)
+@receiver(post_delete, sender=models.Bolsillo)
+@receiver(post_save, sender=models.Categoria)
+@receiver(post_delete, sender=models.Categoria)
+@receiver(post_save, sender=models.Ingreso)
+@receiver(post_delete, sender=models.Ingreso)
+@receiver(post_save, sender=models.Egreso)
+@receiver(post_delete, sender=models.Egreso)
+def marcar_version(sender, instance, **kwargs):
+    """Toda alta, cambio (incluido el saldo de un bolsillo) o baja invalida los ETag del dueño."""
+    versiones.marcar(versiones.de_instancia(instance))
+
+
+@receiver(post_save, sender=models.Usuario)
+def marcar_version_usuario(sender, instance, created, update_fields=None, **kwargs):
+    """El nombre y el email del autor aparecen en los ingresos/egresos propios y de sus grupos."""
+    if created or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    versiones.marcar(
+        versiones.propietario(usuario_id=instance.pk),
+        *(versiones.propietario(grupo_id=g) for g in membership.grupos_ids(instance)),
+    )
+
+@receiver(post_migrate)
+def reinstalar_busqueda(sender, using, **kwargs):
+    """En SQLite, recrear los triggers de búsqueda si un ALTER rehízo ingreso o egreso."""
+    connection = connections[using]
+    if sender.name != 'finances' or connection.vendor != 'sqlite':
+        return
+    if 'movimiento_busqueda' in connection.introspection.table_names():
+        with connection.cursor() as cursor:
+            busqueda.instalar_sqlite(cursor.execute)
@@ -0,0 +1,119 @@
+"""
+Mantenimiento de BolsilloSnapshot (saldo diario por bolsillo).
+
+balances.aplicar() llama a registrar() con los flujos del cambio: para cada
+(bolsillo, fecha) cuánto cambian las entradas y las salidas de ese día (pueden
+ser negativos, p. ej. al borrar o editar un ingreso). Después se recalcula el
+saldo de las filas desde la fecha más antigua tocada hasta hoy, hacia atrás a
+partir del saldo actual del bolsillo:
+
+    saldo(último día) = Bolsillo.saldo
+    saldo(día anterior) = saldo(día) - (ingresos(día) - egresos(día))
+
+Con movimientos del día solo se toca una fila; una transacción con fecha
+pasada reescribe las filas desde esa fecha (O(días), no O(transacciones)).
+Como el bolsillo está bloqueado (o recién actualizado) en la misma transacción,
+las escrituras sobre sus snapshots quedan serializadas.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+from . import models
+
+CERO = Decimal('0')
+
+
+def flujo(flujos, bolsillo, fecha, ingresos=CERO, egresos=CERO):
+    """Acumular entradas/salidas de un bolsillo en una fecha (ignora bolsillo None)."""
+    if bolsillo is not None and (ingresos or egresos):
+        # Acepta date, datetime o 'YYYY-MM-DD' (p. ej. la fecha tal como llega en request.data)
+        fecha = models.BolsilloSnapshot._meta.get_field('fecha').to_python(fecha)
+        actual = flujos.setdefault((getattr(bolsillo, 'pk', bolsillo), fecha), [CERO, CERO])
+        actual[0] += Decimal(ingresos)
+        actual[1] += Decimal(egresos)
+    return flujos
+
+
+def _saldos_hacia_atras(filas, saldo_actual):
+    """Asignar el saldo de cada fila (ordenadas por fecha) terminando en saldo_actual."""
+    saldo = saldo_actual
+    for fila in reversed(filas):
+        fila.saldo = saldo
+        saldo -= fila.ingresos - fila.egresos
+
+
+def registrar(flujos, saldos):
+    """
+    flujos: {(bolsillo_id, fecha): [ingresos, egresos]} con los cambios a sumar.
+    saldos: {bolsillo_id: saldo actual}, ya con el cambio aplicado.
+    """
+    por_bolsillo = defaultdict(dict)
+    for (pk, fecha), (ingresos, egresos) in flujos.items():
+        if ingresos or egresos:
+            por_bolsillo[pk][fecha] = (ingresos, egresos)
+
+    for pk in sorted(por_bolsillo):
+        dias = por_bolsillo[pk]
+        existentes = {
+            s.fecha: s for s in models.BolsilloSnapshot.objects.filter(bolsillo_id=pk, fecha__gte=min(dias))
+        }
+        nuevas = []
+        for fecha, (ingresos, egresos) in dias.items():
+            fila = existentes.get(fecha)
+            if fila is None:
+                fila = models.BolsilloSnapshot(bolsillo_id=pk, fecha=fecha, saldo=CERO, ingresos=CERO, egresos=CERO)
+                nuevas.append(fila)
+            fila.ingresos += ingresos
+            fila.egresos += egresos
+        # Un día que se queda sin entradas ni salidas (p. ej. se borró su único
+        # egreso) no aporta nada: su saldo es el del día anterior
+        vacias = [f for f in existentes.values() if not f.ingresos and not f.egresos]
+        filas = sorted(
+            [f for f in [*existentes.values(), *nuevas] if f.ingresos or f.egresos],
+            key=lambda s: s.fecha,
+        )
+        _saldos_hacia_atras(filas, saldos[pk])
+        if vacias:
+            models.BolsilloSnapshot.objects.filter(pk__in=[f.pk for f in vacias]).delete()
+        actualizadas = [f for f in filas if f.pk is not None]
+        if actualizadas:
+            models.BolsilloSnapshot.objects.bulk_update(actualizadas, ['saldo', 'ingresos', 'egresos'])
+        creadas = [f for f in filas if f.pk is None]
+        if creadas:
+            models.BolsilloSnapshot.objects.bulk_create(creadas)
+
+
+def reconstruir(bolsillo):
+    """
+    Reemplazar los snapshots de un bolsillo calculándolos desde el historial
+    (ingresos, egresos y movimientos de transferencias). El saldo que no explica
+    el historial (saldo inicial, ajustes manuales) queda antes del primer día.
+    Debe llamarse con el bolsillo bloqueado. Devuelve el número de filas.
+    """
+    flujos = {}
+    for modelo, campo in ((models.Ingreso, 'ingresos'), (models.Egreso, 'egresos')):
+        for fecha, total in (
+            modelo.objects.filter(bolsillo=bolsillo).order_by()
+            .values('fecha').annotate(total=Sum('monto')).values_list('fecha', 'total')
+        ):
+            flujo(flujos, bolsillo, fecha, **{campo: total})
+    for tipo, fecha, total in (
+        # Solo asientos de transferencias ya compactados: un movimiento suelto no
+        # cambió el saldo y los pendientes aún no están en él
+        models.Movimiento.objects.filter(bolsillo=bolsillo, transferencia__isnull=False, pendiente=False).order_by()
+        .annotate(dia=TruncDate('fecha'))
+        .values('tipo', 'dia').annotate(total=Sum('monto')).values_list('tipo', 'dia', 'total')
+    ):
+        flujo(flujos, bolsillo, fecha, **{'ingresos' if tipo == 'ing' else 'egresos': total})
+
+    filas = [
+        models.BolsilloSnapshot(bolsillo_id=bolsillo.pk, fecha=fecha, saldo=CERO, ingresos=ingresos, egresos=egresos)
+        for (_, fecha), (ingresos, egresos) in sorted(flujos.items(), key=lambda item: item[0][1])
+    ]
+    _saldos_hacia_atras(filas, bolsillo.saldo)
+    models.BolsilloSnapshot.objects.filter(bolsillo_id=bolsillo.pk).delete()
+    models.BolsilloSnapshot.objects.bulk_create(filas)
+    return len(filas)
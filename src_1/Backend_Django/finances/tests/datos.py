@@ -0,0 +1,60 @@
+"""Datos de prueba compartidos por los tests de finances."""
+import datetime
+
+from finances import models
+
+
+def crear_datos(n, prefijo):
+    """
+    Usuario con n filas de cada tipo (bolsillos, categorías, ingresos, egresos,
+    aportaciones y miembros de su grupo), personales y en su grupo.
+    Devuelve (usuario, ids) con un id de cada tipo para las rutas de detalle.
+    """
+    usuario = models.Usuario.objects.create_user(email=f'{prefijo}@example.com', password='x', nombre=prefijo)
+    grupo = models.Grupo.objects.create(nombre=prefijo, creador=usuario)
+    models.UsuarioGrupo.objects.create(usuario=usuario, grupo=grupo, rol='admin')
+    otros = models.Usuario.objects.bulk_create([
+        models.Usuario(email=f'{prefijo}-{i}@example.com', nombre=f'{prefijo} {i}', password='!') for i in range(n)
+    ])
+    models.UsuarioGrupo.objects.bulk_create([models.UsuarioGrupo(usuario=u, grupo=grupo) for u in otros])
+
+    duenos = ({'usuario': usuario}, {'grupo': grupo})
+    bolsillos, categorias = {}, {}
+    for dueno in duenos:
+        clave = 'grupo' if 'grupo' in dueno else 'usuario'
+        bolsillos[clave] = models.Bolsillo.objects.bulk_create([
+            models.Bolsillo(nombre=f'b{i}', saldo=1000, **dueno) for i in range(n)
+        ])
+        categorias[clave] = models.Categoria.objects.bulk_create([
+            models.Categoria(nombre=f'c{i}', tipo='eg' if i % 2 else 'ing', **dueno) for i in range(n)
+        ])
+
+    fecha = datetime.date(2025, 1, 1)
+    filas = {}
+    for modelo in (models.Ingreso, models.Egreso):
+        for dueno in duenos:
+            clave = 'grupo' if 'grupo' in dueno else 'usuario'
+            filas[modelo, clave] = modelo.objects.bulk_create([
+                modelo(monto=i + 1, fecha=fecha + datetime.timedelta(days=i % 365), descripcion=f'fila {i}',
+                       bolsillo=bolsillos[clave][i], categoria=categorias[clave][i],
+                       creado_por=usuario if i % 2 else None, **dueno)
+                for i in range(n)
+            ])
+    # Aportaciones: egreso personal + ingreso de grupo sin creado_por (el autor sale de la aportación)
+    models.Aportacion.objects.bulk_create([
+        models.Aportacion(
+            usuario=usuario, grupo=grupo, monto=i + 1, fecha=fecha, egreso_usuario=filas[models.Egreso, 'usuario'][i],
+            ingreso_grupo=filas[models.Ingreso, 'grupo'][i], bolsillo_usuario=bolsillos['usuario'][i],
+            bolsillo_grupo=bolsillos['grupo'][i],
+        )
+        for i in range(0, n, 2)
+    ])
+    ids = {
+        'grupo': grupo.pk,
+        'bolsillo': bolsillos['usuario'][0].pk,
+        'categoria': categorias['usuario'][0].pk,
+        'ingreso': filas[models.Ingreso, 'grupo'][0].pk,
+        'egreso': filas[models.Egreso, 'usuario'][0].pk,
+        'aportacion': models.Aportacion.objects.filter(usuario=usuario).values_list('pk', flat=True).first(),
+    }
+    return usuario, ids
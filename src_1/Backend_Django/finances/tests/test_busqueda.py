@@ -0,0 +1,88 @@
+"""
+GET /api/movimientos/search/: coincidencias por descripción solo del dueño
+pedido, ordenadas por relevancia, con el índice al día tras editar o borrar
+(triggers de movimiento_busqueda en SQLite, to_tsvector en Postgres).
+"""
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from finances import models
+
+URL = '/api/movimientos/search/'
+FECHA = datetime.date(2025, 3, 1)
+
+
+class BusquedaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = models.Usuario.objects.create_user(email='busca@example.com', password='x')
+        cls.otro = models.Usuario.objects.create_user(email='otro@example.com', password='x')
+        cls.grupo = models.Grupo.objects.create(nombre='Casa', creador=cls.usuario)
+        models.UsuarioGrupo.objects.create(usuario=cls.usuario, grupo=cls.grupo, rol='admin')
+
+        def ingreso(descripcion, **dueno):
+            return models.Ingreso.objects.create(monto=1, fecha=FECHA, descripcion=descripcion, **dueno)
+
+        def egreso(descripcion, **dueno):
+            return models.Egreso.objects.create(monto=1, fecha=FECHA, descripcion=descripcion, **dueno)
+
+        cls.mercado = egreso('Mercado mercado mercado', usuario=cls.usuario)
+        cls.mercado_largo = egreso('Mercado de la semana con frutas verduras y otras compras', usuario=cls.usuario)
+        cls.reembolso = ingreso('Reembolso mercado', usuario=cls.usuario)
+        cls.salario = ingreso('Salario marzo', usuario=cls.usuario)
+        cls.ajeno = egreso('Mercado mercado mercado', usuario=cls.otro)
+        cls.del_grupo = egreso('Mercado del grupo', grupo=cls.grupo, creado_por=cls.usuario)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def buscar(self, q, **params):
+        r = self.client.get(URL, {'q': q, **params})
+        self.assertEqual(r.status_code, 200, r.data)
+        return [(fila['tipo'], fila['id']) for fila in r.json()['results']]
+
+    def test_coincidencias_del_dueno_por_relevancia(self):
+        resultados = self.buscar('mercado')
+        self.assertEqual(set(resultados), {
+            ('eg', self.mercado.pk), ('eg', self.mercado_largo.pk), ('ing', self.reembolso.pk),
+        })
+        # Más apariciones del término en una descripción corta: más relevante
+        self.assertEqual(resultados[0], ('eg', self.mercado.pk))
+        self.assertEqual(resultados.index(('eg', self.mercado_largo.pk)), 2)
+
+        self.assertEqual(self.buscar('MERCADO semana'), [('eg', self.mercado_largo.pk)])
+        self.assertEqual(self.buscar('inexistente'), [])
+
+    def test_aislamiento_por_dueno(self):
+        self.assertEqual(self.buscar('grupo'), [])
+        self.assertEqual(self.buscar('mercado', grupo_id=self.grupo.pk), [('eg', self.del_grupo.pk)])
+
+        self.client.force_authenticate(self.otro)
+        self.assertEqual(self.buscar('mercado'), [('eg', self.ajeno.pk)])
+        r = self.client.get(URL, {'q': 'mercado', 'grupo_id': self.grupo.pk})
+        self.assertEqual(r.status_code, 400)
+
+    def test_indice_al_editar_y_borrar(self):
+        self.salario.descripcion = 'Bono anual'
+        self.salario.save()
+        self.assertEqual(self.buscar('salario'), [])
+        self.assertEqual(self.buscar('bono'), [('ing', self.salario.pk)])
+
+        r = self.client.patch(f'/api/egresos/{self.mercado.pk}/', {'descripcion': 'Farmacia'}, format='json')
+        self.assertEqual(r.status_code, 200, r.data)
+        self.assertEqual(self.buscar('farmacia'), [('eg', self.mercado.pk)])
+        self.assertNotIn(('eg', self.mercado.pk), self.buscar('mercado'))
+
+        self.client.delete(f'/api/ingresos/{self.reembolso.pk}/')
+        self.assertEqual(self.buscar('reembolso'), [])
+        self.assertEqual(self.buscar('mercado'), [('eg', self.mercado_largo.pk)])
+
+    def test_validacion(self):
+        self.assertEqual(self.client.get(URL).status_code, 400)
+        self.assertEqual(self.client.get(URL, {'q': 'x' * 201}).status_code, 400)
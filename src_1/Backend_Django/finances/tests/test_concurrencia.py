@@ -0,0 +1,94 @@
+"""
+Escritores concurrentes sobre el mismo bolsillo (versión reducida de
+benchmarks/concurrent_balance.py): ninguna actualización de saldo se pierde.
+
+En SQLite (sin SELECT ... FOR UPDATE) los escritores se serializan con BEGIN
+IMMEDIATE, como en el benchmark; la base de tests es un archivo (ver
+DATABASES en settings.py) para que los hilos puedan esperarse.
+"""
+import threading
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection, connections
+from django.db.models import Sum
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+
+from finances import balances, models, reconciliacion
+
+ESCRITORES = 8
+CICLOS = 3
+
+
+class SaldoConcurrenteTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        if connection.vendor == 'sqlite':
+            opciones = connection.settings_dict['OPTIONS']
+            previas = dict(opciones)
+            opciones.update({'timeout': 60, 'transaction_mode': 'IMMEDIATE'})
+            self.addCleanup(lambda: (opciones.clear(), opciones.update(previas), connection.close()))
+            connection.close()
+        admin = models.Usuario.objects.create_user(email='concurrencia@example.com', password='x')
+        self.grupo = models.Grupo.objects.create(nombre='concurrencia', creador=admin)
+        self.usuarios = models.Usuario.objects.bulk_create([
+            models.Usuario(email=f'escritor{i}@example.com', nombre=f'escritor{i}', password='!')
+            for i in range(ESCRITORES)
+        ])
+        models.UsuarioGrupo.objects.bulk_create(
+            [models.UsuarioGrupo(usuario=u, grupo=self.grupo, rol='miembro') for u in self.usuarios]
+        )
+        self.general = models.Bolsillo.objects.create(grupo=self.grupo, nombre='General', saldo=0)
+        self.apartado = models.Bolsillo.objects.create(grupo=self.grupo, nombre='Apartado', saldo=0)
+
+    def test_escritores_concurrentes(self):
+        general, apartado, grupo = self.general.pk, self.apartado.pk, self.grupo.pk
+        errores = []
+        barrera = threading.Barrier(ESCRITORES)
+
+        def escritor(usuario):
+            client = APIClient()
+            client.force_authenticate(usuario)
+            try:
+                barrera.wait()
+                for _ in range(CICLOS):
+                    # +3 al General, -1 del General, y una transferencia ida y vuelta
+                    pasos = [
+                        ('/api/ingresos/', {'monto': '3.00', 'fecha': '2025-01-01', 'bolsillo': general, 'grupo_id': grupo}),
+                        ('/api/egresos/', {'monto': '1.00', 'fecha': '2025-01-01', 'bolsillo': general, 'grupo_id': grupo}),
+                        ('/api/movimientos/transferir/', {'bolsillo_origen_id': general, 'bolsillo_destino_id': apartado, 'monto': '1.00'}),
+                        ('/api/movimientos/transferir/', {'bolsillo_origen_id': apartado, 'bolsillo_destino_id': general, 'monto': '1.00'}),
+                    ]
+                    for url, data in pasos:
+                        r = client.post(url, data, format='json')
+                        if r.status_code >= 300:
+                            errores.append((url, r.status_code, getattr(r, 'data', None)))
+            except Exception as exc:
+                errores.append(repr(exc))
+            finally:
+                connections.close_all()
+
+        hilos = [threading.Thread(target=escritor, args=(u,)) for u in self.usuarios]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+
+        self.assertEqual(errores, [])
+        # Entradas de transferencias que quedaron en el diario (destino bloqueado al confirmarse)
+        balances.compactar()
+        self.assertFalse(models.Movimiento.objects.filter(pendiente=True).exists())
+        self.general.refresh_from_db()
+        self.apartado.refresh_from_db()
+        esperado = Decimal('2.00') * ESCRITORES * CICLOS
+        ingresos = models.Ingreso.objects.filter(bolsillo=general).aggregate(t=Sum('monto'))['t']
+        egresos = models.Egreso.objects.filter(bolsillo=general).aggregate(t=Sum('monto'))['t']
+        self.assertEqual(self.general.saldo, esperado)
+        self.assertEqual(ingresos - egresos, esperado)
+        self.assertEqual(self.apartado.saldo, 0)
+        self.assertEqual(reconciliacion.revisar(general, apartado + 1)[1], [])
+        for bolsillo in (self.general, self.apartado):
+            ultimo = models.BolsilloSnapshot.objects.filter(bolsillo=bolsillo).order_by('-fecha').first()
+            self.assertEqual(ultimo.saldo, bolsillo.saldo)
@@ -0,0 +1,100 @@
+"""
+Diario de asientos pendientes (ver balances.py): la entrada de una transferencia
+no bloquea el destino, las lecturas la suman al saldo y compactar() la lleva a
+Bolsillo.saldo y a los snapshots.
+
+En TestCase los callbacks on_commit no se ejecutan salvo con
+captureOnCommitCallbacks, así que el asiento queda pendiente hasta compactar.
+"""
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from finances import balances, models, reconciliacion
+
+
+class DiarioTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = models.Usuario.objects.create_user(email='diario@example.com', password='x')
+        cls.origen = models.Bolsillo.objects.create(usuario=cls.usuario, nombre='Origen', saldo=0)
+        cls.destino = models.Bolsillo.objects.create(usuario=cls.usuario, nombre='Destino', saldo=0)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        hoy = timezone.localdate().isoformat()
+        self.client.post('/api/ingresos/', {'monto': '100', 'fecha': hoy, 'bolsillo': self.origen.pk}, format='json')
+        self.client.post('/api/ingresos/', {'monto': '5', 'fecha': hoy, 'bolsillo': self.destino.pk}, format='json')
+
+    def transferir(self, origen, destino, monto):
+        return self.client.post('/api/movimientos/transferir/', {
+            'bolsillo_origen_id': origen.pk, 'bolsillo_destino_id': destino.pk, 'monto': monto,
+        }, format='json')
+
+    def saldo(self, bolsillo):
+        return models.Bolsillo.objects.values_list('saldo', flat=True).get(pk=bolsillo.pk)
+
+    def test_entrada_pendiente_visible_en_lecturas(self):
+        r = self.transferir(self.origen, self.destino, '30')
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual((r.data['bolsillo_origen']['saldo'], r.data['bolsillo_destino']['saldo']), ('70.00', '35.00'))
+
+        # El origen se debita al momento; el destino queda en el diario
+        self.assertEqual((self.saldo(self.origen), self.saldo(self.destino)), (Decimal('70'), Decimal('5')))
+        self.assertEqual(
+            list(models.Movimiento.objects.order_by('pk').values_list('tipo', 'pendiente')),
+            [('eg', False), ('ing', True)],
+        )
+
+        bolsillos = {b['bolsillo_id']: b['saldo'] for b in self.client.get('/api/bolsillos/').json()}
+        self.assertEqual(bolsillos, {self.origen.pk: '70.00', self.destino.pk: '35.00'})
+        self.assertEqual(self.client.get(f'/api/bolsillos/{self.destino.pk}/').json()['saldo'], '35.00')
+        self.assertEqual(self.client.get('/api/dashboard/summary/').json()['saldo_total'], '105.00')
+        for ruta in ('/api/ingresos/', '/api/ingresos/?fast=1'):
+            anidados = {f['bolsillo']['bolsillo_id']: f['bolsillo']['saldo'] for f in self.client.get(ruta).json()}
+            self.assertEqual(anidados[self.destino.pk], '35.00', ruta)
+
+        # La conciliación solo cuenta asientos compactados
+        self.assertEqual(reconciliacion.revisar(self.origen.pk, self.destino.pk + 1)[1], [])
+
+    def test_compactar(self):
+        self.transferir(self.origen, self.destino, '30')
+        self.transferir(self.origen, self.destino, '10')
+
+        self.assertEqual(balances.compactar(), 2)
+        self.assertEqual(balances.compactar(), 0)
+        self.assertEqual(self.saldo(self.destino), Decimal('45'))
+        self.assertFalse(models.Movimiento.objects.filter(pendiente=True).exists())
+        snapshot = models.BolsilloSnapshot.objects.get(bolsillo=self.destino, fecha=timezone.localdate())
+        self.assertEqual((snapshot.saldo, snapshot.ingresos), (Decimal('45'), Decimal('45')))
+        self.assertEqual(reconciliacion.revisar(self.origen.pk, self.destino.pk + 1)[1], [])
+
+    def test_bloquear_compacta(self):
+        # Gastar desde el destino usa la entrada pendiente: bloquear() la compacta antes de validar
+        self.transferir(self.origen, self.destino, '30')
+        r = self.transferir(self.destino, self.origen, '35')
+        self.assertEqual(r.status_code, 200, r.data)
+        self.assertEqual(self.saldo(self.destino), Decimal('0'))
+        self.assertEqual(list(models.Movimiento.objects.filter(pendiente=True).values_list('bolsillo_id', flat=True)),
+                         [self.origen.pk])
+
+    def test_compacta_al_confirmar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.transferir(self.origen, self.destino, '30')
+        self.assertEqual(self.saldo(self.destino), Decimal('35'))
+        self.assertFalse(models.Movimiento.objects.filter(pendiente=True).exists())
+
+    def test_comando(self):
+        self.transferir(self.origen, self.destino, '30')
+        salida = StringIO()
+        call_command('compact_balances', '--bolsillo', str(self.destino.pk), stdout=salida)
+        self.assertIn('1 asientos compactados', salida.getvalue())
+        self.assertEqual(self.saldo(self.destino), Decimal('35'))
@@ -0,0 +1,97 @@
+"""
+GET condicional de los listados (VersionETagMixin, versiones.py): el ETag
+cambia con cada ruta de escritura del dueño y If-None-Match responde 304 con
+una sola consulta.
+
+versiones.marcar() escribe la versión al confirmarse la transacción, así que
+las escrituras van dentro de captureOnCommitCallbacks(execute=True).
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from finances import balances, models
+
+
+class ETagTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = models.Usuario.objects.create_user(email='etag@example.com', password='x')
+        cls.ajeno = models.Usuario.objects.create_user(email='etag-ajeno@example.com', password='x')
+        cls.grupo = models.Grupo.objects.create(nombre='Casa', creador=cls.usuario)
+        models.UsuarioGrupo.objects.create(usuario=cls.usuario, grupo=cls.grupo, rol='admin')
+        cls.bolsillo = models.Bolsillo.objects.create(usuario=cls.usuario, nombre='Cuenta', saldo=100)
+        cls.bolsillo_grupo = models.Bolsillo.objects.create(grupo=cls.grupo, nombre='General', saldo=0)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def etag(self, ruta='/api/bolsillos/'):
+        respuesta = self.client.get(ruta)
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta['ETag']
+
+    def assertCambia(self, escribir, ruta='/api/bolsillos/'):
+        antes = self.etag(ruta)
+        with self.captureOnCommitCallbacks(execute=True):
+            escribir()
+        self.assertNotEqual(self.etag(ruta), antes)
+
+    def test_etag_y_304(self):
+        respuesta = self.client.get('/api/bolsillos/')
+        self.assertEqual(respuesta['Cache-Control'], 'private, no-cache')
+        etag = respuesta['ETag']
+        self.assertEqual(self.etag(), etag)
+
+        with self.assertNumQueries(1):
+            respuesta = self.client.get('/api/bolsillos/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta['ETag'], etag)
+        self.assertEqual(self.client.get('/api/bolsillos/', HTTP_IF_NONE_MATCH=f'W/{etag}').status_code, 304)
+        self.assertEqual(self.client.get('/api/bolsillos/', HTTP_IF_NONE_MATCH='"otro"').status_code, 200)
+
+        # La URL completa es parte del ETag
+        self.assertNotEqual(self.etag('/api/bolsillos/?page_size=5'), etag)
+
+    def test_escritura_por_senal(self):
+        self.assertCambia(lambda: models.Bolsillo.objects.create(usuario=self.usuario, nombre='Nuevo', saldo=0))
+        self.assertCambia(lambda: self.client.post('/api/ingresos/', {
+            'monto': '5', 'fecha': '2025-03-01', 'bolsillo': self.bolsillo.pk,
+        }, format='json'), ruta='/api/ingresos/')
+
+    def test_aplicar_sin_bloqueo(self):
+        # aplicar() sin bolsillos bloqueados usa update(), que no emite post_save
+        self.assertCambia(lambda: balances.aplicar({self.bolsillo.pk: 5}))
+
+    def test_importacion(self):
+        # bulk_create no emite post_save
+        self.assertCambia(lambda: self.client.post('/api/movimientos/import/', {'movimientos': [
+            {'tipo': 'ing', 'monto': '1', 'fecha': '2025-03-01'},
+        ]}, format='json'), ruta='/api/ingresos/')
+
+    def test_otro_dueno_no_cambia(self):
+        ruta = f'/api/bolsillos/?grupo_id={self.grupo.pk}'
+        personal, grupo = self.etag(), self.etag(ruta)
+        with self.captureOnCommitCallbacks(execute=True):
+            balances.aplicar({self.bolsillo_grupo.pk: 5})
+        self.assertEqual(self.etag(), personal)
+        self.assertNotEqual(self.etag(ruta), grupo)
+
+    def test_no_miembro(self):
+        self.client.force_authenticate(self.ajeno)
+        ruta = f'/api/bolsillos/?grupo_id={self.grupo.pk}'
+        clave = f'bolsillos|{self.ajeno.pk}|sin-acceso|{ruta}'
+        esperado = '"' + hashlib.sha1(clave.encode('utf-8')).hexdigest() + '"'
+
+        respuesta = self.client.get(ruta)
+        self.assertEqual((respuesta['ETag'], respuesta.json()), (esperado, []))
+        # Las escrituras del grupo no cambian lo que ve quien no es miembro
+        with self.captureOnCommitCallbacks(execute=True):
+            balances.aplicar({self.bolsillo_grupo.pk: 5})
+        self.assertEqual(self.etag(ruta), esperado)
+        self.assertEqual(self.client.get(ruta, HTTP_IF_NONE_MATCH=esperado).status_code, 304)
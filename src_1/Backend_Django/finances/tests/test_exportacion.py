@@ -0,0 +1,106 @@
+"""
+GET /api/movimientos/export/: CSV o NDJSON en streaming con los movimientos
+del dueño pedido, filtrados por fecha y opcionalmente comprimidos con gzip.
+"""
+import csv
+import datetime
+import gzip
+import io
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from finances import models
+
+URL = '/api/movimientos/export/'
+COLUMNAS = ['tipo', 'id', 'fecha', 'monto', 'descripcion', 'categoria', 'bolsillo']
+
+
+class ExportacionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = models.Usuario.objects.create_user(email='exporta@example.com', password='x')
+        cls.otro = models.Usuario.objects.create_user(email='exporta-otro@example.com', password='x')
+        cls.grupo = models.Grupo.objects.create(nombre='Casa', creador=cls.usuario)
+        models.UsuarioGrupo.objects.create(usuario=cls.usuario, grupo=cls.grupo, rol='admin')
+        bolsillo = models.Bolsillo.objects.create(usuario=cls.usuario, nombre='Cuenta, principal', saldo=0)
+        categoria = models.Categoria.objects.create(usuario=cls.usuario, nombre='Alimentación', tipo='eg')
+
+        cls.salario = models.Ingreso.objects.create(
+            usuario=cls.usuario, monto='2000.00', fecha=datetime.date(2025, 1, 31), descripcion='Salario', bolsillo=bolsillo,
+        )
+        cls.mercado = models.Egreso.objects.create(
+            usuario=cls.usuario, monto='150.50', fecha=datetime.date(2025, 2, 3), descripcion='Mercado "grande"',
+            categoria=categoria, bolsillo=bolsillo,
+        )
+        cls.bono = models.Ingreso.objects.create(usuario=cls.usuario, monto='10.00', fecha=datetime.date(2025, 3, 1))
+        cls.del_grupo = models.Egreso.objects.create(grupo=cls.grupo, monto='7.00', fecha=datetime.date(2025, 2, 1),
+                                                     descripcion='Gas', creado_por=cls.usuario)
+        models.Ingreso.objects.create(usuario=cls.otro, monto='99.00', fecha=datetime.date(2025, 2, 1))
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def descargar(self, **params):
+        respuesta = self.client.get(URL, params)
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta, b''.join(respuesta.streaming_content)
+
+    def csv(self, **params):
+        respuesta, cuerpo = self.descargar(**params)
+        self.assertEqual(respuesta['Content-Type'], 'text/csv; charset=utf-8')
+        return list(csv.reader(io.StringIO(cuerpo.decode('utf-8'))))
+
+    def test_csv(self):
+        respuesta, cuerpo = self.descargar()
+        self.assertEqual(respuesta['Content-Disposition'], 'attachment; filename="movimientos.csv"')
+        self.assertEqual(list(csv.reader(io.StringIO(cuerpo.decode('utf-8')))), [
+            COLUMNAS,
+            ['ing', str(self.salario.pk), '2025-01-31', '2000.00', 'Salario', '', 'Cuenta, principal'],
+            ['eg', str(self.mercado.pk), '2025-02-03', '150.50', 'Mercado "grande"', 'Alimentación', 'Cuenta, principal'],
+            ['ing', str(self.bono.pk), '2025-03-01', '10.00', '', '', ''],
+        ])
+
+    def test_ndjson(self):
+        respuesta, cuerpo = self.descargar(format='ndjson')
+        self.assertEqual(respuesta['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual(respuesta['Content-Disposition'], 'attachment; filename="movimientos.ndjson"')
+        lineas = cuerpo.decode('utf-8').splitlines()
+        self.assertEqual(json.loads(lineas[1]), {
+            'tipo': 'eg', 'id': self.mercado.pk, 'fecha': '2025-02-03', 'monto': '150.50',
+            'descripcion': 'Mercado "grande"', 'categoria': 'Alimentación', 'bolsillo': 'Cuenta, principal',
+        })
+        self.assertEqual([json.loads(linea)['id'] for linea in lineas], [self.salario.pk, self.mercado.pk, self.bono.pk])
+
+    def test_rango_de_fechas(self):
+        self.assertEqual([fila[1] for fila in self.csv(**{'from': '2025-02-01'})[1:]],
+                         [str(self.mercado.pk), str(self.bono.pk)])
+        self.assertEqual([fila[1] for fila in self.csv(to='2025-02-03')[1:]],
+                         [str(self.salario.pk), str(self.mercado.pk)])
+        self.assertEqual([fila[1] for fila in self.csv(**{'from': '2025-02-01', 'to': '2025-02-28'})[1:]],
+                         [str(self.mercado.pk)])
+        self.assertEqual(self.client.get(URL, {'from': '01/02/2025'}).status_code, 400)
+
+    def test_gzip(self):
+        respuesta, cuerpo = self.descargar(gzip='1', format='ndjson')
+        self.assertEqual(respuesta['Content-Type'], 'application/gzip')
+        self.assertEqual(respuesta['Content-Disposition'], 'attachment; filename="movimientos.ndjson.gz"')
+        _, plano = self.descargar(format='ndjson')
+        self.assertEqual(gzip.decompress(cuerpo), plano)
+
+    def test_aislamiento_por_dueno(self):
+        # El export personal no incluye los movimientos del grupo (ver test_csv)
+        self.assertEqual(self.csv(grupo_id=self.grupo.pk)[1:],
+                         [['eg', str(self.del_grupo.pk), '2025-02-01', '7.00', 'Gas', '', '']])
+
+        self.client.force_authenticate(self.otro)
+        self.assertEqual([fila[2:4] for fila in self.csv()[1:]], [['2025-02-01', '99.00']])
+        self.assertEqual(self.client.get(URL, {'grupo_id': self.grupo.pk}).status_code, 400)
+
+    def test_formato_invalido(self):
+        self.assertEqual(self.client.get(URL, {'format': 'xml'}).status_code, 400)
@@ -0,0 +1,129 @@
+"""
+POST /api/movimientos/import/: inserta todas las filas con un solo cambio de
+saldo por bolsillo (snapshots y resumen mensual incluidos) o ninguna.
+"""
+import datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from finances import models
+
+URL = '/api/movimientos/import/'
+
+
+class ImportacionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = models.Usuario.objects.create_user(email='importa@example.com', password='x')
+        cls.otro = models.Usuario.objects.create_user(email='ajeno@example.com', password='x')
+        cls.bolsillo = models.Bolsillo.objects.create(usuario=cls.usuario, nombre='Cuenta', saldo=100)
+        cls.salario = models.Categoria.objects.create(usuario=cls.usuario, nombre='Salario', tipo='ing')
+        cls.comida = models.Categoria.objects.create(usuario=cls.usuario, nombre='Comida', tipo='eg')
+        cls.ajena = models.Categoria.objects.create(usuario=cls.otro, nombre='Comida', tipo='eg')
+        cls.bolsillo_ajeno = models.Bolsillo.objects.create(usuario=cls.otro, nombre='Ajeno', saldo=0)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def importar(self, filas):
+        return self.client.post(URL, {'movimientos': filas}, format='json')
+
+    def saldo(self):
+        return models.Bolsillo.objects.values_list('saldo', flat=True).get(pk=self.bolsillo.pk)
+
+    def assertNadaImportado(self):
+        self.assertFalse(models.Ingreso.objects.exists())
+        self.assertFalse(models.Egreso.objects.exists())
+        self.assertEqual(self.saldo(), Decimal('100'))
+        self.assertFalse(models.BolsilloSnapshot.objects.exists())
+        self.assertFalse(models.ResumenMensual.objects.exists())
+
+    def test_importa_filas(self):
+        r = self.importar([
+            {'tipo': 'ing', 'monto': '1000', 'fecha': '2025-03-01', 'descripcion': 'Salario', 'categoria': 'salario', 'bolsillo': 'Cuenta'},
+            {'tipo': 'eg', 'monto': '30.50', 'fecha': '2025-03-02', 'categoria': self.comida.pk, 'bolsillo': self.bolsillo.pk},
+            {'tipo': 'eg', 'monto': 20, 'fecha': '2025-03-02', 'categoria': 'Comida', 'bolsillo': 'cuenta'},
+            {'tipo': 'ing', 'monto': '5', 'fecha': '2025-03-03'},
+        ])
+        self.assertEqual(r.status_code, 201, r.data)
+        self.assertEqual((r.data['ingresos'], r.data['egresos']), (2, 2))
+        self.assertEqual(r.data['bolsillos'], [{'bolsillo_id': self.bolsillo.pk, 'nombre': 'Cuenta', 'saldo': '1049.50'}])
+
+        self.assertEqual(models.Ingreso.objects.filter(usuario=self.usuario, creado_por=self.usuario).count(), 2)
+        self.assertEqual(models.Egreso.objects.filter(categoria=self.comida, bolsillo=self.bolsillo).count(), 2)
+        self.assertEqual(self.saldo(), Decimal('1049.50'))
+        self.assertEqual(
+            list(models.BolsilloSnapshot.objects.filter(bolsillo=self.bolsillo).order_by('fecha')
+                 .values_list('fecha', 'ingresos', 'egresos', 'saldo')),
+            [
+                (datetime.date(2025, 3, 1), Decimal('1000'), Decimal('0'), Decimal('1100')),
+                (datetime.date(2025, 3, 2), Decimal('0'), Decimal('50.50'), Decimal('1049.50')),
+            ],
+        )
+        self.assertEqual(
+            set(models.ResumenMensual.objects.filter(usuario=self.usuario, mes=datetime.date(2025, 3, 1))
+                .values_list('tipo', 'categoria_id', 'total', 'conteo')),
+            {('eg', self.comida.pk, Decimal('50.50'), 2), ('ing', self.salario.pk, Decimal('1000'), 1),
+             ('ing', None, Decimal('5'), 1)},
+        )
+
+    def test_importa_csv(self):
+        archivo = SimpleUploadedFile('movimientos.csv', (
+            'tipo,monto,fecha,descripcion,categoria,bolsillo\n'
+            'ing,10,2025-03-01,,Salario,Cuenta\n'
+            'eg,4,2025-03-01,Almuerzo,Comida,Cuenta\n'
+        ).encode(), content_type='text/csv')
+        r = self.client.post(URL, {'file': archivo}, format='multipart')
+        self.assertEqual(r.status_code, 201, r.data)
+        self.assertEqual(self.saldo(), Decimal('106'))
+
+    def test_todo_o_nada(self):
+        r = self.importar([
+            {'tipo': 'ing', 'monto': '10', 'fecha': '2025-03-01', 'bolsillo': 'Cuenta'},
+            {'tipo': 'eg', 'monto': '10', 'fecha': '2025-13-01', 'bolsillo': 'Cuenta'},
+            {'tipo': 'ing', 'monto': '12.345', 'fecha': '2025-03-01'},
+            {'tipo': 'ing', 'monto': '1e15', 'fecha': '2025-03-01'},
+            {'tipo': 'ing', 'monto': 0, 'fecha': '2025-03-01'},
+        ])
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.json()['errores'], [
+            {'fila': 2, 'error': 'La fecha debe tener formato YYYY-MM-DD'},
+            {'fila': 3, 'error': 'El monto admite como máximo 12 dígitos enteros y 2 decimales'},
+            {'fila': 4, 'error': 'El monto admite como máximo 12 dígitos enteros y 2 decimales'},
+            {'fila': 5, 'error': 'El monto debe ser un número mayor a 0'},
+        ])
+        self.assertNadaImportado()
+
+    def test_saldo_insuficiente(self):
+        r = self.importar([
+            {'tipo': 'ing', 'monto': '10', 'fecha': '2025-03-01', 'bolsillo': 'Cuenta'},
+            {'tipo': 'eg', 'monto': '200', 'fecha': '2025-03-02', 'bolsillo': 'Cuenta'},
+        ])
+        self.assertEqual(r.status_code, 400)
+        self.assertIn('Saldo insuficiente', r.data['detail'])
+        self.assertNadaImportado()
+
+    def test_categoria_y_bolsillo_invalidos(self):
+        r = self.importar([
+            {'tipo': 'eg', 'monto': '1', 'fecha': '2025-03-01', 'categoria': self.ajena.pk},
+            {'tipo': 'eg', 'monto': '1', 'fecha': '2025-03-01', 'categoria': 'Salario'},
+            {'tipo': 'eg', 'monto': '1', 'fecha': '2025-03-01', 'categoria': self.salario.pk},
+            {'tipo': 'eg', 'monto': '1', 'fecha': '2025-03-01', 'bolsillo': self.bolsillo_ajeno.pk},
+            {'tipo': 'eg', 'monto': '1', 'fecha': '2025-03-01', 'bolsillo': 'Ajeno'},
+        ])
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.json()['errores'], [
+            {'fila': 1, 'error': f'La categoría "{self.ajena.pk}" no existe'},
+            {'fila': 2, 'error': 'La categoría "Salario" no existe'},
+            {'fila': 3, 'error': f'La categoría "{self.salario.pk}" es de tipo ing, no eg'},
+            {'fila': 4, 'error': f'El bolsillo "{self.bolsillo_ajeno.pk}" no existe'},
+            {'fila': 5, 'error': 'El bolsillo "Ajeno" no existe'},
+        ])
+        self.assertNadaImportado()
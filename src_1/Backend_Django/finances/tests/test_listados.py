@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .datos import crear_datos
+
+LISTADOS = (
+    '/api/ingresos/',
+    '/api/ingresos/?page_size=50',
+    '/api/ingresos/?grupo_id={grupo}',
+    '/api/ingresos/?fast=1&grupo_id={grupo}',
+    '/api/egresos/',
+    '/api/egresos/?page_size=50',
+    '/api/egresos/?grupo_id={grupo}',
+    '/api/egresos/?fast=1',
+)
+
+
+class ListadosConsultasConstantesTests(TestCase):
+    """Los listados hacen las mismas consultas con 5 que con 50 filas (sin N+1)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.chico = crear_datos(5, 'chico')
+        cls.grande = crear_datos(50, 'grande')
+
+    def setUp(self):
+        # La caché de membresías sobrevive al rollback de cada test
+        cache.clear()
+
+    def consultas(self, usuario, ids, ruta):
+        client = APIClient()
+        client.force_authenticate(usuario)
+        # Primera petición: llena la caché de membresías
+        client.get(ruta.format(**ids))
+        with CaptureQueriesContext(connection) as capturadas:
+            respuesta = client.get(ruta.format(**ids))
+        self.assertEqual(respuesta.status_code, 200)
+        return len(capturadas)
+
+    def test_listados_sin_n_mas_1(self):
+        for ruta in LISTADOS:
+            with self.subTest(ruta=ruta):
+                self.assertEqual(self.consultas(*self.chico, ruta), self.consultas(*self.grande, ruta))
@@ -0,0 +1,65 @@
+"""
+Presupuesto de consultas SQL por endpoint.
+
+Si un cambio sube un conteo (típicamente una relación sin select_related en
+serializers.py), el test falla y assertNumQueries muestra el SQL. Si lo baja,
+se actualiza PRESUPUESTOS. Cada ruta se mide con N y con 10×N filas por tipo:
+el mismo presupuesto para ambos tamaños descarta consultas por fila (N+1) en
+bolsillos, categorías, aportaciones y miembros; test_listados.py lo compara
+además sin presupuesto fijo para los listados de ingresos y egresos.
+
+Los conteos son en régimen estable: autenticación forzada (sin la consulta del
+token) y una petición previa que llena la caché de membresías.
+"""
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .datos import crear_datos
+
+N = 20
+
+# (endpoint, ruta, consultas). La ruta se completa con los ids de crear_datos().
+PRESUPUESTOS = (
+    ('ingresos.list', '/api/ingresos/', 3),
+    ('ingresos.list_pagina', '/api/ingresos/?page_size=50', 3),
+    ('ingresos.list_grupo', '/api/ingresos/?grupo_id={grupo}', 3),
+    ('ingresos.list_fast', '/api/ingresos/?fast=1&grupo_id={grupo}', 3),
+    ('ingresos.retrieve', '/api/ingresos/{ingreso}/?grupo_id={grupo}', 2),
+    ('egresos.list', '/api/egresos/', 3),
+    ('egresos.list_pagina', '/api/egresos/?page_size=50', 3),
+    ('egresos.list_grupo', '/api/egresos/?grupo_id={grupo}', 3),
+    ('egresos.list_fast', '/api/egresos/?fast=1', 2),
+    ('egresos.retrieve', '/api/egresos/{egreso}/', 2),
+    ('bolsillos.list', '/api/bolsillos/', 2),
+    ('bolsillos.list_grupo', '/api/bolsillos/?grupo_id={grupo}', 2),
+    ('bolsillos.retrieve', '/api/bolsillos/{bolsillo}/', 1),
+    ('categorias.list', '/api/categorias/', 2),
+    ('categorias.list_grupo', '/api/categorias/?grupo_id={grupo}', 2),
+    ('categorias.retrieve', '/api/categorias/{categoria}/', 1),
+    ('aportaciones.list', '/api/aportaciones/', 1),
+    ('aportaciones.list_pagina', '/api/aportaciones/?page_size=50', 1),
+    ('aportaciones.retrieve', '/api/aportaciones/{aportacion}/', 1),
+    ('usuario-grupo.members', '/api/usuario-grupo/members/{grupo}/', 2),
+)
+
+
+class PresupuestoConsultasTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tamanos = {N: crear_datos(N, 'presupuesto'), 10 * N: crear_datos(10 * N, 'presupuesto-10x')}
+
+    def setUp(self):
+        # La caché de membresías sobrevive al rollback de cada test
+        cache.clear()
+
+    def test_presupuestos(self):
+        for filas, (usuario, ids) in self.tamanos.items():
+            client = APIClient()
+            client.force_authenticate(usuario)
+            client.get(f'/api/bolsillos/?grupo_id={ids["grupo"]}')
+            for endpoint, ruta, consultas in PRESUPUESTOS:
+                with self.subTest(endpoint=endpoint, filas=filas), self.assertNumQueries(consultas):
+                    respuesta = client.get(ruta.format(**ids))
+                    self.assertEqual(respuesta.status_code, 200)
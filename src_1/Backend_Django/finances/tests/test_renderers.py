@@ -0,0 +1,51 @@
+"""FastJSONRenderer produce los mismos bytes que JSONRenderer de DRF, con y sin orjson."""
+import datetime
+import unittest
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+
+from finances import renderers
+
+FLOATS = [
+    0.0, -0.0, 0.1, 1.5, 1e-3, 1e-4, 1.5e-4, 9.9e-5, 1e-5, -1e-5, 1.2345e-6, 1e-6, 1e-7, 1e-9, 1e-10,
+    1e-16, 1e-17, 5e-324, 1e15, 1e16, -1e16, 1.5e16, 1e21, 1.7976931348623157e308, 123456789012345680.0,
+]
+
+DATOS = {
+    'floats': FLOATS,
+    'anidados': [{'x': f, 'y': [f, -f]} for f in FLOATS],
+    'monto': '1234567.89',
+    'decimal': Decimal('0.10'),
+    'fecha': datetime.date(2025, 3, 1),
+    'momento': datetime.datetime(2025, 3, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+    'uuid': uuid.UUID(int=7),
+    'texto': 'Ñandú "0.00001" 1e-7 \\    ',
+    'enteros': [0, -1, 2 ** 63 - 1],
+    'nulo': None,
+    'logico': True,
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+
+    def assertIgualDRF(self, datos):
+        self.assertEqual(renderers.FastJSONRenderer().render(datos), JSONRenderer().render(datos))
+
+    @unittest.skipIf(renderers.orjson is None, 'orjson no está instalado')
+    def test_orjson(self):
+        self.assertIgualDRF(DATOS)
+        for f in FLOATS:
+            with self.subTest(f=f):
+                self.assertIgualDRF({'valor': f})
+                self.assertIgualDRF([f])
+
+    def test_sin_orjson(self):
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertIgualDRF(DATOS)
+            for f in FLOATS:
+                with self.subTest(f=f):
+                    self.assertIgualDRF({'valor': f})
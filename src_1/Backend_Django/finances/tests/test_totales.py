@@ -0,0 +1,38 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from finances import models
+
+
+class TotalesDosDecimalesTests(TestCase):
+    """Los totales calculados con Sum() salen con dos decimales, como los montos del API."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = models.Usuario.objects.create_user(email='totales@example.com', password='x')
+        cls.bolsillo = models.Bolsillo.objects.create(usuario=cls.usuario, nombre='b', saldo=0)
+        cls.categoria = models.Categoria.objects.create(usuario=cls.usuario, nombre='c', tipo='eg')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        hoy = datetime.date.today().isoformat()
+        self.client.post('/api/ingresos/', {'monto': '100', 'fecha': hoy, 'bolsillo': self.bolsillo.pk}, format='json')
+        self.client.post('/api/egresos/', {'monto': '20.5', 'fecha': hoy, 'bolsillo': self.bolsillo.pk,
+                                           'categoria': self.categoria.pk}, format='json')
+
+    def test_dashboard(self):
+        data = self.client.get('/api/dashboard/summary/').json()
+        self.assertEqual(
+            (data['saldo_total'], data['ingresos'], data['egresos'], data['neto'], data['categorias'][0]['total']),
+            ('79.50', '100.00', '20.50', '79.50', '20.50'),
+        )
+
+    def test_series(self):
+        data = self.client.get('/api/stats/series/?periods=2').json()
+        self.assertEqual([(p['ingresos'], p['egresos'], p['neto']) for p in data],
+                         [('0.00', '0.00', '0.00'), ('100.00', '20.50', '79.50')])
@@ -0,0 +1,86 @@
+"""
+Versiones por dueno de los datos para ETag y GET condicional.
+
+Cada dueno ('u<usuario_id>' para los datos personales, 'g<grupo_id>' para los
+de un grupo) tiene una fila en VersionDatos. Cualquier escritura que cambie lo
+que devuelven sus listados (bolsillos, categorías, ingresos, egresos, incluidos
+el saldo y el autor anidados) llama a marcar(): las señales de signals.py para
+save()/delete() y llamadas explícitas en las rutas con bulk_create o update().
+
+La versión nueva se escribe al confirmarse la transacción (on_commit), fuera de
+los bloqueos de balances.py, con un único upsert de un valor aleatorio. Como
+el ETag se calcula antes de leer los datos, una respuesta nunca lleva un ETag
+más nuevo que su contenido.
+
+Los listados comparan If-None-Match con etag() y responden 304 con una sola
+consulta a version_datos, sin tocar las tablas de datos ni serializar.
+"""
+import hashlib
+import secrets
+
+from django.db import transaction
+from django.utils.http import parse_etags
+
+from . import membership, models
+
+
+def propietario(usuario_id=None, grupo_id=None):
+    """'g<grupo_id>' si hay grupo, si no 'u<usuario_id>' (None si no hay ninguno)."""
+    if grupo_id:
+        return f'g{int(grupo_id)}'
+    if usuario_id:
+        return f'u{int(usuario_id)}'
+    return None
+
+
+def de_instancia(instance):
+    """Dueño de un objeto con usuario/grupo (bolsillo, categoría, ingreso, ...)."""
+    return propietario(instance.usuario_id, instance.grupo_id)
+
+
+def marcar(*propietarios):
+    """Cambiar la versión de estos duenos cuando se confirme la transacción actual."""
+    propietarios = sorted({p for p in propietarios if p})
+    if propietarios:
+        transaction.on_commit(lambda: _guardar(propietarios))
+
+
+def _guardar(propietarios):
+    models.VersionDatos.objects.bulk_create(
+        [models.VersionDatos(propietario=p, version=secrets.randbits(62)) for p in propietarios],
+        update_conflicts=True,
+        unique_fields=['propietario'],
+        update_fields=['version'],
+    )
+
+
+def actual(propietario):
+    """Versión vigente de un dueno (0 si nunca se escribió desde que existe la tabla)."""
+    version = models.VersionDatos.objects.filter(pk=propietario).values_list('version', flat=True).first()
+    return version or 0
+
+
+def etag(request, recurso):
+    """
+    ETag fuerte del listado `recurso` para este usuario y esta URL (incluye los
+    query params, p. ej. grupo_id o page_size). Para un grupo del que el usuario
+    no es miembro el listado es vacío y el ETag no depende de la versión.
+    """
+    user = request.user
+    grupo_id = request.query_params.get('grupo_id')
+    if grupo_id:
+        dueno = propietario(grupo_id=grupo_id) if membership.es_miembro(user, grupo_id) else None
+    else:
+        dueno = propietario(usuario_id=user.pk)
+    estado = f'{dueno}:{actual(dueno)}' if dueno else 'sin-acceso'
+    clave = f'{recurso}|{user.pk}|{estado}|{request.get_full_path()}'
+    return '"' + hashlib.sha1(clave.encode('utf-8')).hexdigest() + '"'
+
+
+def coincide(request, valor):
+    """If-None-Match contiene este ETag (comparación débil, como pide RFC 9110)."""
+    cabecera = request.META.get('HTTP_IF_NONE_MATCH')
+    if not cabecera:
+        return False
+    etags = parse_etags(cabecera)
+    return '*' in etags or valor in {e.removeprefix('W/') for e in etags}
@@ -1,14 +1,16 @@
 from rest_framework import viewsets, status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
-from django.db.models import Q
-from . import models, serializers
+from django.db.models import F, Prefetch, Q, Sum
+from . import balances, busqueda, exports, imports, membership, metrics, models, pagination, reconciliacion, resumenes, serializacion, serializers, snapshots, versiones
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.db.models.deletion import RestrictedError
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 import logging
+from decimal import Decimal
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -20,6 +22,78 @@ class HealthCheckAPIView(APIView):
     def get(self, request):
         return Response({'status': 'ok'}, status=200)
 
+
+class MetricsAPIView(APIView):
+    """
+    Métricas en formato Prometheus. Si METRICS_TOKEN está definido se exige
+    la cabecera Authorization: Bearer <METRICS_TOKEN>.
+    """
+    permission_classes = []
+    authentication_classes = []
+
+    def get(self, request):
+        from django.conf import settings
+        from django.http import HttpResponse
+
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            return Response({'detail': 'Métricas desactivadas'}, status=status.HTTP_404_NOT_FOUND)
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        if token and request.META.get('HTTP_AUTHORIZATION', '') != f'Bearer {token}':
+            return Response({'detail': 'No autorizado'}, status=status.HTTP_401_UNAUTHORIZED)
+        cuerpo, content_type = metrics.exportar()
+        return HttpResponse(cuerpo, content_type=content_type)
+
+
+class ReconciliacionAPIView(APIView):
+    """
+    Conciliación de saldos contra el historial (solo staff).
+    GET informa las diferencias; POST además las corrige.
+    Parámetros: desde, hasta (ids de bolsillo, [desde, hasta)); por defecto todos.
+    Instalaciones grandes: python manage.py reconcile_balances --workers N
+    """
+    permission_classes = [IsAdminUser]
+    MAX_BOLSILLOS = 100000
+    CHUNK_SIZE = 10000
+
+    def get(self, request):
+        return self._conciliar(request.query_params, corregir=False)
+
+    def post(self, request):
+        return self._conciliar(request.data, corregir=True)
+
+    def _conciliar(self, params, corregir):
+        ids = models.Bolsillo.objects.order_by().values_list('pk', flat=True)
+        try:
+            desde = int(params.get('desde') or (ids.order_by('pk').first() or 0))
+            hasta = int(params.get('hasta') or ((ids.order_by('-pk').first() or 0) + 1))
+        except (TypeError, ValueError):
+            raise ValidationError({'detail': 'desde y hasta deben ser ids de bolsillo'})
+        if hasta - desde > self.MAX_BOLSILLOS:
+            raise ValidationError({
+                'detail': f'Como máximo {self.MAX_BOLSILLOS} ids por petición; usa el comando reconcile_balances'
+            })
+
+        revisados = 0
+        diferencias = []
+        for inicio in range(desde, hasta, self.CHUNK_SIZE):
+            n, encontradas = reconciliacion.revisar(inicio, min(inicio + self.CHUNK_SIZE, hasta), corregir=corregir)
+            revisados += n
+            diferencias.extend(encontradas)
+
+        return Response({
+            'desde': desde,
+            'hasta': hasta,
+            'revisados': revisados,
+            'corregidas': corregir,
+            'diferencias': [{
+                'bolsillo_id': d['bolsillo_id'],
+                'saldo': str(d['saldo']),
+                'esperado': str(d['esperado']),
+                'diferencia': str(d['diferencia']),
+            } for d in diferencias],
+        }, status=status.HTTP_200_OK)
+
+
 logger = logging.getLogger(__name__)
 
 
@@ -116,8 +190,7 @@ class GrupoViewSet(viewsets.ModelViewSet):
         if not user or user.is_anonymous:
             return models.Grupo.objects.none()
         # Obtener los IDs de grupos donde el usuario es miembro
-        grupos_ids = models.UsuarioGrupo.objects.filter(usuario=user).values_list('grupo', flat=True)
-        return models.Grupo.objects.filter(grupo_id__in=grupos_ids)
+        return models.Grupo.objects.filter(grupo_id__in=membership.grupos_ids(user))
 
     def perform_create(self, serializer):
         """
@@ -141,10 +214,48 @@ class GrupoViewSet(viewsets.ModelViewSet):
 
 
 
-class BolsilloViewSet(viewsets.ModelViewSet):
+class VersionETagMixin:
+    """
+    GET condicional en el listado: ETag calculado con la versión del dueño (ver
+    versiones.py) antes de leer los datos; si coincide con If-None-Match se
+    responde 304 sin consultar la tabla ni serializar.
+    """
+    etag_recurso = None
+
+    def list(self, request, *args, **kwargs):
+        etag = versiones.etag(request, self.etag_recurso)
+        if versiones.coincide(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().list(request, *args, **kwargs)
+        response['ETag'] = etag
+        # El navegador guarda la respuesta pero la revalida siempre
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class FilasRapidasMixin:
+    """
+    Listado con ?fast=1: las filas se arman desde values() (ver serializacion.py)
+    sin crear modelos ni serializers, con la misma forma JSON y la misma paginación.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('fast') not in ('1', 'true'):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        filas = serializacion.valores(queryset)
+        page = self.paginate_queryset(filas)
+        if page is not None:
+            return self.get_paginated_response(serializacion.transacciones(queryset.model, page))
+        return Response(serializacion.transacciones(queryset.model, filas))
+
+
+class BolsilloViewSet(VersionETagMixin, viewsets.ModelViewSet):
     queryset = models.Bolsillo.objects.all()
     serializer_class = serializers.BolsilloSerializer
     permission_classes = [IsAuthenticated]
+    etag_recurso = 'bolsillos'
 
     def get_queryset(self):
         user = self.request.user
@@ -154,16 +265,15 @@ class BolsilloViewSet(viewsets.ModelViewSet):
         # Filtrar por grupo específico si se proporciona grupo_id
         grupo_id = self.request.query_params.get('grupo_id')
         if grupo_id:
-            # Obtener todos los grupos donde el usuario es miembro
-            grupos_ids = models.UsuarioGrupo.objects.filter(usuario=user).values_list('grupo', flat=True)
-            
             # Verificar que el usuario sea miembro del grupo
-            if int(grupo_id) not in grupos_ids:
+            if not membership.es_miembro(user, grupo_id):
                 return models.Bolsillo.objects.none()
-            return models.Bolsillo.objects.filter(grupo_id=grupo_id)
-        
-        # Si no hay grupo_id, mostrar SOLO bolsillos personales (sin grupo)
-        return models.Bolsillo.objects.filter(usuario=user, grupo__isnull=True)
+            queryset = models.Bolsillo.objects.filter(grupo_id=grupo_id)
+        else:
+            # Si no hay grupo_id, mostrar SOLO bolsillos personales (sin grupo)
+            queryset = models.Bolsillo.objects.filter(usuario=user, grupo__isnull=True)
+        # Saldo = saldo compactado + asientos pendientes (ver balances.py)
+        return queryset.annotate(saldo_pendiente=balances.pendiente())
 
     def perform_create(self, serializer):
         from django.db.models import Sum
@@ -175,92 +285,92 @@ class BolsilloViewSet(viewsets.ModelViewSet):
         
         if grupo_id:
             # Verificar que el usuario sea miembro del grupo
-            es_miembro = models.UsuarioGrupo.objects.filter(
-                usuario=user,
-                grupo_id=grupo_id
-            ).exists()
-            if not es_miembro:
+            if not membership.es_miembro(user, grupo_id):
                 raise ValidationError({'detail': 'No eres miembro de este grupo'})
             
             # Si se especifica un monto inicial, transferir desde el bolsillo General
             if monto_bolsillo > 0:
                 # Buscar el bolsillo "General" del grupo
-                try:
-                    bolsillo_general = models.Bolsillo.objects.get(
-                        grupo_id=grupo_id,
-                        nombre='General'
-                    )
-                except models.Bolsillo.DoesNotExist:
+                general_id = models.Bolsillo.objects.filter(
+                    grupo_id=grupo_id,
+                    nombre='General'
+                ).values_list('bolsillo_id', flat=True).first()
+                if general_id is None:
                     raise ValidationError({
                         'detail': 'No se encontró el bolsillo General del grupo. Crea primero el bolsillo General.'
                     })
                 
-                # Verificar que el bolsillo General tenga saldo suficiente
-                if bolsillo_general.saldo < monto_bolsillo:
-                    raise ValidationError({
-                        'detail': f'Saldo insuficiente en el bolsillo General. Saldo disponible: ${bolsillo_general.saldo:.2f}',
-                        'saldo_disponible': float(bolsillo_general.saldo)
-                    })
-                
-                # Crear el bolsillo primero con saldo 0
-                nuevo_bolsillo = serializer.save(grupo_id=grupo_id, saldo=0)
-                
-                # Realizar la transferencia interna
-                bolsillo_general.saldo -= monto_bolsillo
-                bolsillo_general.save()
-                
-                nuevo_bolsillo.saldo = monto_bolsillo
-                nuevo_bolsillo.save()
+                with transaction.atomic():
+                    bolsillo_general = balances.bloquear(general_id)[general_id]
+                    
+                    # Verificar que el bolsillo General tenga saldo suficiente
+                    if bolsillo_general.saldo < monto_bolsillo:
+                        metrics.SALDO_INSUFICIENTE.labels('bolsillo').inc()
+                        raise ValidationError({
+                            'detail': f'Saldo insuficiente en el bolsillo General. Saldo disponible: ${bolsillo_general.saldo:.2f}',
+                            'saldo_disponible': float(bolsillo_general.saldo)
+                        })
+                    
+                    # Realizar la transferencia interna: el bolsillo nuevo nace con el monto
+                    nuevo = serializer.save(grupo_id=grupo_id, saldo=monto_bolsillo, saldo_ajustes=monto_bolsillo)
+                    balances.ajustar({general_id: -monto_bolsillo}, {general_id: bolsillo_general})
+                    balances.registrar_asignacion(nuevo)
             else:
                 # Crear bolsillo sin saldo inicial
-                serializer.save(grupo_id=grupo_id)
+                serializer.save(grupo_id=grupo_id, saldo_ajustes=monto_bolsillo)
         else:
-            serializer.save(usuario=user)
+            with transaction.atomic():
+                # El saldo inicial no viene de ninguna transacción: cuenta como ajuste
+                balances.registrar_asignacion(serializer.save(usuario=user, saldo_ajustes=monto_bolsillo))
 
     def perform_update(self, serializer):
         from rest_framework.exceptions import ValidationError
         
-        bolsillo = self.get_object()
-        nuevo_saldo = serializer.validated_data.get('saldo', bolsillo.saldo)
-        saldo_anterior = bolsillo.saldo
+        bolsillo = serializer.instance
         
-        # Solo validar si el bolsillo pertenece a un grupo Y el saldo cambió
-        if bolsillo.grupo and nuevo_saldo != saldo_anterior:
-            # No permitir editar el saldo del bolsillo General directamente
-            if bolsillo.nombre == 'General':
-                raise ValidationError({
-                    'detail': 'No puedes editar el saldo del bolsillo General directamente. El saldo se actualiza automáticamente con las transacciones del grupo.'
-                })
-            
-            # Buscar el bolsillo General
-            try:
-                bolsillo_general = models.Bolsillo.objects.get(
-                    grupo=bolsillo.grupo,
+        with transaction.atomic():
+            general_id = None
+            if bolsillo.grupo_id and bolsillo.nombre != 'General':
+                general_id = models.Bolsillo.objects.filter(
+                    grupo_id=bolsillo.grupo_id,
                     nombre='General'
-                )
-            except models.Bolsillo.DoesNotExist:
-                raise ValidationError({
-                    'detail': 'No se encontró el bolsillo General del grupo.'
-                })
+                ).values_list('bolsillo_id', flat=True).first()
+            bloqueados = balances.bloquear(bolsillo, general_id)
+            saldo_anterior = bloqueados[bolsillo.pk].saldo
+            nuevo_saldo = serializer.validated_data.get('saldo', saldo_anterior)
             
-            # Calcular la diferencia
-            diferencia = nuevo_saldo - saldo_anterior
-            
-            if diferencia > 0:
-                # Aumentar saldo: transferir desde General
-                if bolsillo_general.saldo < diferencia:
+            # Solo validar si el bolsillo pertenece a un grupo Y el saldo cambió
+            if bolsillo.grupo_id and nuevo_saldo != saldo_anterior:
+                # No permitir editar el saldo del bolsillo General directamente
+                if bolsillo.nombre == 'General':
+                    raise ValidationError({
+                        'detail': 'No puedes editar el saldo del bolsillo General directamente. El saldo se actualiza automáticamente con las transacciones del grupo.'
+                    })
+                
+                if general_id is None:
+                    raise ValidationError({
+                        'detail': 'No se encontró el bolsillo General del grupo.'
+                    })
+                bolsillo_general = bloqueados[general_id]
+                
+                # Calcular la diferencia
+                diferencia = nuevo_saldo - saldo_anterior
+                
+                # Aumentar saldo: transferir desde General (validar disponible)
+                if diferencia > 0 and bolsillo_general.saldo < diferencia:
+                    metrics.SALDO_INSUFICIENTE.labels('bolsillo').inc()
                     raise ValidationError({
                         'detail': f'Saldo insuficiente en el bolsillo General. Saldo disponible: ${bolsillo_general.saldo:.2f}, necesitas: ${diferencia:.2f}',
                         'saldo_disponible': float(bolsillo_general.saldo)
                     })
-                bolsillo_general.saldo -= diferencia
-                bolsillo_general.save()
-            else:
-                # Disminuir saldo: devolver a General
-                bolsillo_general.saldo += abs(diferencia)
-                bolsillo_general.save()
-        
-        serializer.save()
+                # Disminuir saldo: devolver a General (diferencia negativa)
+                balances.ajustar({general_id: -diferencia}, bloqueados)
+            
+            # Guardar siempre el saldo leído bajo bloqueo (o el nuevo) para no pisar
+            # cambios concurrentes con el valor que tenía la instancia en memoria;
+            # lo mismo con saldo_ajustes, que recibe la edición manual
+            ajustes = bloqueados[bolsillo.pk].saldo_ajustes + nuevo_saldo - saldo_anterior
+            balances.registrar_asignacion(serializer.save(saldo=nuevo_saldo, saldo_ajustes=ajustes), saldo_anterior)
 
     def destroy(self, request, *args, **kwargs):
         """Override destroy to return a friendly error when DB restricts deletion (e.g. transferencias)."""
@@ -295,11 +405,69 @@ class BolsilloViewSet(viewsets.ModelViewSet):
             logger.error(f"Error al actualizar bolsillo: {str(e)}")
             return Response({'detail': f'Error al actualizar el bolsillo: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['get'], url_path='history')
+    def history(self, request, pk=None):
+        """
+        Saldo diario del bolsillo leído de BolsilloSnapshot (sin recorrer transacciones).
+        Parámetros (query): from=YYYY-MM-DD, to=YYYY-MM-DD (opcionales), grupo_id para bolsillos de grupo
+        """
+        import datetime
+
+        bolsillo = self.get_object()
+        rango = {}
+        for param in ('from', 'to'):
+            valor = request.query_params.get(param)
+            if valor:
+                try:
+                    rango[param] = datetime.date.fromisoformat(valor)
+                except ValueError:
+                    raise ValidationError({'detail': f'El parámetro {param} debe tener formato YYYY-MM-DD'})
+        if 'from' in rango and 'to' in rango and rango['from'] > rango['to']:
+            raise ValidationError({'detail': 'El parámetro from no puede ser posterior a to'})
+
+        snapshots_bolsillo = models.BolsilloSnapshot.objects.filter(bolsillo=bolsillo)
+        dias = snapshots_bolsillo.order_by('fecha')
+        if 'from' in rango:
+            dias = dias.filter(fecha__gte=rango['from'])
+        if 'to' in rango:
+            dias = dias.filter(fecha__lte=rango['to'])
+        dias = list(dias.values('fecha', 'saldo', 'ingresos', 'egresos'))
+
+        # Saldo al empezar el rango: el del último día anterior; si no hay, el saldo
+        # previo al primer snapshot del bolsillo (o el actual si nunca tuvo movimientos)
+        anterior = None
+        if 'from' in rango:
+            anterior = snapshots_bolsillo.filter(fecha__lt=rango['from']).order_by('-fecha').first()
+        if anterior is not None:
+            saldo_inicial = anterior.saldo
+        else:
+            primero = snapshots_bolsillo.order_by('fecha').first()
+            saldo_inicial = primero.saldo - primero.ingresos + primero.egresos if primero else bolsillo.saldo
+        saldo_final = dias[-1]['saldo'] if dias else saldo_inicial
+
+        return Response({
+            'bolsillo_id': bolsillo.bolsillo_id,
+            'from': rango.get('from'),
+            'to': rango.get('to'),
+            'saldo_inicial': str(saldo_inicial),
+            'saldo_final': str(saldo_final),
+            'dias': [
+                {
+                    'fecha': d['fecha'],
+                    'saldo': str(d['saldo']),
+                    'ingresos': str(d['ingresos']),
+                    'egresos': str(d['egresos']),
+                }
+                for d in dias
+            ],
+        })
+
 
-class CategoriaViewSet(viewsets.ModelViewSet):
+class CategoriaViewSet(VersionETagMixin, viewsets.ModelViewSet):
     queryset = models.Categoria.objects.all()
     serializer_class = serializers.CategoriaSerializer
     permission_classes = [IsAuthenticated]
+    etag_recurso = 'categorias'
 
     def get_queryset(self):
         user = self.request.user
@@ -310,11 +478,7 @@ class CategoriaViewSet(viewsets.ModelViewSet):
         grupo_id = self.request.query_params.get('grupo_id')
         if grupo_id:
             # Verificar que el usuario sea miembro del grupo
-            es_miembro = models.UsuarioGrupo.objects.filter(
-                usuario=user,
-                grupo_id=grupo_id
-            ).exists()
-            if not es_miembro:
+            if not membership.es_miembro(user, grupo_id):
                 return models.Categoria.objects.none()
             return models.Categoria.objects.filter(grupo_id=grupo_id)
         
@@ -327,11 +491,7 @@ class CategoriaViewSet(viewsets.ModelViewSet):
         
         if grupo_id:
             # Verificar que el usuario sea miembro del grupo
-            es_miembro = models.UsuarioGrupo.objects.filter(
-                usuario=user,
-                grupo_id=grupo_id
-            ).exists()
-            if not es_miembro:
+            if not membership.es_miembro(user, grupo_id):
                 from rest_framework.exceptions import ValidationError
                 raise ValidationError({'detail': 'No eres miembro de este grupo'})
             serializer.save(grupo_id=grupo_id)
@@ -339,25 +499,99 @@ class CategoriaViewSet(viewsets.ModelViewSet):
             serializer.save(usuario=user)
 
 
-class TransferenciaViewSet(viewsets.ModelViewSet):
+class TransferenciaViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Transferencias entre bolsillos (solo lectura: se crean con
+    /api/movimientos/transferir/ y no se modifican).
+    """
     queryset = models.Transferencia.objects.all()
     serializer_class = serializers.TransferenciaSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = pagination.FechaCursorPagination
 
     def get_queryset(self):
         user = self.request.user
         if not user or user.is_anonymous:
             return models.Transferencia.objects.none()
-        grupos = models.UsuarioGrupo.objects.filter(usuario=user).values_list('grupo', flat=True)
-        return models.Transferencia.objects.filter(
-            Q(de_bolsillo__usuario=user) | Q(a_bolsillo__usuario=user) | Q(de_bolsillo__grupo__in=grupos) | Q(a_bolsillo__grupo__in=grupos)
+        # UNION de dos subconsultas por los índices de origen y destino sobre la
+        # lista de bolsillos visibles, en lugar de un OR con JOIN a bolsillo: el
+        # costo depende de las transferencias del usuario, no del total.
+        visibles = membership.bolsillos_visibles(user)
+        ids = models.Transferencia.objects.filter(de_bolsillo_id__in=visibles).values('pk').union(
+            models.Transferencia.objects.filter(a_bolsillo_id__in=visibles).values('pk')
         )
+        return models.Transferencia.objects.filter(pk__in=ids)
 
+    @action(detail=False, methods=['get'], url_path='history')
+    def history(self, request):
+        """
+        Historial de transferencias leído de los asientos en movimiento (índice
+        dueño + fecha), sin ORs entre bolsillos de origen y destino.
+        Parámetros (query): grupo_id (opcional), bolsillo_id (opcional: entradas
+        y salidas de ese bolsillo; sin él, una fila por transferencia).
+        Paginación por cursor como en los listados (cursor, page_size).
+        """
+        filtro = _filtro_propietario(request.user, request.query_params.get('grupo_id'))
+        asientos = models.Movimiento.objects.filter(filtro, transferencia__isnull=False)
+        bolsillo_id = request.query_params.get('bolsillo_id')
+        if bolsillo_id:
+            asientos = asientos.filter(bolsillo_id=bolsillo_id)
+        else:
+            asientos = asientos.filter(tipo='eg')
+        asientos = asientos.select_related(
+            'transferencia__de_bolsillo', 'transferencia__a_bolsillo'
+        ).order_by('-fecha', '-pk')
 
-class IngresoViewSet(viewsets.ModelViewSet):
+        paginator = pagination.FechaCursorPagination()
+        pagina = paginator.paginate_queryset(asientos, request, view=self)
+        data = [{
+            'transferencia_id': m.transferencia_id,
+            'fecha': m.transferencia.fecha,
+            'monto': str(m.monto),
+            'descripcion': m.transferencia.descripcion,
+            'direccion': 'salida' if m.tipo == 'eg' else 'entrada',
+            'de_bolsillo': {'id': m.transferencia.de_bolsillo_id, 'nombre': m.transferencia.de_bolsillo.nombre},
+            'a_bolsillo': {'id': m.transferencia.a_bolsillo_id, 'nombre': m.transferencia.a_bolsillo.nombre},
+            'creado_por': m.transferencia.creado_por_id,
+        } for m in (pagina if pagina is not None else asientos)]
+        if pagina is not None:
+            return paginator.get_paginated_response(data)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+def _filtro_propietario(user, grupo_id):
+    """
+    Q para filtrar por grupo (verificando membresía) o por datos personales.
+    """
+    if grupo_id:
+        # Verificar que el usuario sea miembro del grupo
+        if not membership.es_miembro(user, grupo_id):
+            raise ValidationError({'detail': 'No eres miembro de este grupo'})
+        return Q(grupo_id=grupo_id)
+    # Sin grupo_id: SOLO datos personales (sin grupo)
+    return Q(usuario=user, grupo__isnull=True)
+
+
+def _con_relaciones(queryset, relacion_aportacion):
+    """
+    Precargar las relaciones que usan IngresoSerializer/EgresoSerializer en
+    to_representation, para que listar N filas cueste un número fijo de queries.
+    """
+    return queryset.select_related('categoria', 'bolsillo', 'usuario', 'creado_por').prefetch_related(
+        Prefetch(
+            relacion_aportacion,
+            queryset=models.Aportacion.objects.select_related('usuario').order_by('pk'),
+            to_attr='aportaciones_prefetch'
+        )
+    ).annotate(bolsillo_pendiente=balances.pendiente('bolsillo'))
+
+
+class IngresoViewSet(VersionETagMixin, FilasRapidasMixin, viewsets.ModelViewSet):
     queryset = models.Ingreso.objects.all()
     serializer_class = serializers.IngresoSerializer
     permission_classes = [IsAuthenticated]
+    etag_recurso = 'ingresos'
+    pagination_class = pagination.FechaCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -367,16 +601,13 @@ class IngresoViewSet(viewsets.ModelViewSet):
         # Filtrar por grupo específico si se proporciona grupo_id
         grupo_id = self.request.query_params.get('grupo_id')
         if grupo_id:
-            # Obtener todos los grupos donde el usuario es miembro
-            grupos_ids = models.UsuarioGrupo.objects.filter(usuario=user).values_list('grupo', flat=True)
-            
             # Verificar que el usuario sea miembro del grupo
-            if int(grupo_id) not in grupos_ids:
+            if not membership.es_miembro(user, grupo_id):
                 return models.Ingreso.objects.none()
-            return models.Ingreso.objects.filter(grupo_id=grupo_id)
+            return _con_relaciones(models.Ingreso.objects.filter(grupo_id=grupo_id), 'aportacion_ingreso')
         
         # Si no hay grupo_id, mostrar SOLO ingresos personales (sin grupo)
-        return models.Ingreso.objects.filter(usuario=user, grupo__isnull=True)
+        return _con_relaciones(models.Ingreso.objects.filter(usuario=user, grupo__isnull=True), 'aportacion_ingreso')
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -384,59 +615,66 @@ class IngresoViewSet(viewsets.ModelViewSet):
         monto = serializer.validated_data.get('monto', 0)
         grupo_id = self.request.data.get('grupo_id') or self.request.data.get('grupo')
         
-        # Actualizar saldo del bolsillo (sumar ingreso)
-        if bolsillo and monto:
-            bolsillo.saldo += monto
-            bolsillo.save()
-        
         if grupo_id:
             # Verificar que el usuario sea miembro del grupo
-            es_miembro = models.UsuarioGrupo.objects.filter(
-                usuario=user,
-                grupo_id=grupo_id
-            ).exists()
-            if not es_miembro:
+            if not membership.es_miembro(user, grupo_id):
                 from rest_framework.exceptions import ValidationError
                 raise ValidationError({'detail': 'No eres miembro de este grupo'})
-            # Importante: NO setear usuario para transacciones de grupo (restricción XOR)
-            # pero SÍ guardar quién la creó en creado_por
-            serializer.save(grupo_id=grupo_id, creado_por=user)
-        else:
-            serializer.save(usuario=user, creado_por=user)
+        
+        with transaction.atomic():
+            if grupo_id:
+                # Importante: NO setear usuario para transacciones de grupo (restricción XOR)
+                # pero SÍ guardar quién la creó en creado_por
+                ingreso = serializer.save(grupo_id=grupo_id, creado_por=user)
+            else:
+                ingreso = serializer.save(usuario=user, creado_por=user)
+            resumenes.registrar(resumenes.acumular({}, ingreso, 1))
+            
+            # Actualizar saldo del bolsillo (sumar ingreso)
+            if bolsillo and monto:
+                flujos = snapshots.flujo({}, bolsillo, ingreso.fecha, ingresos=monto)
+                balances.aplicar({bolsillo.pk: monto}, balances.bloquear(bolsillo), flujos)
     
     def perform_update(self, serializer):
-        # Obtener el ingreso original antes de actualizar
-        ingreso_original = self.get_object()
-        bolsillo_original = ingreso_original.bolsillo
-        monto_original = ingreso_original.monto
-        
-        # Revertir el saldo original si había bolsillo
-        if bolsillo_original and monto_original:
-            bolsillo_original.saldo -= monto_original
-            bolsillo_original.save()
-        
-        # Aplicar el nuevo monto al bolsillo nuevo o actualizado
-        bolsillo_nuevo = serializer.validated_data.get('bolsillo')
-        monto_nuevo = serializer.validated_data.get('monto', 0)
-        
-        if bolsillo_nuevo and monto_nuevo:
-            bolsillo_nuevo.saldo += monto_nuevo
-            bolsillo_nuevo.save()
-        
-        serializer.save()
+        with transaction.atomic():
+            # Releer el ingreso original bajo bloqueo antes de actualizar
+            ingreso_original = models.Ingreso.objects.select_for_update().get(pk=serializer.instance.pk)
+            bolsillo_nuevo = serializer.validated_data.get('bolsillo', ingreso_original.bolsillo)
+            monto_nuevo = serializer.validated_data.get('monto', ingreso_original.monto)
+            fecha_nueva = serializer.validated_data.get('fecha', ingreso_original.fecha)
+            
+            # Revertir el monto original y aplicar el nuevo en una sola pasada
+            deltas = {}
+            balances.acumular(deltas, ingreso_original.bolsillo_id, -ingreso_original.monto)
+            balances.acumular(deltas, bolsillo_nuevo, monto_nuevo)
+            flujos = {}
+            snapshots.flujo(flujos, ingreso_original.bolsillo_id, ingreso_original.fecha, ingresos=-ingreso_original.monto)
+            snapshots.flujo(flujos, bolsillo_nuevo, fecha_nueva, ingresos=monto_nuevo)
+            bloqueados = balances.bloquear(*deltas.keys())
+            
+            ingreso = serializer.save()
+            balances.aplicar(deltas, bloqueados, flujos)
+            cambios = resumenes.acumular({}, ingreso_original, -1)
+            resumenes.registrar(resumenes.acumular(cambios, ingreso, 1))
     
     def perform_destroy(self, instance):
-        # Revertir el saldo al eliminar
-        if instance.bolsillo and instance.monto:
-            instance.bolsillo.saldo -= instance.monto
-            instance.bolsillo.save()
-        instance.delete()
+        with transaction.atomic():
+            # Revertir el saldo al eliminar
+            ingreso = models.Ingreso.objects.select_for_update().get(pk=instance.pk)
+            deltas = balances.acumular({}, ingreso.bolsillo_id, -ingreso.monto)
+            flujos = snapshots.flujo({}, ingreso.bolsillo_id, ingreso.fecha, ingresos=-ingreso.monto)
+            bloqueados = balances.bloquear(*deltas.keys())
+            resumenes.registrar(resumenes.acumular({}, ingreso, -1))
+            ingreso.delete()
+            balances.aplicar(deltas, bloqueados, flujos)
 
 
-class EgresoViewSet(viewsets.ModelViewSet):
+class EgresoViewSet(VersionETagMixin, FilasRapidasMixin, viewsets.ModelViewSet):
     queryset = models.Egreso.objects.all()
     serializer_class = serializers.EgresoSerializer
     permission_classes = [IsAuthenticated]
+    etag_recurso = 'egresos'
+    pagination_class = pagination.FechaCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -446,16 +684,13 @@ class EgresoViewSet(viewsets.ModelViewSet):
         # Filtrar por grupo específico si se proporciona grupo_id
         grupo_id = self.request.query_params.get('grupo_id')
         if grupo_id:
-            # Obtener todos los grupos donde el usuario es miembro
-            grupos_ids = models.UsuarioGrupo.objects.filter(usuario=user).values_list('grupo', flat=True)
-            
             # Verificar que el usuario sea miembro del grupo
-            if int(grupo_id) not in grupos_ids:
+            if not membership.es_miembro(user, grupo_id):
                 return models.Egreso.objects.none()
-            return models.Egreso.objects.filter(grupo_id=grupo_id)
+            return _con_relaciones(models.Egreso.objects.filter(grupo_id=grupo_id), 'aportacion_egreso')
         
         # Si no hay grupo_id, mostrar SOLO egresos personales (sin grupo)
-        return models.Egreso.objects.filter(usuario=user, grupo__isnull=True)
+        return _con_relaciones(models.Egreso.objects.filter(usuario=user, grupo__isnull=True), 'aportacion_egreso')
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -463,85 +698,232 @@ class EgresoViewSet(viewsets.ModelViewSet):
         monto = serializer.validated_data.get('monto', 0)
         grupo_id = self.request.data.get('grupo_id') or self.request.data.get('grupo')
         
-        # Validar que hay saldo suficiente en el bolsillo
-        if bolsillo and monto:
-            if bolsillo.saldo < monto:
-                from rest_framework.exceptions import ValidationError
-                raise ValidationError({
-                    'detail': f'Saldo insuficiente en el bolsillo "{bolsillo.nombre}". Saldo disponible: ${bolsillo.saldo}, monto requerido: ${monto}'
-                })
-            
-            # Actualizar saldo del bolsillo (restar egreso)
-            bolsillo.saldo -= monto
-            bolsillo.save()
-        
         if grupo_id:
             # Verificar que el usuario sea miembro del grupo
-            es_miembro = models.UsuarioGrupo.objects.filter(
-                usuario=user,
-                grupo_id=grupo_id
-            ).exists()
-            if not es_miembro:
+            if not membership.es_miembro(user, grupo_id):
                 from rest_framework.exceptions import ValidationError
                 raise ValidationError({'detail': 'No eres miembro de este grupo'})
-            # Importante: NO setear usuario para transacciones de grupo (restricción XOR)
-            # pero SÍ guardar quién la creó en creado_por
-            serializer.save(grupo_id=grupo_id, creado_por=user)
-        else:
-            serializer.save(usuario=user, creado_por=user)
+        
+        with transaction.atomic():
+            # Validar que hay saldo suficiente en el bolsillo (leído bajo bloqueo)
+            bloqueados = balances.bloquear(bolsillo) if bolsillo and monto else {}
+            if bloqueados:
+                bloqueado = bloqueados[bolsillo.pk]
+                if bloqueado.saldo < monto:
+                    from rest_framework.exceptions import ValidationError
+                    metrics.SALDO_INSUFICIENTE.labels('egreso').inc()
+                    raise ValidationError({
+                        'detail': f'Saldo insuficiente en el bolsillo "{bloqueado.nombre}". Saldo disponible: ${bloqueado.saldo}, monto requerido: ${monto}'
+                    })
+            
+            if grupo_id:
+                # Importante: NO setear usuario para transacciones de grupo (restricción XOR)
+                # pero SÍ guardar quién la creó en creado_por
+                egreso = serializer.save(grupo_id=grupo_id, creado_por=user)
+            else:
+                egreso = serializer.save(usuario=user, creado_por=user)
+            resumenes.registrar(resumenes.acumular({}, egreso, 1))
+            
+            # Actualizar saldo del bolsillo (restar egreso)
+            if bloqueados:
+                flujos = snapshots.flujo({}, bolsillo, egreso.fecha, egresos=monto)
+                balances.aplicar({bolsillo.pk: -monto}, bloqueados, flujos)
     
     def perform_update(self, serializer):
-        # Obtener el egreso original antes de actualizar
-        egreso_original = self.get_object()
-        bolsillo_original = egreso_original.bolsillo
-        monto_original = egreso_original.monto
-        
-        # Revertir el saldo original si había bolsillo (sumar de vuelta)
-        if bolsillo_original and monto_original:
-            bolsillo_original.saldo += monto_original
-            bolsillo_original.save()
-        
-        # Validar y aplicar el nuevo monto
-        bolsillo_nuevo = serializer.validated_data.get('bolsillo')
-        monto_nuevo = serializer.validated_data.get('monto', 0)
-        
-        if bolsillo_nuevo and monto_nuevo:
-            if bolsillo_nuevo.saldo < monto_nuevo:
-                from rest_framework.exceptions import ValidationError
-                raise ValidationError({
-                    'detail': f'Saldo insuficiente en el bolsillo "{bolsillo_nuevo.nombre}". Saldo disponible: ${bolsillo_nuevo.saldo}, monto requerido: ${monto_nuevo}'
-                })
-            bolsillo_nuevo.saldo -= monto_nuevo
-            bolsillo_nuevo.save()
-        
-        serializer.save()
+        with transaction.atomic():
+            # Releer el egreso original bajo bloqueo antes de actualizar
+            egreso_original = models.Egreso.objects.select_for_update().get(pk=serializer.instance.pk)
+            bolsillo_nuevo = serializer.validated_data.get('bolsillo', egreso_original.bolsillo)
+            monto_nuevo = serializer.validated_data.get('monto', egreso_original.monto)
+            fecha_nueva = serializer.validated_data.get('fecha', egreso_original.fecha)
+            
+            # Revertir el monto original (sumar de vuelta) y restar el nuevo
+            deltas = {}
+            balances.acumular(deltas, egreso_original.bolsillo_id, egreso_original.monto)
+            balances.acumular(deltas, bolsillo_nuevo, -monto_nuevo)
+            flujos = {}
+            snapshots.flujo(flujos, egreso_original.bolsillo_id, egreso_original.fecha, egresos=-egreso_original.monto)
+            snapshots.flujo(flujos, bolsillo_nuevo, fecha_nueva, egresos=monto_nuevo)
+            bloqueados = balances.bloquear(*deltas.keys())
+            
+            # Validar el nuevo monto contra el saldo ya revertido
+            if bolsillo_nuevo and monto_nuevo:
+                bloqueado = bloqueados[bolsillo_nuevo.pk]
+                disponible = bloqueado.saldo
+                if bolsillo_nuevo.pk == egreso_original.bolsillo_id:
+                    disponible += egreso_original.monto
+                if disponible < monto_nuevo:
+                    from rest_framework.exceptions import ValidationError
+                    metrics.SALDO_INSUFICIENTE.labels('egreso').inc()
+                    raise ValidationError({
+                        'detail': f'Saldo insuficiente en el bolsillo "{bloqueado.nombre}". Saldo disponible: ${disponible}, monto requerido: ${monto_nuevo}'
+                    })
+            
+            egreso = serializer.save()
+            balances.aplicar(deltas, bloqueados, flujos)
+            cambios = resumenes.acumular({}, egreso_original, -1)
+            resumenes.registrar(resumenes.acumular(cambios, egreso, 1))
     
     def perform_destroy(self, instance):
-        # Revertir el saldo al eliminar (sumar de vuelta)
-        if instance.bolsillo and instance.monto:
-            instance.bolsillo.saldo += instance.monto
-            instance.bolsillo.save()
-        instance.delete()
+        with transaction.atomic():
+            # Revertir el saldo al eliminar (sumar de vuelta)
+            egreso = models.Egreso.objects.select_for_update().get(pk=instance.pk)
+            deltas = balances.acumular({}, egreso.bolsillo_id, egreso.monto)
+            flujos = snapshots.flujo({}, egreso.bolsillo_id, egreso.fecha, egresos=-egreso.monto)
+            bloqueados = balances.bloquear(*deltas.keys())
+            resumenes.registrar(resumenes.acumular({}, egreso, -1))
+            egreso.delete()
+            balances.aplicar(deltas, bloqueados, flujos)
 
 
-class MovimientoViewSet(viewsets.ModelViewSet):
+class MovimientoViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Asientos de las transferencias (el diario de saldos que leen la conciliación
+    y los snapshots): solo transferir() los escribe, así que aquí son de solo
+    lectura. Los movimientos sueltos de antes se siguen listando.
+    """
     queryset = models.Movimiento.objects.all()
     serializer_class = serializers.MovimientoSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = pagination.FechaCursorPagination
 
     def get_queryset(self):
         user = self.request.user
         if not user or user.is_anonymous:
             return models.Movimiento.objects.none()
-        grupos = models.UsuarioGrupo.objects.filter(usuario=user).values_list('grupo', flat=True)
+        grupos = membership.grupos_ids(user)
         return models.Movimiento.objects.filter(Q(usuario=user) | Q(grupo__in=grupos))
 
-    def perform_create(self, serializer):
-        user = self.request.user
-        if user and not serializer.validated_data.get('grupo'):
-            serializer.save(usuario=user)
+    def perform_content_negotiation(self, request, force=False):
+        # En export, ?format= elige csv|ndjson y no un renderer de DRF
+        if self.action == 'export':
+            force = True
+        return super().perform_content_negotiation(request, force=force)
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Exportar ingresos y egresos en streaming (sin cargar todo en memoria).
+        Parámetros (query): format=csv|ndjson (default csv), from=YYYY-MM-DD, to=YYYY-MM-DD,
+        grupo_id (opcional), gzip=1 (opcional, descarga comprimida)
+        """
+        import datetime
+
+        formato = request.query_params.get('format', 'csv')
+        if formato not in ('csv', 'ndjson'):
+            raise ValidationError({'detail': 'El format debe ser "csv" o "ndjson"'})
+
+        filtro = _filtro_propietario(request.user, request.query_params.get('grupo_id'))
+        queryset = models.MovimientoVista.objects.filter(filtro)
+        for param, lookup in (('from', 'fecha__gte'), ('to', 'fecha__lte')):
+            valor = request.query_params.get(param)
+            if valor:
+                try:
+                    fecha = datetime.date.fromisoformat(valor)
+                except ValueError:
+                    raise ValidationError({'detail': f'El parámetro {param} debe tener formato YYYY-MM-DD'})
+                queryset = queryset.filter(**{lookup: fecha})
+
+        if formato == 'csv':
+            chunks = exports.csv_stream(queryset)
+            content_type = 'text/csv; charset=utf-8'
         else:
-            serializer.save()
+            chunks = exports.ndjson_stream(queryset)
+            content_type = 'application/x-ndjson; charset=utf-8'
+        nombre = f'movimientos.{formato}'
+        if request.query_params.get('gzip') in ('1', 'true'):
+            chunks = exports.gzip(chunks)
+            content_type = 'application/gzip'
+            nombre += '.gz'
+
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{nombre}"'
+        return response
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        """
+        Buscar ingresos y egresos por descripción, ordenados por relevancia.
+        Parámetros (query): q (texto, requerido), grupo_id (opcional),
+        cursor y page_size (siempre pagina).
+        """
+        texto = request.query_params.get('q', '').strip()
+        if not texto:
+            raise ValidationError({'detail': 'El parámetro q es requerido'})
+        if len(texto) > 200:
+            raise ValidationError({'detail': 'El parámetro q no puede superar 200 caracteres'})
+        grupo_id = request.query_params.get('grupo_id')
+        filtro = _filtro_propietario(request.user, grupo_id)
+
+        paginator = pagination.RelevanciaPagination()
+        pagina = paginator.paginate_queryset(
+            busqueda.Resultados(request.user, grupo_id, filtro, texto), request, view=self
+        )
+        return paginator.get_paginated_response(pagina)
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def importar(self, request):
+        """
+        Importar ingresos y egresos en bloque (todo o nada).
+        Body: archivo CSV en el campo `file` (multipart) o JSON con una lista de filas
+        {tipo, monto, fecha, descripcion?, categoria?, bolsillo?}; grupo_id (query o body) opcional
+        """
+        from django.conf import settings
+
+        filas = imports.leer_filas(request)
+        if filas is None:
+            raise ValidationError({'detail': 'Envía un archivo CSV en "file" o una lista JSON de movimientos'})
+        if not filas:
+            raise ValidationError({'detail': 'El archivo no contiene movimientos'})
+        max_filas = getattr(settings, 'IMPORT_MAX_ROWS', 100000)
+        if len(filas) > max_filas:
+            raise ValidationError({'detail': f'Máximo {max_filas} movimientos por importación'})
+
+        user = request.user
+        grupo_id = request.query_params.get('grupo_id')
+        if not grupo_id and isinstance(request.data, dict):
+            grupo_id = request.data.get('grupo_id')
+        if grupo_id:
+            if not membership.es_miembro(user, grupo_id):
+                raise ValidationError({'detail': 'No eres miembro de este grupo'})
+            filtro = {'grupo_id': grupo_id}
+            propietario = {'grupo_id': grupo_id, 'creado_por': user}
+        else:
+            filtro = {'usuario': user, 'grupo__isnull': True}
+            propietario = {'usuario': user, 'creado_por': user}
+
+        ingresos, egresos, deltas, flujos, errores = imports.construir(filas, filtro, propietario)
+        if errores:
+            # Response y no ValidationError, que convertiría los números de fila en texto
+            return Response({'detail': 'Hay filas inválidas; no se importó nada', 'errores': errores},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        lote = getattr(settings, 'IMPORT_BATCH_SIZE', 2000)
+        with transaction.atomic():
+            # Un solo bloqueo y un solo UPDATE por bolsillo, sin importar cuántas filas lo tocan
+            bloqueados = balances.bloquear(*deltas.keys())
+            for pk, delta in deltas.items():
+                bolsillo = bloqueados[pk]
+                if bolsillo.saldo + delta < 0:
+                    metrics.SALDO_INSUFICIENTE.labels('importacion').inc()
+                    raise ValidationError({
+                        'detail': f'Saldo insuficiente en el bolsillo "{bolsillo.nombre}". Saldo disponible: ${bolsillo.saldo}, cambio neto de la importación: ${delta}'
+                    })
+            models.Ingreso.objects.bulk_create(ingresos, batch_size=lote)
+            models.Egreso.objects.bulk_create(egresos, batch_size=lote)
+            # bulk_create no emite post_save
+            versiones.marcar(versiones.propietario(user.pk, grupo_id))
+            balances.aplicar(deltas, bloqueados, flujos)
+            resumenes.registrar_lote([*ingresos, *egresos])
+
+        return Response({
+            'ingresos': len(ingresos),
+            'egresos': len(egresos),
+            'bolsillos': [
+                {'bolsillo_id': b.pk, 'nombre': b.nombre, 'saldo': str(b.saldo)}
+                for b in bloqueados.values()
+            ],
+        }, status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=['post'], url_path='transferir')
     def transferir(self, request):
@@ -549,9 +931,6 @@ class MovimientoViewSet(viewsets.ModelViewSet):
         Transferir dinero entre bolsillos (del mismo usuario o del mismo grupo).
         Requiere: bolsillo_origen_id, bolsillo_destino_id, monto, descripcion (opcional)
         """
-        from decimal import Decimal
-        from django.db import transaction
-        
         user = request.user
         bolsillo_origen_id = request.data.get('bolsillo_origen_id')
         bolsillo_destino_id = request.data.get('bolsillo_destino_id')
@@ -598,54 +977,74 @@ class MovimientoViewSet(viewsets.ModelViewSet):
             if bolsillo_origen.grupo != bolsillo_destino.grupo:
                 raise ValidationError({'detail': 'Solo puedes transferir entre bolsillos del mismo grupo'})
             # Verificar que el usuario es miembro del grupo
-            es_miembro = models.UsuarioGrupo.objects.filter(
-                usuario=user,
-                grupo=bolsillo_origen.grupo
-            ).exists()
-            if not es_miembro:
+            if not membership.es_miembro(user, bolsillo_origen.grupo):
                 raise ValidationError({'detail': 'No eres miembro de este grupo'})
             contexto_usuario = None
             contexto_grupo = bolsillo_origen.grupo
         else:
             raise ValidationError({'detail': 'No puedes transferir entre bolsillos personales y de grupo'})
         
-        # Verificar saldo suficiente
-        if bolsillo_origen.saldo < monto:
-            raise ValidationError({
-                'detail': f'Saldo insuficiente. El bolsillo tiene ${bolsillo_origen.saldo}, necesitas ${monto}'
-            })
-        
         # Realizar la transferencia (atomic para que ambas operaciones se hagan o ninguna)
         with transaction.atomic():
-            # Actualizar saldos
-            bolsillo_origen.saldo -= monto
-            bolsillo_origen.save()
+            # Solo se bloquea el origen (hay que validar su saldo). La entrada al
+            # destino se anota como asiento pendiente y la suma balances.compactar()
+            bloqueados = balances.bloquear(bolsillo_origen)
+            bolsillo_origen = bloqueados[bolsillo_origen.pk]
             
-            bolsillo_destino.saldo += monto
-            bolsillo_destino.save()
+            # Verificar saldo suficiente (leído bajo bloqueo)
+            if bolsillo_origen.saldo < monto:
+                metrics.SALDO_INSUFICIENTE.labels('transferencia').inc()
+                raise ValidationError({
+                    'detail': f'Saldo insuficiente. El bolsillo tiene ${bolsillo_origen.saldo}, necesitas ${monto}'
+                })
             
-            # Crear registro de movimiento (egreso del origen)
-            movimiento_egreso = models.Movimiento.objects.create(
-                tipo='eg',
-                monto=monto,
-                descripcion=descripcion or f'Transferencia a {bolsillo_destino.nombre}',
-                usuario=contexto_usuario,
-                grupo=contexto_grupo,
-                bolsillo=bolsillo_origen
-            )
+            # Actualizar saldos
+            balances.aplicar({bolsillo_origen.pk: -monto}, bloqueados)
             
-            # Crear registro de movimiento (ingreso al destino)
-            movimiento_ingreso = models.Movimiento.objects.create(
-                tipo='ing',
-                monto=monto,
-                descripcion=descripcion or f'Transferencia desde {bolsillo_origen.nombre}',
-                usuario=contexto_usuario,
-                grupo=contexto_grupo,
-                bolsillo=bolsillo_destino
+            # Una Transferencia inmutable y sus dos asientos (salida y entrada), estos en un solo INSERT
+            transferencia = models.Transferencia.objects.create(
+                de_bolsillo=bolsillo_origen,
+                a_bolsillo=bolsillo_destino,
+                monto_origen=monto,
+                monto_destino=monto,
+                descripcion=descripcion or None,
+                creado_por=user,
             )
+            models.Movimiento.objects.bulk_create([
+                models.Movimiento(
+                    tipo='eg',
+                    monto=monto,
+                    descripcion=descripcion or f'Transferencia a {bolsillo_destino.nombre}',
+                    usuario=contexto_usuario,
+                    grupo=contexto_grupo,
+                    bolsillo=bolsillo_origen,
+                    transferencia=transferencia,
+                ),
+                models.Movimiento(
+                    tipo='ing',
+                    monto=monto,
+                    descripcion=descripcion or f'Transferencia desde {bolsillo_origen.nombre}',
+                    usuario=contexto_usuario,
+                    grupo=contexto_grupo,
+                    bolsillo=bolsillo_destino,
+                    transferencia=transferencia,
+                    pendiente=True,
+                ),
+            ])
+            destino_id = bolsillo_destino.pk
+            transaction.on_commit(lambda: balances.compactar([destino_id], esperar=False))
+        
+        saldo, pendiente = models.Bolsillo.objects.filter(pk=bolsillo_destino.pk).annotate(
+            pendiente=balances.pendiente()
+        ).values_list('saldo', 'pendiente').get()
+        
+        ambito = 'grupo' if contexto_grupo else 'personal'
+        metrics.TRANSFERENCIAS.labels(ambito).inc()
+        metrics.TRANSFERENCIAS_MONTO.labels(ambito).inc(float(monto))
         
         return Response({
             'detail': 'Transferencia realizada exitosamente',
+            'transferencia_id': transferencia.transferencia_id,
             'bolsillo_origen': {
                 'id': bolsillo_origen.bolsillo_id,
                 'nombre': bolsillo_origen.nombre,
@@ -654,7 +1053,7 @@ class MovimientoViewSet(viewsets.ModelViewSet):
             'bolsillo_destino': {
                 'id': bolsillo_destino.bolsillo_id,
                 'nombre': bolsillo_destino.nombre,
-                'saldo': str(bolsillo_destino.saldo)
+                'saldo': str(saldo + pendiente)
             },
             'monto': str(monto)
         }, status=status.HTTP_200_OK)
@@ -670,7 +1069,7 @@ class UsuarioGrupoViewSet(viewsets.ModelViewSet):
         if not user or user.is_anonymous:
             return models.UsuarioGrupo.objects.none()
         # Obtener todos los grupos donde el usuario es miembro
-        grupos = models.UsuarioGrupo.objects.filter(usuario=user).values_list('grupo', flat=True)
+        grupos = membership.grupos_ids(user)
         # Retornar todos los miembros de esos grupos
         return models.UsuarioGrupo.objects.filter(grupo__in=grupos)
 
@@ -701,14 +1100,8 @@ class UsuarioGrupoViewSet(viewsets.ModelViewSet):
         except models.Grupo.DoesNotExist:
             raise ValidationError({'detail': 'El grupo no existe'})
         
-        # Verificar que el usuario actual tiene permisos en el grupo (debe ser admin)
-        user_grupo = models.UsuarioGrupo.objects.filter(
-            usuario=request.user,
-            grupo=grupo,
-            rol='admin'  # Solo los admins pueden agregar usuarios
-        ).first()
-        
-        if not user_grupo:
+        # Verificar que el usuario actual tiene permisos en el grupo (solo los admins pueden agregar usuarios)
+        if not membership.es_admin(request.user, grupo):
             raise ValidationError({'detail': 'Solo los administradores del grupo pueden agregar usuarios'})
         
         # Verificar que el usuario no esté ya en el grupo
@@ -746,19 +1139,14 @@ class UsuarioGrupoViewSet(viewsets.ModelViewSet):
             raise ValidationError({'detail': 'El grupo no existe'})
         
         # Verificar que el usuario actual es miembro del grupo
-        es_miembro = models.UsuarioGrupo.objects.filter(
-            usuario=request.user,
-            grupo=grupo
-        ).exists()
-        
-        if not es_miembro:
+        if not membership.es_miembro(request.user, grupo):
             raise ValidationError({'detail': 'No tienes permisos para ver los miembros de este grupo'})
         
         # Obtener todos los miembros
         miembros = models.UsuarioGrupo.objects.filter(grupo=grupo).select_related('usuario')
         
         # Obtener el ID del creador (si existe)
-        creador_id = grupo.creador.usuario_id if grupo.creador else None
+        creador_id = grupo.creador_id
         
         data = [{
             'usuario_id': m.usuario.usuario_id,
@@ -795,13 +1183,7 @@ class UsuarioGrupoViewSet(viewsets.ModelViewSet):
             raise ValidationError({'detail': 'El grupo no existe'})
         
         # Verificar que el usuario actual es admin del grupo
-        user_grupo = models.UsuarioGrupo.objects.filter(
-            usuario=request.user,
-            grupo=grupo,
-            rol='admin'
-        ).first()
-        
-        if not user_grupo:
+        if not membership.es_admin(request.user, grupo):
             raise ValidationError({'detail': 'Solo los administradores del grupo pueden cambiar roles'})
         
         # Buscar el miembro a modificar
@@ -811,7 +1193,7 @@ class UsuarioGrupoViewSet(viewsets.ModelViewSet):
             raise ValidationError({'detail': 'El usuario no existe'})
         
         # PROTECCIÓN: No permitir cambiar el rol del creador del grupo
-        if grupo.creador and grupo.creador.usuario_id == usuario_a_modificar.usuario_id:
+        if grupo.creador_id and grupo.creador_id == usuario_a_modificar.usuario_id:
             raise ValidationError({'detail': 'No se puede cambiar el rol del creador del grupo. El creador siempre debe ser administrador.'})
         
         # Buscar la relación usuario-grupo
@@ -858,6 +1240,7 @@ class AportacionViewSet(viewsets.ModelViewSet):
     queryset = models.Aportacion.objects.all()
     serializer_class = serializers.AportacionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = pagination.FechaCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -865,7 +1248,7 @@ class AportacionViewSet(viewsets.ModelViewSet):
             return models.Aportacion.objects.none()
         
         # Mostrar aportaciones donde el usuario es el aportante o miembro del grupo
-        grupos_ids = models.UsuarioGrupo.objects.filter(usuario=user).values_list('grupo', flat=True)
+        grupos_ids = membership.grupos_ids(user)
         return models.Aportacion.objects.filter(
             Q(usuario=user) | Q(grupo__in=grupos_ids)
         )
@@ -896,8 +1279,6 @@ class AportacionViewSet(viewsets.ModelViewSet):
         if not fecha:
             raise ValidationError({'detail': 'La fecha es requerida'})
         
-        from decimal import Decimal
-        
         try:
             monto = Decimal(str(monto))
             if monto <= 0:
@@ -912,11 +1293,7 @@ class AportacionViewSet(viewsets.ModelViewSet):
             raise ValidationError({'detail': 'El grupo no existe'})
         
         # Verificar que el usuario es miembro del grupo
-        es_miembro = models.UsuarioGrupo.objects.filter(
-            usuario=user,
-            grupo=grupo
-        ).exists()
-        if not es_miembro:
+        if not membership.es_miembro(user, grupo):
             raise ValidationError({'detail': 'No eres miembro de este grupo'})
         
         # Verificar que los bolsillos existen y pertenecen a quien deben
@@ -936,52 +1313,63 @@ class AportacionViewSet(viewsets.ModelViewSet):
         except models.Bolsillo.DoesNotExist:
             raise ValidationError({'detail': 'El bolsillo del grupo no existe o no pertenece al grupo'})
         
-        # Verificar saldo suficiente
-        if bolsillo_usuario.saldo < monto:
-            raise ValidationError({
-                'detail': f'Saldo insuficiente. Tienes ${bolsillo_usuario.saldo}, necesitas ${monto}'
-            })
-        
-        # Crear el egreso del usuario
-        egreso = models.Egreso.objects.create(
-            usuario=user,
-            bolsillo=bolsillo_usuario,
-            monto=monto,
-            fecha=fecha,
-            descripcion=descripcion or f'Aportación al grupo {grupo.nombre}',
-            creado_por=user
-        )
-        
-        # Actualizar saldo del bolsillo del usuario
-        bolsillo_usuario.saldo -= monto
-        bolsillo_usuario.save()
-        
-        # Crear el ingreso al grupo
-        ingreso = models.Ingreso.objects.create(
-            grupo=grupo,
-            bolsillo=bolsillo_grupo,
-            monto=monto,
-            fecha=fecha,
-            descripcion=descripcion or f'Aportación de {user.nombre or user.email}',
-            creado_por=user
-        )
-        
-        # Actualizar saldo del bolsillo del grupo
-        bolsillo_grupo.saldo += monto
-        bolsillo_grupo.save()
+        with transaction.atomic():
+            bloqueados = balances.bloquear(bolsillo_usuario, bolsillo_grupo)
+            bolsillo_usuario = bloqueados[bolsillo_usuario.pk]
+            bolsillo_grupo = bloqueados[bolsillo_grupo.pk]
+            
+            # Verificar saldo suficiente (leído bajo bloqueo)
+            if bolsillo_usuario.saldo < monto:
+                metrics.SALDO_INSUFICIENTE.labels('aportacion').inc()
+                raise ValidationError({
+                    'detail': f'Saldo insuficiente. Tienes ${bolsillo_usuario.saldo}, necesitas ${monto}'
+                })
+            
+            # Crear el egreso del usuario
+            egreso = models.Egreso.objects.create(
+                usuario=user,
+                bolsillo=bolsillo_usuario,
+                monto=monto,
+                fecha=fecha,
+                descripcion=descripcion or f'Aportación al grupo {grupo.nombre}',
+                creado_por=user
+            )
+            
+            # Crear el ingreso al grupo
+            ingreso = models.Ingreso.objects.create(
+                grupo=grupo,
+                bolsillo=bolsillo_grupo,
+                monto=monto,
+                fecha=fecha,
+                descripcion=descripcion or f'Aportación de {user.nombre or user.email}',
+                creado_por=user
+            )
+            
+            # Actualizar saldos: restar al bolsillo del usuario y sumar al del grupo
+            flujos = {}
+            snapshots.flujo(flujos, bolsillo_usuario, fecha, egresos=monto)
+            snapshots.flujo(flujos, bolsillo_grupo, fecha, ingresos=monto)
+            balances.aplicar({
+                bolsillo_usuario.pk: -monto,
+                bolsillo_grupo.pk: monto,
+            }, bloqueados, flujos)
+            resumenes.registrar_lote([egreso, ingreso])
+            
+            # Crear el registro de aportación
+            aportacion = models.Aportacion.objects.create(
+                usuario=user,
+                grupo=grupo,
+                monto=monto,
+                fecha=fecha,
+                descripcion=descripcion,
+                egreso_usuario=egreso,
+                ingreso_grupo=ingreso,
+                bolsillo_usuario=bolsillo_usuario,
+                bolsillo_grupo=bolsillo_grupo
+            )
         
-        # Crear el registro de aportación
-        aportacion = models.Aportacion.objects.create(
-            usuario=user,
-            grupo=grupo,
-            monto=monto,
-            fecha=fecha,
-            descripcion=descripcion,
-            egreso_usuario=egreso,
-            ingreso_grupo=ingreso,
-            bolsillo_usuario=bolsillo_usuario,
-            bolsillo_grupo=bolsillo_grupo
-        )
+        metrics.APORTACIONES.inc()
+        metrics.APORTACIONES_MONTO.inc(float(monto))
         
         return Response({
             'detail': f'Aportación de ${monto} realizada exitosamente',
@@ -991,3 +1379,178 @@ class AportacionViewSet(viewsets.ModelViewSet):
             'nuevo_saldo_usuario': str(bolsillo_usuario.saldo),
             'nuevo_saldo_grupo': str(bolsillo_grupo.saldo)
         }, status=status.HTTP_201_CREATED)
+
+
+def _dashboard_consultas(filtro):
+    """
+    (bolsillos, resumen, por_categoria): querysets sin evaluar del resumen del
+    dashboard. Los usan DashboardViewSet y su variante async (async_views.py).
+    """
+    # Totales desde el resumen mensual (pocas filas por mes) en lugar de ingresos/egresos
+    resumen = models.ResumenMensual.objects.filter(filtro)
+    por_categoria = (
+        resumen.filter(tipo='eg')
+        .values('categoria', 'categoria__nombre', 'categoria__color')
+        .annotate(total=Sum('total'))
+        .order_by('-total')
+    )
+    bolsillos = models.Bolsillo.objects.filter(filtro).annotate(pendiente=balances.pendiente())
+    return bolsillos, resumen, por_categoria
+
+
+def _dashboard_saldo():
+    # Saldo compactado más los asientos pendientes del diario (ver balances.py)
+    return {'total': Sum(F('saldo') + F('pendiente'))}
+
+
+def _dashboard_totales():
+    return {
+        'ingresos': Sum('total', filter=Q(tipo='ing')),
+        'egresos': Sum('total', filter=Q(tipo='eg')),
+    }
+
+
+def _dashboard_respuesta(grupo_id, saldo_total, totales, por_categoria):
+    cero = Decimal('0.00')
+    saldo_total = saldo_total or cero
+    ingresos = totales['ingresos'] or cero
+    egresos = totales['egresos'] or cero
+    categorias = [{
+        'categoria_id': c['categoria'],
+        'nombre': c['categoria__nombre'],
+        'color': c['categoria__color'],
+        'total': serializacion.monto(c['total']),
+        'porcentaje': round(float(c['total'] / egresos) * 100, 2) if egresos else 0,
+    } for c in por_categoria]
+    return {
+        'grupo_id': int(grupo_id) if grupo_id else None,
+        'saldo_total': serializacion.monto(saldo_total),
+        'ingresos': serializacion.monto(ingresos),
+        'egresos': serializacion.monto(egresos),
+        'neto': serializacion.monto(ingresos - egresos),
+        'categorias': categorias,
+    }
+
+
+class DashboardViewSet(viewsets.ViewSet):
+    """
+    Resúmenes del dashboard calculados en la base de datos.
+    El tamaño de la respuesta no depende del historial del usuario o grupo.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['get'], url_path='summary')
+    def summary(self, request):
+        """
+        Totales de bolsillos, ingresos, egresos, neto y egresos por categoría.
+        Parámetro: grupo_id (query param, opcional)
+        """
+        grupo_id = request.query_params.get('grupo_id')
+        filtro = _filtro_propietario(request.user, grupo_id)
+
+        bolsillos, resumen, por_categoria = _dashboard_consultas(filtro)
+        saldo_total = bolsillos.aggregate(**_dashboard_saldo())['total']
+        totales = resumen.aggregate(**_dashboard_totales())
+        return Response(
+            _dashboard_respuesta(grupo_id, saldo_total, totales, por_categoria),
+            status=status.HTTP_200_OK,
+        )
+
+
+STATS_MAX_PERIODS = 120
+
+
+def _series_periodos(params):
+    """
+    (inicios, fin, trunc, formato) a partir de group_by, periods y reference.
+    Los inicios van de más antiguo a más reciente e incluyen periodos sin datos.
+    """
+    import datetime
+    from django.db.models.functions import TruncMonth, TruncYear
+    from django.utils import timezone
+
+    group_by = params.get('group_by', 'month')
+    if group_by not in ('month', 'year'):
+        raise ValidationError({'detail': 'El group_by debe ser "month" o "year"'})
+
+    try:
+        periods = int(params.get('periods', 6))
+    except (TypeError, ValueError):
+        raise ValidationError({'detail': 'El periods debe ser un número entero'})
+    if periods < 1 or periods > STATS_MAX_PERIODS:
+        raise ValidationError({'detail': f'El periods debe estar entre 1 y {STATS_MAX_PERIODS}'})
+
+    reference = params.get('reference')
+    if reference:
+        try:
+            ref = datetime.datetime.strptime(reference, '%Y-%m').date()
+        except ValueError:
+            raise ValidationError({'detail': 'La reference debe tener formato YYYY-MM'})
+    else:
+        ref = timezone.localdate().replace(day=1)
+
+    if group_by == 'year':
+        inicios = [datetime.date(ref.year - i, 1, 1) for i in range(periods - 1, -1, -1)]
+        fin = datetime.date(ref.year + 1, 1, 1)
+        return inicios, fin, TruncYear('mes'), '%Y'
+
+    inicios = []
+    for i in range(periods - 1, -1, -1):
+        year, month = divmod(ref.year * 12 + ref.month - 1 - i, 12)
+        inicios.append(datetime.date(year, month + 1, 1))
+    year, month = divmod(ref.year * 12 + ref.month, 12)
+    fin = datetime.date(year, month + 1, 1)
+    return inicios, fin, TruncMonth('mes'), '%Y-%m'
+
+
+def _series_consulta(filtro, inicios, fin, trunc):
+    return (
+        models.ResumenMensual.objects
+        .filter(filtro, mes__gte=inicios[0], mes__lt=fin)
+        .annotate(periodo=trunc)
+        .values('periodo')
+        .annotate(
+            ingresos=Sum('total', filter=Q(tipo='ing')),
+            egresos=Sum('total', filter=Q(tipo='eg')),
+        )
+        .order_by('periodo')
+    )
+
+
+def _series_respuesta(filas, inicios, formato):
+    cero = Decimal('0.00')
+    por_periodo = {}
+    for f in filas:
+        por_periodo[f['periodo'].strftime(formato)] = (f['ingresos'] or cero, f['egresos'] or cero)
+
+    data = []
+    for inicio in inicios:
+        clave = inicio.strftime(formato)
+        ingresos, egresos = por_periodo.get(clave, (cero, cero))
+        data.append({
+            'periodo': clave,
+            'ingresos': serializacion.monto(ingresos),
+            'egresos': serializacion.monto(egresos),
+            'neto': serializacion.monto(ingresos - egresos),
+        })
+    return data
+
+
+class StatsViewSet(viewsets.ViewSet):
+    """
+    Series de ingresos/egresos agrupadas en la base de datos sobre ResumenMensual.
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_PERIODS = STATS_MAX_PERIODS
+
+    @action(detail=False, methods=['get'], url_path='series')
+    def series(self, request):
+        """
+        Ingresos, egresos y neto por mes o año.
+        Parámetros (query): grupo_id (opcional), group_by=month|year (default month),
+        periods=N (default 6), reference=YYYY-MM (default mes actual)
+        """
+        inicios, fin, trunc, formato = _series_periodos(request.query_params)
+        filtro = _filtro_propietario(request.user, request.query_params.get('grupo_id'))
+        filas = _series_consulta(filtro, inicios, fin, trunc)
+        return Response(_series_respuesta(filas, inicios, formato), status=status.HTTP_200_OK)
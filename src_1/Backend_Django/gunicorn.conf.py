@@ -0,0 +1,37 @@
+"""
+Configuración de gunicorn (se carga automáticamente desde el directorio de trabajo).
+
+Si PROMETHEUS_MULTIPROC_DIR está definido, las métricas de finances.metrics se
+guardan por worker en ese directorio y /metrics las suma: aquí se vacía al
+arrancar el master y se marcan como terminados los workers que salen.
+
+La aplicación se elige aquí (Procfile y railway.json no la pasan): por defecto
+backend.wsgi con workers síncronos; con GUNICORN_ASGI=True, backend.asgi con
+workers de uvicorn (uvicorn-worker), para que las vistas de /api/async/ no
+ocupen un worker mientras esperan a la base de datos. Bajo ASGI cada petición
+usa el ORM desde un hilo propio, así que una conexión persistente quedaría
+abierta en cada hilo: CONN_MAX_AGE se fuerza a 0 (ver settings.DATABASES).
+"""
+import os
+import shutil
+
+if os.environ.get('GUNICORN_ASGI', 'False').lower() in ('1', 'true', 'yes'):
+    wsgi_app = 'backend.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    raw_env = ['CONN_MAX_AGE=0']
+else:
+    wsgi_app = 'backend.wsgi'
+
+
+def on_starting(server):
+    directorio = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directorio:
+        shutil.rmtree(directorio, ignore_errors=True)
+        os.makedirs(directorio, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)